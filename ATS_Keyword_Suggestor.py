@@ -7,12 +7,30 @@ A GUI application for analyzing resumes against job descriptions
 
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext, messagebox
-import PyPDF2
-import re
-import json
-import subprocess
 import os
-from pathlib import Path
+import multiprocessing
+import threading
+import time
+
+# PyPDF2, NumPy and the provider SDKs are imported on first use, not at startup
+from keyword_engine import extract_keywords, extract_action_verbs
+from live_analysis import LiveAnalysis
+from disk_cache import DiskCache
+from llm_providers import get_keyword_suggestions_cached
+from pipeline_metrics import configure as configure_metrics, metrics, profiled, span, trace
+from provider_scheduler import INTERACTIVE, scheduling
+from response_cache import ResponseCache
+from resume_reader import read_resume_cached, extract_immutable_fields, resume_format_for
+from suggestion_export import EXTENSIONS as EXPORT_EXTENSIONS, export_records, format_text
+from suggestion_stream import add_suggestion_item
+from task_runner import TaskRunner, TaskCancelled
+
+
+# Seconds before an analysis is abandoned and local extraction is used instead
+ANALYSIS_TIMEOUT = 120
+
+# Live mode waits this long after the last JD edit before re-analyzing
+LIVE_DEBOUNCE_MS = 300
 
 
 class ATSKeywordSuggestorGUI:
@@ -25,10 +43,60 @@ class ATSKeywordSuggestorGUI:
         self.resume_file = None
         self.resume_content = ""
         self.resume_format = None
+        self.preview_chars = 0
+        self.live_analysis = None
+        self.live_view = {}
+        self.live_after_id = None
         self.api_key = tk.StringVar()
         self.jd_text = tk.StringVar()
         
+        # Extracted text cache (skips PDF parsing when the same file is loaded again)
+        try:
+            self.text_cache = DiskCache()
+        except Exception:
+            self.text_cache = None
+        
+        # AI suggestion cache (an unchanged resume + JD + provider setup costs no new call)
+        try:
+            self.response_cache = ResponseCache()
+        except Exception:
+            self.response_cache = None
+        
+        # Document frequencies of every JD analyzed so far, for BM25 keyword ranking
+        # (opened on first use: loading it pulls in NumPy)
+        self.corpus_stats = None
+        self.corpus_lock = threading.Lock()
+        
+        # AI suggestions of this session's analyses, reused for a near-identical
+        # resume and JD (also opened on first use, for the same reason)
+        self.suggestion_memo = None
+        self.memo_lock = threading.Lock()
+        
+        # Stage timings go to ATS_METRICS_FILE if set; ATS_PROFILE captures a
+        # cProfile of the first analysis
+        try:
+            configure_metrics()
+        except OSError:
+            pass
+        self.profile_path = os.environ.get('ATS_PROFILE')
+        
+        # With ATS_SERVICE_URL set, analyses run in a long-running analysis_service
+        # whose caches stay warm between windows; this window only shows the results
+        self.service = None
+        if os.environ.get('ATS_SERVICE_URL'):
+            from analysis_service import ServiceClient
+            self.service = ServiceClient(os.environ['ATS_SERVICE_URL'], timeout=ANALYSIS_TIMEOUT)
+        
         self.setup_ui()
+        
+        # Background work (file reading, analysis, API calls) runs off the Tk thread
+        self.runner = TaskRunner(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+    
+    def close(self):
+        self.runner.shutdown()
+        metrics.close()
+        self.root.destroy()
     
     def setup_ui(self):
         # Main container with padding
@@ -73,6 +141,10 @@ class ATSKeywordSuggestorGUI:
         model_entry = ttk.Entry(api_frame, textvariable=self.model_name, width=50)
         model_entry.grid(row=3, column=1, sticky=(tk.W, tk.E), padx=5, pady=2)
         
+        self.refresh_ai = tk.BooleanVar(value=False)
+        ttk.Checkbutton(api_frame, text="Refresh AI suggestions (ignore cached results)",
+                        variable=self.refresh_ai).grid(row=4, column=1, sticky=tk.W, padx=5, pady=2)
+        
         # Resume Upload Section
         upload_frame = ttk.LabelFrame(main_frame, text="Step 1: Resume Upload", padding="10")
         upload_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=5)
@@ -100,6 +172,7 @@ class ATSKeywordSuggestorGUI:
         
         self.jd_text_widget = scrolledtext.ScrolledText(jd_frame, height=10, wrap=tk.WORD)
         self.jd_text_widget.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.jd_text_widget.bind('<<Modified>>', self.jd_modified)
         
         # Action Buttons
         button_frame = ttk.Frame(main_frame)
@@ -107,6 +180,11 @@ class ATSKeywordSuggestorGUI:
         
         ttk.Button(button_frame, text="Step 3: Analyze & Suggest Keywords", 
                   command=self.suggest_keywords, style='Accent.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Cancel", 
+                  command=self.cancel_tasks).pack(side=tk.LEFT, padx=5)
+        self.live_mode = tk.BooleanVar(value=False)
+        ttk.Checkbutton(button_frame, text="Live analysis (local)", variable=self.live_mode,
+                        command=self.toggle_live_mode).pack(side=tk.LEFT, padx=5)
         # REMOVED: ttk.Button(button_frame, text="Auto-Apply Keywords & Generate .tex", command=self.auto_apply_keywords).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Clear All", 
                   command=self.clear_all).pack(side=tk.LEFT, padx=5)
@@ -125,11 +203,14 @@ class ATSKeywordSuggestorGUI:
         main_frame.rowconfigure(4, weight=1)
     
     def log_status(self, message):
+        # Widgets may only be touched from the Tk thread; workers go through the runner
+        if threading.current_thread() is not threading.main_thread():
+            self.runner.call_soon(self.log_status, message)
+            return
         self.status_text.config(state='normal')
         self.status_text.insert(tk.END, f"{message}\n")
         self.status_text.see(tk.END)
         self.status_text.config(state='disabled')
-        self.root.update()
     
     def load_resume(self):
         file_path = filedialog.askopenfilename(
@@ -140,81 +221,81 @@ class ATSKeywordSuggestorGUI:
         if not file_path:
             return
         
+        # Determine file type
+        resume_format = resume_format_for(file_path)
+        if resume_format is None:
+            messagebox.showerror("Error", "Unsupported file format. Please use .tex or .pdf")
+            return
+        
         self.resume_file = file_path
+        self.resume_content = ""
         self.file_label.config(text=os.path.basename(file_path), foreground="blue")
         
-        # Determine file type and extract content
-        if file_path.endswith('.tex'):
-            self.resume_format = 'tex'
-            self.resume_content = self.read_tex_file(file_path)
-        elif file_path.endswith('.pdf'):
-            self.resume_format = 'pdf'
-            self.resume_content = self.read_pdf_file(file_path)
-        else:
-            messagebox.showerror("Error", "Unsupported file format. Please use .tex or .pdf")
-            return
+        # Clear the preview so PDF pages can be shown as they are extracted
+        self.resume_preview.delete(1.0, tk.END)
+        self.preview_chars = 0
+        
+        self.log_status(f"Reading {os.path.basename(file_path)}...")
+        self.runner.submit(
+            f"Loading {os.path.basename(file_path)}", self.read_resume_task, file_path,
+            on_success=lambda content: self.resume_loaded(file_path, resume_format, content),
+            on_error=lambda error: self.resume_load_failed(file_path, resume_format, error))
+    
+    def read_resume_task(self, task, file_path):
+        """Worker: extract resume text, reusing cached text for identical files"""
+        on_page = lambda page_text: self.runner.call_soon(self.preview_page, file_path, page_text)
+        with trace(os.path.basename(file_path)):
+            content, _, cache_hit = read_resume_cached(file_path, self.text_cache, workers='auto',
+                                                       on_page=on_page)
+        if cache_hit:
+            self.log_status("✓ Reused cached text (file unchanged since last extraction)")
+        return content
+    
+    def resume_loaded(self, file_path, resume_format, content):
+        if file_path != self.resume_file:
+            return  # another file was selected while this one was loading
+        
+        self.resume_format = resume_format
+        self.resume_content = content
         
         # Display preview
         self.resume_preview.delete(1.0, tk.END)
         self.resume_preview.insert(1.0, self.resume_content[:2000] + "..." if len(self.resume_content) > 2000 else self.resume_content)
         
         self.log_status(f"✓ Resume loaded: {os.path.basename(file_path)} ({self.resume_format.upper()})")
+        
+        # Live mode re-indexes the new resume on its next update
+        self.live_analysis = None
+        if self.live_mode.get():
+            self.schedule_live_update()
     
-    def read_tex_file(self, file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to read .tex file: {str(e)}")
-            return ""
+    def resume_load_failed(self, file_path, resume_format, error):
+        if file_path != self.resume_file:
+            return
+        file_type = ".tex" if resume_format == 'tex' else "PDF"
+        self.log_status(f"✗ Failed to read {os.path.basename(file_path)}")
+        messagebox.showerror("Error", f"Failed to read {file_type} file: {str(error)}")
     
-    def read_pdf_file(self, file_path):
-        try:
-            text = ""
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to read PDF file: {str(e)}")
-            return ""
+    def preview_page(self, file_path, page_text):
+        """Show extracted PDF pages in the preview until it holds 2000 chars"""
+        if file_path != self.resume_file or self.preview_chars >= 2000:
+            return
+        page_text = page_text[:2000 - self.preview_chars]
+        self.resume_preview.insert(tk.END, page_text + "\n")
+        self.preview_chars += len(page_text) + 1
     
     def extract_immutable_fields(self, content):
         """Extract fields that should remain unchanged"""
-        fields = {}
-        
-        # Common patterns for contact info
-        email_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-        phone_pattern = r'[\+\d][\d\-\(\)\s]{8,}'
-        linkedin_pattern = r'linkedin\.com/[\w\-/]+'
-        github_pattern = r'github\.com/[\w\-]+'
-        
-        emails = re.findall(email_pattern, content)
-        phones = re.findall(phone_pattern, content)
-        linkedin = re.findall(linkedin_pattern, content, re.IGNORECASE)
-        github = re.findall(github_pattern, content, re.IGNORECASE)
-        
-        if emails:
-            fields['email'] = emails[0]
-        if phones:
-            fields['phone'] = phones[0].strip()
-        if linkedin:
-            fields['linkedin'] = linkedin[0]
-        if github:
-            fields['github'] = github[0]
-        
-        # Extract name (first line or \name command in LaTeX)
-        if self.resume_format == 'tex':
-            name_match = re.search(r'\\name\{([^}]+)\}', content)
-            if name_match:
-                fields['name'] = name_match.group(1)
-        else:
-            lines = content.strip().split('\n')
-            if lines:
-                fields['name'] = lines[0].strip()
-        
-        return fields
+        return extract_immutable_fields(content, self.resume_format)
+    
+    def api_settings(self):
+        """Snapshot of the AI configuration, safe to hand to a worker thread"""
+        return {
+            'provider': self.api_provider.get(),
+            'api_key': self.api_key.get(),
+            'model': self.model_name.get() or None,
+            'api_url': self.custom_api_url.get() or None,
+        }
     
     def suggest_keywords(self):
         if not self.resume_content:
@@ -228,249 +309,190 @@ class ATSKeywordSuggestorGUI:
         
         self.log_status("Analyzing resume and job description...")
         
+        resume_content = self.resume_content
+        resume_format = self.resume_format
+        settings = self.api_settings()
+        settings['refresh'] = self.refresh_ai.get()
+        # Suggestion window shared by streamed items and the final result
+        view = {'started': time.monotonic()}
+        self.runner.submit(
+            "Analysis", self.analyze_task, resume_content, resume_format, jd, settings, view,
+            on_success=lambda result: self.display_keyword_suggestions(*result, view=view),
+            on_error=lambda error: self.analysis_failed(error, resume_content, resume_format, jd, view),
+            timeout=ANALYSIS_TIMEOUT)
+    
+    def analyze_task(self, task, resume_content, resume_format, jd, settings, view=None):
+        """Worker: run the full analysis and return (keywords, immutable_fields)"""
+        profile_path, self.profile_path = self.profile_path, None
+        with trace(f"analysis-{task.id}"):
+            if not profile_path:
+                return self.run_analysis(task, resume_content, resume_format, jd, settings, view)
+            with profiled(profile_path):
+                result = self.run_analysis(task, resume_content, resume_format, jd, settings,
+                                           view)
+            self.log_status(f"✓ Profile of this analysis saved to {profile_path}")
+            return result
+    
+    def run_analysis(self, task, resume_content, resume_format, jd, settings, view=None):
+        if self.service is not None:
+            try:
+                keywords, immutable_fields, reply = self.service.analyze(
+                    resume_content, resume_format, jd, settings)
+            except Exception as e:
+                self.log_status(f"Analysis service unavailable ({e}), analyzing locally...")
+            else:
+                if reply.get('ai_error'):
+                    self.log_status(f"API Error: {reply['ai_error']}")
+                if reply.get('near_duplicate'):
+                    self.log_status("✓ Reused the AI suggestions of a near-identical resume and JD")
+                self.log_status(f"✓ Analyzed by the analysis service ({reply['source']} keywords)")
+                return keywords, immutable_fields
+            task.check_cancelled()
+        
         # Extract immutable fields
-        immutable_fields = self.extract_immutable_fields(self.resume_content)
+        immutable_fields = extract_immutable_fields(resume_content, resume_format)
         self.log_status(f"✓ Extracted immutable fields: {', '.join(immutable_fields.keys())}")
+        task.check_cancelled()
         
         # Analyze without API if no key provided
-        if not self.api_key.get():
+        if not settings['api_key']:
             self.log_status("No API key provided. Using local keyword extraction...")
-            keywords = self.extract_keywords_locally(self.resume_content, jd)
-            self.display_keyword_suggestions(keywords, immutable_fields)
+            return self.extract_keywords_locally(resume_content, jd), immutable_fields
+        
+        # Stream AI suggestions into the result window as they arrive
+        on_item = None
+        if view is not None:
+            def on_item(path, item):
+                task.check_cancelled()
+                self.runner.call_soon(self.show_streamed_item, view, path, item, immutable_fields)
+        
+        # Call AI API for intelligent suggestions, ahead of any bulk calls in this process;
+        # a rate limit (HTTP 429) is waited out rather than falling back straight away
+        def on_rate_limit(label, seconds):
+            self.log_status(f"{label} rate limit reached, retrying in {seconds:.1f}s...")
+        
+        try:
+            with scheduling(INTERACTIVE, timeout=ANALYSIS_TIMEOUT, on_rate_limit=on_rate_limit):
+                keywords = self.get_ai_keyword_suggestions(resume_content, jd, immutable_fields,
+                                                           settings, on_item)
+        except Exception as e:
+            task.check_cancelled()
+            self.log_status(f"API Error: {str(e)}")
+            self.log_status("Falling back to local keyword extraction...")
+            keywords = self.extract_keywords_locally(resume_content, jd)
+        return keywords, immutable_fields
+    
+    def analysis_failed(self, error, resume_content, resume_format, jd, view=None):
+        if isinstance(error, TaskCancelled):
+            if view is not None:
+                view['final'] = True  # keep what was streamed, ignore items still queued
+            self.log_status("✗ Analysis cancelled")
+        elif isinstance(error, TimeoutError):
+            self.log_status(f"✗ {error}")
+            self.log_status("Falling back to local keyword extraction...")
+            self.runner.submit(
+                "Local analysis", self.analyze_task, resume_content, resume_format, jd,
+                {'api_key': None},
+                on_success=lambda result: self.display_keyword_suggestions(*result, view=view),
+                on_error=lambda error: self.log_status(f"✗ Analysis failed: {error}"))
         else:
-            # Call AI API for intelligent suggestions
-            try:
-                keywords = self.get_ai_keyword_suggestions(self.resume_content, jd, immutable_fields)
-                self.display_keyword_suggestions(keywords, immutable_fields)
-            except Exception as e:
-                self.log_status(f"API Error: {str(e)}")
-                self.log_status("Falling back to local keyword extraction...")
-                keywords = self.extract_keywords_locally(self.resume_content, jd)
-                self.display_keyword_suggestions(keywords, immutable_fields)
+            self.log_status(f"✗ Analysis failed: {error}")
+            messagebox.showerror("Error", f"Analysis failed: {error}")
+    
+    def cancel_tasks(self):
+        running = self.runner.running()
+        if not running:
+            self.log_status("Nothing to cancel")
+            return
+        self.runner.cancel_all()
+        self.log_status(f"Cancelling {len(running)} running task(s)...")
+    
+    def get_corpus_stats(self):
+        """Open the corpus statistics on first use; None if unavailable"""
+        with self.corpus_lock:
+            if self.corpus_stats is None:
+                try:
+                    from corpus_stats import CorpusStats
+                    self.corpus_stats = CorpusStats()
+                except Exception:
+                    self.corpus_stats = False
+            return self.corpus_stats or None
+    
+    def get_suggestion_memo(self):
+        """Open the near-duplicate suggestion memo on first use; None if unavailable"""
+        with self.memo_lock:
+            if self.suggestion_memo is None:
+                try:
+                    from near_duplicates import SuggestionMemo
+                    self.suggestion_memo = SuggestionMemo()
+                except Exception:
+                    self.suggestion_memo = False
+            return self.suggestion_memo or None
     
     def extract_keywords_locally(self, resume_content, jd):
         """Extract keywords locally without API"""
-        import re
-        from collections import Counter
-        
-        # Common technical skills patterns
-        tech_keywords = []
-        
-        # Extract words from JD
-        jd_words = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b|\b[A-Z]+\b|\b\w+\b', jd)
-        jd_lower = [w.lower() for w in jd_words]
-        
-        # Extract words from resume
-        resume_words = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b|\b[A-Z]+\b|\b\w+\b', resume_content)
-        resume_lower = [w.lower() for w in resume_words]
-        
-        # Common stop words to ignore
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-                     'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
-                     'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 
-                     'should', 'could', 'may', 'might', 'must', 'can', 'this', 'that',
-                     'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'}
-        
-        # Find keywords in JD that are NOT in resume
-        missing_keywords = []
-        word_freq = Counter(jd_lower)
-        
-        for word, count in word_freq.most_common(100):
-            if (len(word) > 3 and 
-                word not in stop_words and 
-                word not in resume_lower and
-                not word.isdigit()):
-                missing_keywords.append(word.title())
-        
-        # Find technical terms (capitalized words, acronyms)
-        tech_terms = set()
-        for word in jd_words:
-            if (len(word) > 2 and 
-                (word.isupper() or word[0].isupper()) and 
-                word.lower() not in stop_words):
-                if word.lower() not in resume_lower:
-                    tech_terms.add(word)
-        
-        # Find multi-word phrases
-        jd_clean = re.sub(r'[^\w\s]', ' ', jd.lower())
-        resume_clean = re.sub(r'[^\w\s]', ' ', resume_content.lower())
-        
-        bigrams = []
-        words = jd_clean.split()
-        for i in range(len(words) - 1):
-            phrase = f"{words[i]} {words[i+1]}"
-            if (phrase not in resume_clean and 
-                words[i] not in stop_words and 
-                words[i+1] not in stop_words and
-                len(words[i]) > 2 and len(words[i+1]) > 2):
-                bigrams.append(phrase.title())
-        
-        return {
-            'missing_keywords': missing_keywords[:20],
-            'technical_terms': list(tech_terms)[:15],
-            'key_phrases': list(set(bigrams))[:15],
-            'suggestions': {
-                'skills': missing_keywords[:10],
-                'experience': list(set(bigrams))[:8],
-                'action_verbs': self.extract_action_verbs(jd)
-            }
-        }
+        corpus_stats = self.get_corpus_stats()
+        keywords = extract_keywords(resume_content, jd, corpus_stats)
+        if corpus_stats is not None:
+            corpus_stats.flush()
+        return keywords
     
     def extract_action_verbs(self, text):
         """Extract action verbs from job description"""
-        common_action_verbs = [
-            'developed', 'designed', 'implemented', 'created', 'built', 'managed',
-            'led', 'coordinated', 'executed', 'delivered', 'achieved', 'improved',
-            'optimized', 'analyzed', 'evaluated', 'collaborated', 'contributed',
-            'established', 'maintained', 'enhanced', 'streamlined', 'automated',
-            'integrated', 'deployed', 'architected', 'engineered', 'facilitated'
-        ]
-        
-        text_lower = text.lower()
-        found_verbs = []
-        for verb in common_action_verbs:
-            if verb in text_lower:
-                found_verbs.append(verb.title())
-        
-        return found_verbs[:10]
-    
-    def get_ai_keyword_suggestions(self, resume_content, jd, immutable_fields):
+        return extract_action_verbs(text)
+    
+    def get_ai_keyword_suggestions(self, resume_content, jd, immutable_fields, settings=None,
+                                   on_item=None):
         """Use AI API to get intelligent keyword suggestions"""
-        self.log_status(f"Calling {self.api_provider.get().upper()} API for suggestions...")
+        if settings is None:
+            settings = self.api_settings()
+        
+        # A slightly edited resume (or a reposted JD) reuses the earlier suggestions
+        setup = (settings['provider'], settings['model'], settings['api_url'])
+        memo = self.get_suggestion_memo()
+        if memo is not None and not settings.get('refresh'):
+            reused = memo.get(resume_content, jd, setup)
+            if reused is not None:
+                keywords, resume_similarity, jd_similarity = reused
+                self.log_status(f"✓ Reused the AI suggestions of a near-identical resume "
+                                f"({resume_similarity:.0%} similar) and JD ({jd_similarity:.0%}); "
+                                "tick 'Refresh' to ask again")
+                return keywords
+        
+        self.log_status(f"Calling {settings['provider'].upper()} API for suggestions...")
         
-        provider = self.api_provider.get()
-        
-        prompt = f"""Analyze this resume and job description. Provide keyword suggestions for manual optimization.
-
-RESUME (keep unchanged):
-{immutable_fields}
-
-RESUME CONTENT:
-{resume_content[:3000]}...
-
-JOB DESCRIPTION:
-{jd}
-
-Provide suggestions in this EXACT JSON format:
-{{
-  "missing_keywords": ["keyword1", "keyword2", ...],
-  "technical_terms": ["term1", "term2", ...],
-  "key_phrases": ["phrase1", "phrase2", ...],
-  "suggestions": {{
-    "skills": ["skill1", "skill2", ...],
-    "experience": ["accomplishment phrase1", ...],
-    "action_verbs": ["verb1", "verb2", ...]
-  }},
-  "placement_tips": [
-    "Where to add: specific section - keyword suggestion",
-    ...
-  ]
-}}
-
-Focus on keywords that naturally fit the resume without lying. Return ONLY the JSON, no other text."""
-
         try:
-            if provider == "openai":
-                response_text = self.call_openai_simple(prompt)
-            elif provider == "anthropic":
-                response_text = self.call_anthropic_simple(prompt)
-            elif provider == "google":
-                response_text = self.call_google_simple(prompt)
-            elif provider == "custom":
-                response_text = self.call_custom_api(prompt)
-            else:
-                raise ValueError(f"Unsupported API provider: {provider}")
-            
-            # Extract JSON from response
-            import json
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                # If no JSON found, parse as plain text
-                return self.parse_text_suggestions(response_text)
-        
+            keywords, cache_hit = get_keyword_suggestions_cached(
+                resume_content, jd, immutable_fields, cache=self.response_cache,
+                on_item=on_item, **settings)
+            if cache_hit:
+                self.log_status("✓ Reused cached AI suggestions (tick 'Refresh' to ask again)")
+            if memo is not None:
+                memo.put(resume_content, jd, setup, keywords)
+            return keywords
         except Exception as e:
             self.log_status(f"API call failed: {str(e)}")
             raise
     
-    def call_openai_simple(self, prompt):
-        """Simplified OpenAI call for suggestions"""
-        # NOTE: This requires the 'openai' library to be installed and configured
-        try:
-            import openai
-        except ImportError:
-            raise ImportError("The 'openai' library is not installed. Please install it with 'pip install openai'")
-            
-        openai.api_key = self.api_key.get()
-        model = self.model_name.get() if self.model_name.get() else "gpt-3.5-turbo"
-        
-        response = openai.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a resume optimization expert. Return only JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.5,
-            max_tokens=1500
-        )
-        return response.choices[0].message.content
-    
-    def call_anthropic_simple(self, prompt):
-        """Simplified Anthropic call for suggestions"""
-        # NOTE: This requires the 'anthropic' library to be installed and configured
-        try:
-            import anthropic
-        except ImportError:
-            raise ImportError("The 'anthropic' library is not installed. Please install it with 'pip install anthropic'")
-
-        client = anthropic.Anthropic(api_key=self.api_key.get())
-        model = self.model_name.get() if self.model_name.get() else "claude-3-haiku-20240307"
-        
-        message = client.messages.create(
-            model=model,
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return message.content[0].text
-    
-    def call_google_simple(self, prompt):
-        """Simplified Google call for suggestions"""
-        # NOTE: This requires the 'google-genai' library to be installed and configured
-        try:
-            import google.generativeai as genai
-        except ImportError:
-            raise ImportError("The 'google-genai' library is not installed. Please install it with 'pip install google-genai'")
-
-        genai.configure(api_key=self.api_key.get())
-        model_name = self.model_name.get() if self.model_name.get() else "gemini-1.5-flash"
-        model = genai.GenerativeModel(model_name)
-        
-        response = model.generate_content(prompt)
-        return response.text
-    
-    def call_custom_api(self, prompt):
-        """Placeholder for custom API call"""
-        self.log_status("Attempting to call custom API...")
-        # In a real implementation, you would use 'requests' here.
-        # This is a placeholder for demonstration purposes.
-        raise NotImplementedError("Custom API functionality is not implemented in this script.")
-    
-    def parse_text_suggestions(self, text):
-        """Parse plain text suggestions if JSON fails"""
-        return {
-            'missing_keywords': re.findall(r'keyword[s]?:\s*([^\n]+)', text, re.I),
-            'technical_terms': re.findall(r'technical[^:]*:\s*([^\n]+)', text, re.I),
-            'key_phrases': [],
-            'suggestions': {
-                'skills': [],
-                'experience': [],
-                'action_verbs': []
-            }
-        }
+    def show_streamed_item(self, view, path, item, immutable_fields):
+        """Add one streamed AI suggestion to the result window, opening it if needed"""
+        if view.get('final'):
+            return
+        if 'window' not in view:
+            self.open_suggestion_window(view)
+            self.log_status(f"✓ First suggestions after {time.monotonic() - view['started']:.1f}s, "
+                            "more are streaming in...")
+        elif not view['window'].winfo_exists():
+            return  # closed by the user while streaming
+        view['immutable_fields'] = immutable_fields
+        add_suggestion_item(view['keywords'], path, item)
+        # Redraw once per batch of items rather than once per item
+        if not view.get('redraw_pending'):
+            view['redraw_pending'] = True
+            self.root.after_idle(self.render_suggestions, view)
     
-    def display_keyword_suggestions(self, keywords, immutable_fields):
-        """Display keyword suggestions in a new window"""
+    def open_suggestion_window(self, view):
+        """Create the (empty) suggestion window and remember its widgets in view"""
         suggest_window = tk.Toplevel(self.root)
         suggest_window.title("Keyword Suggestions for Manual Optimization")
         suggest_window.geometry("900x700")
@@ -488,46 +510,55 @@ Focus on keywords that naturally fit the resume without lying. Return ONLY the J
         notebook = ttk.Notebook(main_container)
         notebook.pack(fill=tk.BOTH, expand=True, pady=5)
         
-        # Tab 1: Missing Keywords
-        tab1 = ttk.Frame(notebook, padding="10")
-        notebook.add(tab1, text="Missing Keywords")
+        view['title'] = title
+        texts = []
+        for tab_name in ("Missing Keywords", "Technical Terms", "Key Phrases",
+                         "Manual Tips & Verbs", "Protected Info"):
+            tab = ttk.Frame(notebook, padding="10")
+            notebook.add(tab, text=tab_name)
+            
+            text = scrolledtext.ScrolledText(tab, wrap=tk.WORD, height=20)
+            text.pack(fill=tk.BOTH, expand=True)
+            text.config(state='disabled')
+            texts.append(text)
+        
+        view['window'] = suggest_window
+        view['container'] = main_container
+        view['texts'] = texts
+        view.setdefault('keywords', {})
+        view.setdefault('immutable_fields', {})
+    
+    def render_suggestions(self, view):
+        """(Re)write every tab from view['keywords'], partial or complete"""
+        view['redraw_pending'] = False
+        if not view['window'].winfo_exists():
+            return
+        with span('render', final=bool(view.get('final'))):
+            self.write_suggestion_tabs(view)
+    
+    def write_suggestion_tabs(self, view):
+        keywords = view['keywords']
+        text1, text2, text3, text4, text5 = view['texts']
+        for text in view['texts']:
+            text.config(state='normal')
+            text.delete(1.0, tk.END)
         
-        text1 = scrolledtext.ScrolledText(tab1, wrap=tk.WORD, height=20)
-        text1.pack(fill=tk.BOTH, expand=True)
+        # Tab 1: Missing Keywords
         text1.insert(1.0, "Keywords from JD that are NOT in your resume (Prioritize these!):\n\n")
         for kw in keywords.get('missing_keywords', []):
             text1.insert(tk.END, f"• {kw}\n")
-        text1.config(state='disabled')
         
         # Tab 2: Technical Terms
-        tab2 = ttk.Frame(notebook, padding="10")
-        notebook.add(tab2, text="Technical Terms")
-        
-        text2 = scrolledtext.ScrolledText(tab2, wrap=tk.WORD, height=20)
-        text2.pack(fill=tk.BOTH, expand=True)
         text2.insert(1.0, "Technical terms and acronyms to consider integrating:\n\n")
         for term in keywords.get('technical_terms', []):
             text2.insert(tk.END, f"• {term}\n")
-        text2.config(state='disabled')
         
         # Tab 3: Key Phrases
-        tab3 = ttk.Frame(notebook, padding="10")
-        notebook.add(tab3, text="Key Phrases")
-        
-        text3 = scrolledtext.ScrolledText(tab3, wrap=tk.WORD, height=20)
-        text3.pack(fill=tk.BOTH, expand=True)
         text3.insert(1.0, "Important phrases from the job description:\n\n")
         for phrase in keywords.get('key_phrases', []):
             text3.insert(tk.END, f"• {phrase}\n")
-        text3.config(state='disabled')
         
         # Tab 4: Specific Suggestions
-        tab4 = ttk.Frame(notebook, padding="10")
-        notebook.add(tab4, text="Manual Tips & Verbs")
-        
-        text4 = scrolledtext.ScrolledText(tab4, wrap=tk.WORD, height=20)
-        text4.pack(fill=tk.BOTH, expand=True)
-        
         suggestions = keywords.get('suggestions', {})
         
         text4.insert(tk.END, "=== SKILLS SECTION (to add) ===\n")
@@ -550,72 +581,112 @@ Focus on keywords that naturally fit the resume without lying. Return ONLY the J
             for tip in keywords['placement_tips']:
                 text4.insert(tk.END, f"• {tip}\n")
         
-        text4.config(state='disabled')
-        
         # Tab 5: Protected Fields
-        tab5 = ttk.Frame(notebook, padding="10")
-        notebook.add(tab5, text="Protected Info")
-        
-        text5 = scrolledtext.ScrolledText(tab5, wrap=tk.WORD, height=20)
-        text5.pack(fill=tk.BOTH, expand=True)
         text5.insert(1.0, "These fields were extracted and should remain exactly as they are:\n\n")
-        for field, value in immutable_fields.items():
+        for field, value in view['immutable_fields'].items():
             text5.insert(tk.END, f"{field.upper()}: {value}\n")
-        text5.config(state='disabled')
+        
+        for text in view['texts']:
+            text.config(state='disabled')
+    
+    def display_keyword_suggestions(self, keywords, immutable_fields, view=None):
+        """Display keyword suggestions in a new window (or the one items were streamed into)"""
+        if view is None:
+            view = {}
+        view['final'] = True
+        if 'window' not in view or not view['window'].winfo_exists():
+            self.open_suggestion_window(view)
+        
+        # The complete result replaces whatever was streamed
+        view['keywords'] = keywords
+        view['immutable_fields'] = immutable_fields
+        self.render_suggestions(view)
         
         # Export button
-        export_btn = ttk.Button(main_container, text="Export Suggestions to File",
-                               command=lambda: self.export_suggestions(keywords))
+        seconds = round(time.monotonic() - view['started'], 4) if 'started' in view else None
+        export_btn = ttk.Button(view['container'], text="Export Suggestions to File",
+                               command=lambda: self.export_suggestions(keywords, immutable_fields,
+                                                                       seconds))
         export_btn.pack(pady=10)
         
         self.log_status("✓ Keyword suggestions generated successfully!")
+        metrics.flush()
+    
+    def jd_modified(self, event=None):
+        """<<Modified>> handler: re-arm the flag and, in live mode, debounce an update"""
+        if not self.jd_text_widget.edit_modified():
+            return
+        self.jd_text_widget.edit_modified(False)
+        if self.live_mode.get():
+            self.schedule_live_update()
+    
+    def toggle_live_mode(self):
+        if self.live_mode.get():
+            self.log_status("Live analysis on: local suggestions refresh as you edit the JD")
+            self.schedule_live_update(0)
+        elif self.live_after_id is not None:
+            self.root.after_cancel(self.live_after_id)
+            self.live_after_id = None
     
-    def export_suggestions(self, keywords):
-        """Export suggestions to a text file"""
+    def schedule_live_update(self, delay=LIVE_DEBOUNCE_MS):
+        if self.live_after_id is not None:
+            self.root.after_cancel(self.live_after_id)
+        self.live_after_id = self.root.after(delay, self.live_update)
+    
+    def live_update(self):
+        """Re-analyze the edited JD incrementally and refresh the live panel in place"""
+        self.live_after_id = None
+        if not self.live_mode.get() or not self.resume_content:
+            return
+        
+        started = time.perf_counter()
+        if self.live_analysis is None:
+            self.live_analysis = LiveAnalysis(self.resume_content, self.get_corpus_stats())
+            self.live_view['immutable_fields'] = self.extract_immutable_fields(self.resume_content)
+        keywords = self.live_analysis.update(self.jd_text_widget.get(1.0, 'end-1c'))
+        elapsed = time.perf_counter() - started
+        
+        view = self.live_view
+        if 'window' not in view or not view['window'].winfo_exists():
+            immutable_fields = view.get('immutable_fields', {})
+            view.clear()
+            view['immutable_fields'] = immutable_fields
+            self.open_suggestion_window(view)
+            view['window'].title("Live Keyword Suggestions")
+            ttk.Button(view['container'], text="Export Suggestions to File",
+                       command=lambda: self.export_suggestions(
+                           view['keywords'], view.get('immutable_fields'))).pack(pady=10)
+        view['keywords'] = keywords
+        self.render_suggestions(view)
+        view['title'].config(text=f"Live: {self.live_analysis.coverage:.0%} of JD keywords covered "
+                                  f"(updated in {elapsed * 1000:.0f} ms)")
+    
+    def export_suggestions(self, keywords, immutable_fields=None, seconds=None):
+        """Export suggestions to a text report, or a JSON Lines/CSV/Parquet record"""
         file_path = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            filetypes=[("Text files", "*.txt"), ("JSON Lines", "*.jsonl"), ("CSV", "*.csv"),
+                       ("Parquet", "*.parquet"), ("All files", "*.*")],
             title="Save Keyword Suggestions"
         )
         
-        if file_path:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write("ATS KEYWORD SUGGESTIONS FOR MANUAL OPTIMIZATION\n")
-                f.write("=" * 50 + "\n\n")
-                
-                f.write("MISSING KEYWORDS (Prioritize):\n")
-                for kw in keywords.get('missing_keywords', []):
-                    f.write(f"• {kw}\n")
-                
-                f.write("\n\nTECHNICAL TERMS:\n")
-                for term in keywords.get('technical_terms', []):
-                    f.write(f"• {term}\n")
-                
-                f.write("\n\nKEY PHRASES:\n")
-                for phrase in keywords.get('key_phrases', []):
-                    f.write(f"• {phrase}\n")
-                
-                suggestions = keywords.get('suggestions', {})
-                
-                f.write("\n\nSKILLS TO ADD:\n")
-                for skill in suggestions.get('skills', []):
-                    f.write(f"• {skill}\n")
-                
-                f.write("\n\nEXPERIENCE PHRASES:\n")
-                for exp in suggestions.get('experience', []):
-                    f.write(f"• {exp}\n")
-                
-                f.write("\n\nACTION VERBS:\n")
-                for verb in suggestions.get('action_verbs', []):
-                    f.write(f"• {verb}\n")
-                
-                if 'placement_tips' in keywords:
-                    f.write("\n\nAI PLACEMENT TIPS:\n")
-                    for tip in keywords['placement_tips']:
-                        f.write(f"• {tip}\n")
-            
-            self.log_status(f"✓ Suggestions exported to: {file_path}")
-            messagebox.showinfo("Success", f"Suggestions saved to:\n{file_path}")
+        if not file_path:
+            return
+        try:
+            if os.path.splitext(file_path)[1].lower() in EXPORT_EXTENSIONS:
+                record = {'file': self.resume_file, 'format': self.resume_format,
+                          'immutable_fields': immutable_fields or {}, 'keywords': keywords,
+                          'seconds': seconds}
+                export_records([record], file_path)
+            else:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(format_text(keywords))
+        except Exception as e:
+            messagebox.showerror("Error", f"Export failed: {e}")
+            return
+        
+        self.log_status(f"✓ Suggestions exported to: {file_path}")
+        messagebox.showinfo("Success", f"Suggestions saved to:\n{file_path}")
     
     # REMOVED: auto_apply_keywords method
     # REMOVED: apply_keywords_to_resume method
@@ -627,6 +698,7 @@ Focus on keywords that naturally fit the resume without lying. Return ONLY the J
         self.resume_file = None
         self.resume_content = ""
         self.resume_format = None
+        self.live_analysis = None
         self.file_label.config(text="No file selected", foreground="gray")
         self.resume_preview.delete(1.0, tk.END)
         self.jd_text_widget.delete(1.0, tk.END)
@@ -636,6 +708,8 @@ Focus on keywords that naturally fit the resume without lying. Return ONLY the J
         self.log_status("Cleared all data")
 
 def main():
+    # Needed for page-parallel PDF extraction in the frozen .exe
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = ATSKeywordSuggestorGUI(root)
     root.mainloop()
@@ -0,0 +1,688 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local analysis service
+Long-running HTTP server (TCP or Unix socket) exposing the analysis pipeline:
+resume reading, immutable fields, local keywords and AI suggestions. Parsed JDs,
+keyword results, the text/response caches and provider clients stay warm between
+requests, and concurrent identical requests are merged into one computation.
+
+Endpoints (JSON in, JSON out):
+    GET  /health       status, uptime and cache/coalescing counters
+    POST /read         {path} -> {content, format, cache}
+    POST /fields       {resume, format} -> {immutable_fields}
+    POST /keywords     {resume, jd} -> local keyword suggestions
+    POST /suggestions  {resume, jd, provider, [api_key, model, api_url, refresh, priority]}
+                       -> AI suggestions
+    POST /analyze      {resume or path, [format], jd, [provider...]} -> {keywords,
+                       immutable_fields, source, [near_duplicate]}; AI errors fall back
+                       to local keywords
+
+Provider calls from all requests share the provider scheduler's rate limits;
+"priority": "bulk" queues a request's calls behind the (default) interactive ones.
+
+POST bodies must be sent as application/json and requests with an Origin header
+are refused, so web pages open in a browser cannot call the service. Requests
+without an api_key use the service's $<PROVIDER>_API_KEY only with the provider's
+default endpoint or an --api-url given at startup.
+
+Usage:
+    python analysis_service.py --port 8766
+    python analysis_service.py --socket /tmp/ats.sock
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from custom_api import normalize_api_url
+from keyword_engine import DocumentIndex, compare_documents
+from pipeline_metrics import configure as configure_metrics, metrics, trace
+from provider_scheduler import PRIORITIES, scheduler, scheduling
+from resume_reader import extract_immutable_fields, read_resume_cached, resume_format_for
+
+
+DEFAULT_PORT = 8766
+JD_CACHE_SIZE = 256
+RESULT_CACHE_SIZE = 4096
+
+# AI suggestions are reused for a resume and JD at least this similar to an earlier
+# pair (near_duplicates.DEFAULT_THRESHOLD; not imported so startup skips NumPy)
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+# Most request bodies are a resume and a JD; anything far larger is a mistake
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class ServiceError(Exception):
+    """A request the service cannot answer; status is the HTTP status to reply with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """Small thread-safe mapping that forgets the least recently used entries"""
+
+    def __init__(self, size):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Coalescer:
+    """Runs concurrent calls that share a key once; the other callers wait for its result"""
+
+    def __init__(self):
+        self.merged = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, func, *args):
+        """(func(*args), merged) where merged is True if another caller computed it"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.merged += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+def request_key(*parts):
+    """Digest of the request fields that determine a result"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class AnalysisService:
+    """The pipeline with its caches, shared by every request the server handles"""
+
+    def __init__(self, text_cache=None, response_cache=None, corpus=False,
+                 jd_cache_size=JD_CACHE_SIZE, result_cache_size=RESULT_CACHE_SIZE,
+                 near_duplicates=NEAR_DUPLICATE_THRESHOLD, api_urls=()):
+        self.text_cache = text_cache
+        self.api_urls = frozenset(normalize_api_url(url) for url in api_urls)
+        self.response_cache = response_cache
+        self.use_corpus = corpus
+        self.near_duplicate_threshold = near_duplicates
+        self._memo = None
+        self._memo_lock = threading.Lock()
+        self.jd_indexes = LRUCache(jd_cache_size)
+        self.results = LRUCache(result_cache_size)
+        self.coalescer = Coalescer()
+        self.started = time.time()
+        self.requests = 0
+        self._corpus = None
+        self._corpus_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+
+    def count_request(self):
+        with self._count_lock:
+            self.requests += 1
+
+    def allows_api_url(self, api_url):
+        """True if requests may use the service's API keys with this URL"""
+        try:
+            return normalize_api_url(api_url) in self.api_urls
+        except ValueError:
+            return False
+
+    def corpus(self):
+        """CorpusStats opened on first use (it loads NumPy); None if disabled or unavailable"""
+        if not self.use_corpus:
+            return None
+        with self._corpus_lock:
+            if self._corpus is None:
+                try:
+                    from corpus_stats import CorpusStats
+                    self._corpus = CorpusStats()
+                except Exception:
+                    self._corpus = False
+            return self._corpus or None
+
+    def memo(self):
+        """SuggestionMemo opened on first use (it loads NumPy); None if disabled or unavailable"""
+        if not self.near_duplicate_threshold:
+            return None
+        with self._memo_lock:
+            if self._memo is None:
+                try:
+                    from near_duplicates import SuggestionMemo
+                    self._memo = SuggestionMemo(self.near_duplicate_threshold)
+                except Exception:
+                    self._memo = False
+            return self._memo or None
+
+    def jd_index(self, jd):
+        """DocumentIndex of a JD, built once per distinct JD text"""
+        key = hashlib.sha256(jd.encode('utf-8')).hexdigest()
+        index = self.jd_indexes.get(key)
+        if index is None:
+            index, _ = self.coalescer.run(('jd', key), DocumentIndex, jd)
+            self.jd_indexes.put(key, index)
+        return index
+
+    def read(self, path):
+        """{'content', 'format', 'cache'} of a resume file"""
+        if resume_format_for(path) is None:
+            raise ServiceError("Unsupported file format. Please use .tex or .pdf")
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise ServiceError(str(e), 404)
+        key = ('read', os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        (content, resume_format, hit), merged = self.coalescer.run(
+            key, read_resume_cached, path, self.text_cache)
+        return {'content': content, 'format': resume_format,
+                'cache': 'hit' if hit or merged else 'miss'}
+
+    def fields(self, resume, resume_format):
+        return {'immutable_fields': extract_immutable_fields(resume, resume_format)}
+
+    def keywords(self, resume, jd):
+        """Local keyword suggestions, cached per (resume, JD)"""
+        key = request_key('keywords', resume, jd)
+        result = self.results.get(key)
+        if result is None:
+            result, _ = self.coalescer.run(key, self._local_keywords, resume, jd)
+            self.results.put(key, result)
+        return result
+
+    def _local_keywords(self, resume, jd):
+        jd_index = self.jd_index(jd)
+        weights = None
+        corpus = self.corpus()
+        if corpus is not None:
+            corpus.add_document(jd_index)
+            weights = corpus.bm25_weights(jd_index)
+        return compare_documents(DocumentIndex(resume), jd_index, weights)
+
+    def suggestions(self, resume, jd, immutable_fields, settings):
+        """AI suggestions; identical concurrent requests make one provider call"""
+        return self._suggestions(resume, jd, immutable_fields, settings)[0]
+
+    def _suggestions(self, resume, jd, immutable_fields, settings):
+        """(suggestions, near-duplicate similarities or None)
+
+        A resume and JD nearly identical to an earlier pair sent to the same
+        provider setup reuse its suggestions without a call (unless refresh is set).
+        """
+        from llm_providers import get_keyword_suggestions_cached
+        setup = (settings['provider'], settings.get('model'), settings.get('api_url'))
+        memo = self.memo()
+        if memo is not None and not settings.get('refresh'):
+            reused = memo.get(resume, jd, setup)
+            if reused is not None:
+                suggestions, resume_similarity, jd_similarity = reused
+                return suggestions, {'resume_similarity': round(resume_similarity, 4),
+                                     'jd_similarity': round(jd_similarity, 4)}
+
+        key = request_key('suggestions', resume, jd, immutable_fields,
+                          sorted(settings.items()))
+        (suggestions, cache_hit), merged = self.coalescer.run(
+            key, lambda: get_keyword_suggestions_cached(
+                resume, jd, immutable_fields, cache=self.response_cache, **settings))
+        if memo is not None and not merged:
+            memo.put(resume, jd, setup, suggestions)
+        return suggestions, None
+
+    def analyze(self, resume, resume_format, jd, settings=None):
+        """What the GUI's Analyze button does: fields, then AI or local keywords"""
+        immutable_fields = extract_immutable_fields(resume, resume_format)
+        result = {'immutable_fields': immutable_fields}
+        if settings and settings.get('api_key'):
+            try:
+                result['keywords'], reused = self._suggestions(resume, jd, immutable_fields,
+                                                               settings)
+                result['source'] = 'ai'
+                if reused is not None:
+                    result['near_duplicate'] = reused
+                return result
+            except Exception as e:
+                result['ai_error'] = str(e)
+        result['keywords'] = self.keywords(resume, jd)
+        result['source'] = 'local'
+        return result
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'uptime': round(time.time() - self.started, 3),
+            'requests': self.requests,
+            'coalesced': self.coalescer.merged,
+            'jd_cache': self.jd_indexes.stats(),
+            'result_cache': self.results.stats(),
+            'providers': scheduler.summary(),
+            'near_duplicates': self._memo.stats() if self._memo else None,
+        }
+
+    def close(self):
+        with self._corpus_lock:
+            if self._corpus:
+                self._corpus.flush()
+
+
+def _provider_settings(service, body):
+    """Provider fields of a request; the key defaults to $<PROVIDER>_API_KEY
+
+    The service's own key is only sent to the provider's default endpoint or to
+    an API URL configured on the service (--api-url). A request naming any other
+    api_url must bring its own api_key, or the key would go to that URL.
+    """
+    provider = body.get('provider')
+    if not provider:
+        return None
+    api_url = body.get('api_url') or None
+    api_key = body.get('api_key')
+    if not api_key:
+        if api_url is not None and not service.allows_api_url(api_url):
+            raise ServiceError("api_url is not one of the service's configured API URLs; "
+                               "send an api_key with it", 403)
+        from provider_fanout import API_KEY_ENV_VARS
+        api_key = os.environ.get(API_KEY_ENV_VARS.get(provider, ''), '')
+    return {
+        'provider': provider,
+        'api_key': api_key,
+        'model': body.get('model') or None,
+        'api_url': api_url,
+        'refresh': bool(body.get('refresh')),
+    }
+
+
+def _priority(body):
+    """Scheduler priority of a request's provider calls ('interactive' by default)"""
+    name = body.get('priority') or 'interactive'
+    if name not in PRIORITIES:
+        raise ServiceError(f"priority must be one of: {', '.join(PRIORITIES)}")
+    return PRIORITIES[name]
+
+
+def _required(body, *names):
+    missing = [name for name in names if not isinstance(body.get(name), str)]
+    if missing:
+        raise ServiceError(f"missing field(s): {', '.join(missing)}")
+    return [body[name] for name in names]
+
+
+def _resume_text(service, body):
+    """(resume text, format) from a request's 'resume' text or 'path'"""
+    if isinstance(body.get('resume'), str):
+        return body['resume'], body.get('format') or 'pdf'
+    path, = _required(body, 'path')
+    read = service.read(path)
+    return read['content'], read['format']
+
+
+def handle_read(service, body):
+    path, = _required(body, 'path')
+    return service.read(path)
+
+
+def handle_fields(service, body):
+    resume, resume_format = _resume_text(service, body)
+    return service.fields(resume, resume_format)
+
+
+def handle_keywords(service, body):
+    resume, _ = _resume_text(service, body)
+    jd, = _required(body, 'jd')
+    return service.keywords(resume, jd)
+
+
+def handle_suggestions(service, body):
+    resume, resume_format = _resume_text(service, body)
+    jd, = _required(body, 'jd')
+    settings = _provider_settings(service, body)
+    if settings is None:
+        raise ServiceError("missing field(s): provider")
+    immutable_fields = body.get('immutable_fields')
+    if immutable_fields is None:
+        immutable_fields = extract_immutable_fields(resume, resume_format)
+    try:
+        with scheduling(_priority(body)):
+            return service.suggestions(resume, jd, immutable_fields, settings)
+    except ServiceError:
+        raise
+    except ImportError as e:
+        raise ServiceError(str(e), 501)
+    except Exception as e:
+        raise ServiceError(f"{settings['provider']} API call failed: {e}", 502)
+
+
+def handle_analyze(service, body):
+    resume, resume_format = _resume_text(service, body)
+    jd, = _required(body, 'jd')
+    with scheduling(_priority(body)):
+        return service.analyze(resume, resume_format, jd, _provider_settings(service, body))
+
+
+ROUTES = {
+    '/read': handle_read,
+    '/fields': handle_fields,
+    '/keywords': handle_keywords,
+    '/suggestions': handle_suggestions,
+    '/analyze': handle_analyze,
+}
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def setup(self):
+        super().setup()
+        if self.client_address:
+            # Headers and body are separate writes; without this Nagle's algorithm and
+            # delayed ACKs add ~40 ms to every keep-alive request
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def reject_browser_request(self, post=False):
+        """Send 403/415 for requests a web page could make; True if rejected
+
+        Browsers add an Origin header to cross-site requests, and a page can only
+        POST without a CORS preflight as text/plain or form data, never as JSON.
+        """
+        if self.headers.get("Origin") is not None:
+            self.close_connection = True
+            self.send_json(403, {"error": "cross-origin requests are not allowed"})
+            return True
+        content_type = (self.headers.get("Content-Type") or "").split(';')[0].strip().lower()
+        if post and content_type != "application/json":
+            self.close_connection = True
+            self.send_json(415, {"error": "request body must be sent as application/json"})
+            return True
+        return False
+
+    def do_GET(self):
+        if self.reject_browser_request():
+            return
+        if self.path.rstrip('/') == '/health':
+            self.send_json(200, self.server.service.health())
+        else:
+            self.send_json(404, {"error": f"unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        service.count_request()
+        if self.reject_browser_request(post=True):
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self.send_json(413, {"error": "request body too large"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self.send_json(400, {"error": "invalid JSON body"})
+            return
+
+        handler = ROUTES.get(self.path.rstrip('/'))
+        if handler is None or not isinstance(body, dict):
+            self.send_json(404 if handler is None else 400,
+                           {"error": f"unknown endpoint {self.path}" if handler is None
+                            else "request body must be a JSON object"})
+            return
+        try:
+            with trace(f"service{self.path}"):
+                result = handler(service, body)
+        except ServiceError as e:
+            self.send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self.send_json(200, result)
+
+
+class _ServiceServerMixin:
+    daemon_threads = True
+    # socketserver's default backlog of 5 makes bursts of new clients wait for SYN retries
+    request_queue_size = 128
+
+    def setup_service(self, service, verbose):
+        self.service = service
+        self.verbose = verbose
+
+
+class ServiceServer(_ServiceServerMixin, ThreadingHTTPServer):
+    """The service on a TCP port (127.0.0.1 by default)"""
+
+    def __init__(self, service, host="127.0.0.1", port=DEFAULT_PORT, verbose=False):
+        super().__init__((host, port), ServiceHandler)
+        self.setup_service(service, verbose)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class UnixServiceServer(_ServiceServerMixin, socketserver.ThreadingMixIn,
+                        socketserver.UnixStreamServer):
+    """The service on a Unix domain socket (no TCP port, file permissions apply)"""
+
+    def __init__(self, service, path, verbose=False):
+        if os.path.exists(path):
+            os.unlink(path)  # left over from a previous run
+        super().__init__(path, ServiceHandler)
+        self.setup_service(service, verbose)
+
+    @property
+    def url(self):
+        return f"unix://{self.server_address}"
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def start_service(service=None, socket_path=None, **options):
+    """Start the service on a background thread and return the server
+
+    Use server.url with ServiceClient and server.shutdown() to stop it.
+    """
+    service = service or AnalysisService()
+    if socket_path:
+        server = UnixServiceServer(service, socket_path, verbose=options.get('verbose', False))
+    else:
+        server = ServiceServer(service, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class ServiceClient:
+    """Thin client for a running service; one keep-alive connection per thread
+
+    url is 'http://host:port' or 'unix:///path/to/socket'.
+    """
+
+    def __init__(self, url, timeout=120):
+        self.url = url
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        import http.client
+        if self.url.startswith('unix://'):
+            path, timeout = self.url[len('unix://'):], self.timeout
+
+            class UnixHTTPConnection(http.client.HTTPConnection):
+                def connect(self):
+                    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    self.sock.settimeout(timeout)
+                    self.sock.connect(path)
+
+            return UnixHTTPConnection('localhost', timeout=timeout)
+        from urllib.parse import urlsplit
+        parts = urlsplit(self.url)
+        return http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=self.timeout)
+
+    def request(self, method, path, payload=None):
+        """Decoded JSON reply; raises ServiceError for error statuses"""
+        import http.client
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2):
+            connection = getattr(self._local, 'connection', None)
+            if connection is None:
+                connection = self._local.connection = self._connect()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                # The server closed an idle keep-alive connection: reconnect once
+                connection.close()
+                self._local.connection = None
+                if attempt or isinstance(e, TimeoutError):
+                    raise ServiceError(f"analysis service unreachable: {e}", 503)
+        reply = json.loads(data or b"{}")
+        if response.status != 200:
+            raise ServiceError(reply.get('error', f"HTTP {response.status}"), response.status)
+        return reply
+
+    def health(self):
+        return self.request("GET", "/health")
+
+    def read(self, path):
+        return self.request("POST", "/read", {'path': path})
+
+    def keywords(self, resume, jd):
+        return self.request("POST", "/keywords", {'resume': resume, 'jd': jd})
+
+    def analyze(self, resume, resume_format, jd, settings=None):
+        """(keywords, immutable_fields, reply) like the GUI's own analysis"""
+        payload = {'resume': resume, 'format': resume_format, 'jd': jd}
+        if settings and settings.get('api_key'):
+            payload.update({name: settings.get(name) for name in
+                            ('provider', 'api_key', 'model', 'api_url', 'refresh',
+                             'priority')})
+        reply = self.request("POST", "/analyze", payload)
+        return reply['keywords'], reply['immutable_fields'], reply
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local ATS analysis service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of a TCP port")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not use the on-disk text and AI response caches")
+    parser.add_argument("--corpus", action="store_true",
+                        help="Rank missing keywords by BM25 over the JD corpus statistics")
+    parser.add_argument("--near-duplicates", type=float, default=NEAR_DUPLICATE_THRESHOLD,
+                        metavar="THRESHOLD",
+                        help="Reuse AI suggestions for a resume and JD at least this similar "
+                             "to an earlier pair (default: %(default)s, 0 = off)")
+    parser.add_argument("--api-url", action="append", default=[], metavar="URL",
+                        help="Custom API URL that requests may use with the service's own "
+                             "*_API_KEY keys (repeatable); any other api_url needs its own key")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Write stage timings to FILE (.prom for Prometheus text format)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    text_cache = response_cache = None
+    if not args.no_cache:
+        from disk_cache import DiskCache
+        from response_cache import ResponseCache
+        text_cache, response_cache = DiskCache(), ResponseCache()
+    configure_metrics(args.metrics)
+    service = AnalysisService(text_cache, response_cache, corpus=args.corpus,
+                              near_duplicates=args.near_duplicates, api_urls=args.api_url)
+
+    if args.socket:
+        server = UnixServiceServer(service, args.socket, verbose=args.verbose)
+    else:
+        server = ServiceServer(service, args.host, args.port, verbose=args.verbose)
+    print(f"Analysis service listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        metrics.close()
+
+
+if __name__ == "__main__":
+    main()
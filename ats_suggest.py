@@ -0,0 +1,816 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ATS Keyword Suggestor - command line interface
+Headless entry point for screening many resumes without opening the GUI
+
+Usage:
+    python ats_suggest.py batch --jd jd.txt resumes/ [--workers 8] [--output results.jsonl]
+    python ats_suggest.py batch --jd jd.txt resumes/ --output results.parquet (or .csv, --append)
+    python ats_suggest.py matrix --jds jds/ resumes/ [--top-k 5] [--output ranking.jsonl]
+    python ats_suggest.py rank --jd jd.txt resumes/ [--top-k 50] [--output ranking.jsonl]
+    python ats_suggest.py suggest --jd jd.txt resumes/ --provider openai --provider anthropic [--mode hedge]
+    python ats_suggest.py dedupe resumes/ [--jds jds/] [--threshold 0.85]
+    python ats_suggest.py store resumes/ [--store DIR]
+    python ats_suggest.py rank --jd jd.txt --store [DIR] [--top-k 50]
+
+Every command also takes --metrics FILE (stage timings) and --profile FILE (cProfile).
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+
+from disk_cache import DiskCache
+from jd_index import JDMatrix, MatchRanking
+from keyword_engine import DocumentIndex, compare_documents
+from pipeline_metrics import (collect_spans, configure, format_summary, metrics, profiled, span,
+                              trace)
+from resume_reader import (read_resume_cached, extract_immutable_fields, iter_resume_files,
+                           resume_format_for)
+
+# NumPy (corpus, similarity), asyncio (provider fan-out) and process pools are
+# imported by the commands that use them, so startup only pays for what runs
+
+
+# Per-worker state, built once by the pool initializers
+_jd_index = None
+_jd_weights = None
+_jd_matrix = None
+_text_cache = None
+_token_store = None
+_store_query = None
+
+
+def _init_worker(jd, cache=None, weights=None):
+    global _jd_index, _jd_weights, _text_cache
+    _jd_index = DocumentIndex(jd)
+    _jd_weights = weights
+    _text_cache = cache
+
+
+def _init_reader_worker(cache=None):
+    global _text_cache
+    _text_cache = cache
+
+
+def _init_matrix_worker(jds, cache=None):
+    global _jd_matrix, _text_cache
+    _jd_matrix = JDMatrix(jds)
+    _text_cache = cache
+
+
+def _cache_status(hit):
+    if _text_cache is None:
+        return 'off'
+    return 'hit' if hit else 'miss'
+
+
+def analyze_resume_file(file_path):
+    """Analyze one resume against the worker's JD and return a JSON-ready record"""
+    started = time.perf_counter()
+    try:
+        with trace(file_path):
+            content, resume_format, hit = read_resume_cached(file_path, _text_cache)
+            return {
+                'file': file_path,
+                'format': resume_format,
+                'cache': _cache_status(hit),
+                'immutable_fields': extract_immutable_fields(content, resume_format),
+                'keywords': compare_documents(DocumentIndex(content), _jd_index, _jd_weights),
+                'seconds': round(time.perf_counter() - started, 4),
+            }
+    except Exception as e:
+        return {'file': file_path, 'error': str(e)}
+
+
+def score_resume_file(file_path):
+    """Score one resume against every JD in the worker's matrix"""
+    try:
+        with trace(file_path):
+            content, resume_format, hit = read_resume_cached(file_path, _text_cache)
+            return file_path, _jd_matrix.scores(DocumentIndex(content)), _cache_status(hit), None
+    except Exception as e:
+        return file_path, None, None, str(e)
+
+
+def signature_resume_file(file_path):
+    """MinHash signature of one resume, for near-duplicate detection in the parent"""
+    from near_duplicates import minhash
+    try:
+        with trace(file_path):
+            content, _, hit = read_resume_cached(file_path, _text_cache)
+            return file_path, minhash(content), _cache_status(hit), None
+    except Exception as e:
+        return file_path, None, None, str(e)
+
+
+def vectorize_resume_file(file_path):
+    """Hashed term vector of one resume, for scoring in the parent process"""
+    from similarity import term_vector
+    try:
+        with trace(file_path):
+            content, resume_format, hit = read_resume_cached(file_path, _text_cache)
+            return file_path, term_vector(content), _cache_status(hit), None
+    except Exception as e:
+        return file_path, None, None, str(e)
+
+
+def tokenize_resume_file(file_path):
+    """Stored tokens and content digest of one resume, interned by the parent"""
+    from corpus_stats import document_digest
+    from token_store import tokenize
+    try:
+        with trace(file_path):
+            content, _, hit = read_resume_cached(file_path, _text_cache)
+            return file_path, (tokenize(content), document_digest(content)), _cache_status(hit), None
+    except Exception as e:
+        return file_path, None, None, str(e)
+
+
+def _init_store_worker(store, query):
+    global _token_store, _store_query
+    _token_store = store
+    _store_query = query
+
+
+def score_store_range(bounds):
+    """Scores of a range of stored documents, read from the worker's mapped store"""
+    from token_store import score_range
+    start, end = bounds
+    with trace(f"documents {start}-{end}"):
+        return start, score_range(_token_store, _store_query, start, end)
+
+
+def _map_in_pool(func, paths, initializer, initargs, workers, chunksize):
+    """Yield func(path) in input order, in-process when workers == 1
+
+    While metrics are recorded, each result comes back with the spans of its
+    call, so timings made in worker processes reach this process's sinks.
+    """
+    if not metrics.active:
+        yield from _map_calls(func, paths, initializer, initargs, workers, chunksize)
+        return
+    timed_results = _map_calls(functools.partial(collect_spans, func), paths, initializer,
+                               initargs, workers, chunksize)
+    for result, records in timed_results:
+        metrics.record_many(records)
+        yield result
+
+
+def _map_calls(func, paths, initializer, initargs, workers, chunksize):
+    if workers == 1:
+        initializer(*initargs)
+        for path in paths:
+            yield func(path)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                             initargs=initargs) as executor:
+        yield from executor.map(func, paths, chunksize=chunksize)
+
+
+def run_batch(jd, paths, workers=None, chunksize=16, cache=None, corpus=None):
+    """Yield one result record per resume, in input order, using a process pool
+
+    With a CorpusStats the JD is counted into the corpus and missing keywords are
+    ranked by BM25; the weights are computed once here and shipped to the workers.
+    """
+    weights = None
+    if corpus is not None:
+        jd_index = DocumentIndex(jd)
+        corpus.add_document(jd_index)
+        corpus.flush()
+        weights = corpus.bm25_weights(jd_index)
+    return _map_in_pool(analyze_resume_file, paths, _init_worker, (jd, cache, weights),
+                        workers, chunksize)
+
+
+def run_matrix(jds, paths, top_k=5, workers=None, chunksize=16, cache=None, corpus=None):
+    """Yield one record per resume with its best JDs, then one record per JD
+
+    jds: list of (name, text) pairs. Each worker builds the JD matrix once; every
+    resume is read and tokenized once no matter how many JDs there are. With a
+    CorpusStats every JD is also counted into the corpus.
+    """
+    if corpus is not None:
+        for _, text in jds:
+            corpus.add_document(DocumentIndex(text))
+        corpus.flush()
+    ranking = MatchRanking([name for name, _ in jds], top_k)
+    scored = _map_in_pool(score_resume_file, paths, _init_matrix_worker, (jds, cache),
+                          workers, chunksize)
+    for file_path, scores, cache_status, error in scored:
+        if error is not None:
+            yield {'file': file_path, 'error': error}
+            continue
+        best = ranking.add(file_path, scores)
+        yield {'file': file_path, 'cache': cache_status,
+               'top_jds': [{'jd': name, 'score': round(score, 4)} for name, score in best]}
+
+    for name, best in ranking.jd_rankings().items():
+        yield {'jd': name,
+               'top_resumes': [{'file': file, 'score': round(score, 4)} for file, score in best]}
+
+
+def run_rank(jd, paths, top_k=None, workers=None, chunksize=16, cache=None, corpus=None):
+    """Yield resumes ranked by match score against one JD, best first, then any failures
+
+    Workers read and vectorize the resumes; all of them are scored in one
+    vectorized call. With a CorpusStats the JD's terms carry BM25 weights.
+    """
+    from similarity import TermVectors, score_batch, term_vector
+
+    jd_index = DocumentIndex(jd)
+    weights = None
+    if corpus is not None:
+        corpus.add_document(jd_index)
+        corpus.flush()
+        weights = corpus.bm25_weights(jd_index)
+
+    names, vectors, statuses, failures = [], [], [], []
+    for file_path, vector, cache_status, error in _map_in_pool(
+            vectorize_resume_file, paths, _init_reader_worker, (cache,), workers, chunksize):
+        if error is not None:
+            failures.append({'file': file_path, 'error': error})
+            continue
+        names.append(file_path)
+        vectors.append(vector)
+        statuses.append(cache_status)
+
+    resumes = TermVectors(vectors, names)
+    jd_vector = term_vector(jd_index, weights)
+    cosine = score_batch(jd_vector, resumes, 'cosine')
+    overlap = score_batch(jd_vector, resumes, 'overlap')
+    # Stable sort: equal scores keep input order
+    order = sorted(range(len(names)), key=lambda i: -cosine[i])
+    for rank, i in enumerate(order[:top_k], 1):
+        yield {'file': names[i], 'rank': rank, 'cache': statuses[i],
+               'cosine': round(float(cosine[i]), 4), 'overlap': round(float(overlap[i]), 4)}
+    yield from failures
+
+
+def run_store(paths, store, workers=None, chunksize=16, cache=None):
+    """Yield one record per resume added to a TokenStore, then any failures
+
+    Workers read and tokenize the resumes; the parent interns the tokens and
+    appends them. Resumes whose text is already stored are reported as such.
+    """
+    failures = []
+    for file_path, tokenized, cache_status, error in _map_in_pool(
+            tokenize_resume_file, paths, _init_reader_worker, (cache,), workers, chunksize):
+        if error is not None:
+            failures.append({'file': file_path, 'error': error})
+            continue
+        tokens, digest = tokenized
+        doc_id = store.add_tokens(file_path, tokens, digest)
+        yield {'file': file_path, 'cache': cache_status, 'document': doc_id,
+               'tokens': len(tokens), 'stored': doc_id is not None}
+    store.flush()
+    yield from failures
+
+
+def run_rank_store(jd, store, top_k=None, workers=None, corpus=None, missing=10):
+    """Yield the resumes of a TokenStore ranked by match score against one JD, best first
+
+    Same scores as run_rank, computed over the store's mapped token arrays in
+    ranges of documents, one range per worker task (workers reopen the store
+    read-only and share its pages). Only the latest document of each name is
+    ranked; each record lists the `missing` JD keywords it lacks most.
+    """
+    import numpy as np
+    from token_store import SCORE_BLOCK_TOKENS, jd_query, missing_terms
+
+    jd_index = DocumentIndex(jd)
+    weights = None
+    if corpus is not None:
+        corpus.add_document(jd_index)
+        corpus.flush()
+        weights = corpus.bm25_weights(jd_index)
+
+    query = jd_query(store, jd_index, weights)
+    tokens, ends, _, _ = store.arrays()
+    # About SCORE_BLOCK_TOKENS tokens per task, cut at document boundaries
+    cuts = np.searchsorted(ends, np.arange(SCORE_BLOCK_TOKENS, len(tokens), SCORE_BLOCK_TOKENS))
+    bounds = np.unique(np.concatenate([[0], cuts, [len(ends)]])).tolist()
+    cosine = np.zeros(len(ends), dtype=np.float64)
+    overlap = np.zeros(len(ends), dtype=np.float64)
+    for start, (range_cosine, range_overlap) in _map_in_pool(
+            score_store_range, list(zip(bounds, bounds[1:])), _init_store_worker, (store, query),
+            workers, 1):
+        cosine[start:start + len(range_cosine)] = range_cosine
+        overlap[start:start + len(range_overlap)] = range_overlap
+
+    candidates = np.flatnonzero(store.latest())
+    # Stable sort: equal scores keep insertion order
+    order = candidates[np.argsort(-cosine[candidates], kind='stable')][:top_k]
+    for rank, doc_id in enumerate(order.tolist(), 1):
+        yield {'file': store.name(doc_id), 'rank': rank, 'document': doc_id,
+               'cosine': round(float(cosine[doc_id]), 4),
+               'overlap': round(float(overlap[doc_id]), 4),
+               'missing_keywords': missing_terms(store, doc_id, query, missing)}
+
+
+def run_dedupe(paths, jds=(), threshold=None, workers=None, chunksize=16, cache=None):
+    """Yield one record per cluster of near-duplicate resumes, then per cluster of JDs
+
+    jds: list of (name, text) pairs. Workers read the resumes and compute their
+    MinHash signatures; clustering in the parent only compares documents that
+    share an LSH band. Resumes that could not be read are yielded as failures.
+    """
+    from near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex, similarity
+
+    failures = []
+    for kind in ('resume', 'jd'):
+        index = NearDuplicateIndex(threshold or DEFAULT_THRESHOLD)
+        if kind == 'resume':
+            for file_path, signature, _, error in _map_in_pool(
+                    signature_resume_file, paths, _init_reader_worker, (cache,), workers,
+                    chunksize):
+                if error is not None:
+                    failures.append({'file': file_path, 'error': error})
+                else:
+                    index.add(file_path, signature=signature)
+        else:
+            for name, text in jds:
+                index.add(name, text)
+        for number, files in enumerate(index.clusters(), 1):
+            first = index.signature_of(files[0])
+            yield {'cluster': number, 'kind': kind, 'files': files,
+                   'similarity': [round(similarity(first, index.signature_of(file)), 4)
+                                  for file in files]}
+    yield from failures
+
+
+def near_duplicate_resumes(paths, threshold):
+    """({path: (earlier path, similarity)}, {path: text}) of resumes repeating an earlier one
+
+    Unreadable files are skipped here and reported when they are analyzed.
+    """
+    from near_duplicates import NearDuplicateIndex
+
+    index = NearDuplicateIndex(threshold)
+    duplicates, texts = {}, {}
+    for file_path in paths:
+        try:
+            content, _, _ = read_resume_cached(file_path, None)
+        except Exception:
+            continue
+        texts[file_path] = content
+        signature = index.signature(content)
+        matches = index.query(signature=signature)
+        if matches:
+            duplicates[file_path] = matches[0]
+        else:
+            index.add(file_path, signature=signature)
+    return duplicates, texts
+
+
+def read_text_file(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def iter_jd_files(root):
+    """Yield .txt job description files under a file or directory, in sorted order"""
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith('.txt'):
+                yield os.path.join(dirpath, filename)
+
+
+def collect_resume_paths(roots):
+    paths = []
+    for root in roots:
+        paths.extend(iter_resume_files(root))
+    return paths
+
+
+def write_records(records, output, total, export_format=None, append=False):
+    """Write records to output (or stream them to stdout) and report failures on stderr
+
+    Files are written in batches by suggestion_export.ExportWriter: JSON Lines,
+    CSV, Parquet or Arrow, by export_format or the file extension. stdout gets
+    each record as a JSON line as soon as it is ready.
+    """
+    from suggestion_export import ExportWriter, format_for
+
+    if output:
+        try:
+            # Any file name without a known extension gets JSON Lines, as always
+            writer = ExportWriter(output, export_format or format_for(output, 'jsonl'), append)
+        except (ImportError, ValueError) as e:
+            print(e, file=sys.stderr)
+            return 2
+    elif export_format not in (None, 'jsonl'):
+        print(f"--format {export_format} needs an --output file", file=sys.stderr)
+        return 2
+    else:
+        writer = None
+    errors = 0
+    cache_hits = 0
+    try:
+        for record in records:
+            errors += 'error' in record
+            cache_hits += record.get('cache') == 'hit'
+            with span('render'):
+                if writer is not None:
+                    writer.write(record)
+                else:
+                    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    sys.stdout.flush()
+    finally:
+        if writer is not None:
+            with span('render'):
+                writer.close()
+
+    print(f"Analyzed {total} resumes ({errors} failed, {cache_hits} cache hits)",
+          file=sys.stderr)
+    return 1 if errors and errors == total else 0
+
+
+def open_text_cache(args):
+    if args.no_cache:
+        return None
+    return DiskCache(args.cache, max_bytes=args.cache_size * 1024 * 1024)
+
+
+def open_corpus(args):
+    if args.no_corpus:
+        return None
+    from corpus_stats import CorpusStats
+    return CorpusStats(args.corpus)
+
+
+def cmd_dedupe(args):
+    jds = []
+    for root in args.jds or ():
+        jds.extend((path, read_text_file(path)) for path in iter_jd_files(root))
+    paths = collect_resume_paths(args.resumes)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    clusters = {'resume': 0, 'jd': 0}
+    duplicates = {'resume': 0, 'jd': 0}
+    errors = 0
+    try:
+        for record in run_dedupe(paths, jds, args.threshold, workers=args.workers,
+                                 chunksize=args.chunksize, cache=open_text_cache(args)):
+            if 'error' in record:
+                errors += 1
+            else:
+                clusters[record['kind']] += 1
+                duplicates[record['kind']] += len(record['files']) - 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(paths)} resumes: {clusters['resume']} near-duplicate clusters, "
+          f"{duplicates['resume']} redundant copies ({errors} unreadable)", file=sys.stderr)
+    if jds:
+        print(f"{len(jds)} JDs: {clusters['jd']} near-duplicate clusters, "
+              f"{duplicates['jd']} redundant copies", file=sys.stderr)
+    return 1 if paths and errors == len(paths) else 0
+
+
+def cmd_batch(args):
+    jd = read_text_file(args.jd)
+    paths = collect_resume_paths(args.resumes)
+    records = run_batch(jd, paths, workers=args.workers, chunksize=args.chunksize,
+                        cache=open_text_cache(args), corpus=open_corpus(args))
+    return write_records(records, args.output, len(paths), args.format, args.append)
+
+
+def cmd_matrix(args):
+    jds = []
+    for root in args.jds:
+        jds.extend((path, read_text_file(path)) for path in iter_jd_files(root))
+    if not jds:
+        print("No job description (.txt) files found", file=sys.stderr)
+        return 1
+
+    paths = collect_resume_paths(args.resumes)
+    records = run_matrix(jds, paths, top_k=args.top_k, workers=args.workers,
+                         chunksize=args.chunksize, cache=open_text_cache(args),
+                         corpus=open_corpus(args))
+    return write_records(records, args.output, len(paths))
+
+
+def open_token_store(path, readonly=False):
+    from token_store import TokenStore
+    return TokenStore(path or None, readonly=readonly)
+
+
+def cmd_store(args):
+    store = open_token_store(args.store)
+    paths = collect_resume_paths(args.resumes)
+    records = run_store(paths, store, workers=args.workers, chunksize=args.chunksize,
+                        cache=open_text_cache(args))
+    status = write_records(records, args.output, len(paths))
+    store.close()
+    print(f"Token store {store.path}: {len(store)} documents, {store.tokens_count} tokens",
+          file=sys.stderr)
+    return status
+
+
+def cmd_rank(args):
+    jd = read_text_file(args.jd)
+    if args.store is not None:
+        if args.resumes:
+            print("Rank either resume files or a --store, not both", file=sys.stderr)
+            return 2
+        store = open_token_store(args.store, readonly=True)
+        records = run_rank_store(jd, store, top_k=args.top_k, workers=args.workers,
+                                 corpus=open_corpus(args))
+        return write_records(records, args.output, int(store.latest().sum()),
+                             args.format, args.append)
+    if not args.resumes:
+        print("No resumes to rank: pass files or directories, or --store", file=sys.stderr)
+        return 2
+    paths = collect_resume_paths(args.resumes)
+    records = run_rank(jd, paths, top_k=args.top_k, workers=args.workers,
+                       chunksize=args.chunksize, cache=open_text_cache(args),
+                       corpus=open_corpus(args))
+    return write_records(records, args.output, len(paths), args.format, args.append)
+
+
+def suggest_for_resume(file_path, jd, configs, cache, args, content=None):
+    """AI suggestions for one resume from the first provider to answer"""
+    from llm_providers import build_prompt, prompt_token_budget
+    from provider_fanout import get_first_suggestions, provider_label
+    from provider_scheduler import BULK, scheduling
+    started = time.perf_counter()
+    try:
+        with trace(file_path), scheduling(BULK):
+            if content is None:
+                content, resume_format, _ = read_resume_cached(file_path, None)
+            else:
+                resume_format = resume_format_for(file_path)
+            immutable_fields = extract_immutable_fields(content, resume_format)
+            # One prompt goes to every provider, so it must fit the smallest budget
+            budget = args.prompt_tokens or min(
+                prompt_token_budget(config['provider'], config.get('model')) for config in configs)
+            prompt = build_prompt(content, jd, immutable_fields, budget)
+            config, suggestions, cache_hit = get_first_suggestions(
+                prompt, configs, mode=args.mode, timeout=args.timeout, cache=cache,
+                refresh=args.refresh)
+        return {
+            'file': file_path,
+            'provider': provider_label(config),
+            'cache': 'off' if cache is None else ('hit' if cache_hit else 'miss'),
+            'immutable_fields': immutable_fields,
+            'keywords': suggestions,
+            'seconds': round(time.perf_counter() - started, 4),
+        }
+    except Exception as e:
+        return {'file': file_path, 'error': str(e)}
+
+
+def with_near_duplicates(paths, records, duplicates, texts):
+    """Records in path order, built for near-duplicates from the resume they repeat
+
+    A near-duplicate gets that resume's suggestions minus the keywords its own
+    edits added (see adapt_suggestions), and its own immutable fields.
+    """
+    from near_duplicates import adapt_suggestions
+
+    sources = {source for source, _ in duplicates.values()}
+    done = {}
+    records = iter(records)
+    for file_path in paths:
+        if file_path not in duplicates:
+            record = next(records)
+            if file_path in sources:
+                done[file_path] = record
+            yield record
+            continue
+        source, score = duplicates[file_path]
+        original = done[source]
+        if 'error' in original:
+            yield {'file': file_path, 'duplicate_of': source,
+                   'error': f"near-duplicate of a failed resume: {original['error']}"}
+            continue
+        resume_format = resume_format_for(file_path)
+        yield {
+            'file': file_path,
+            'provider': original['provider'],
+            'cache': 'near-duplicate',
+            'duplicate_of': source,
+            'similarity': round(score, 4),
+            'immutable_fields': extract_immutable_fields(texts[file_path], resume_format),
+            'keywords': adapt_suggestions(original['keywords'], texts[file_path], texts[source]),
+        }
+
+
+def cmd_suggest(args):
+    from concurrent.futures import ThreadPoolExecutor
+    from provider_fanout import latency_stats, parse_provider_spec
+    from provider_scheduler import parse_rate_limits, scheduler
+    from response_cache import ResponseCache
+
+    jd = read_text_file(args.jd)
+    paths = collect_resume_paths(args.resumes)
+    configs = [parse_provider_spec(spec) for spec in args.provider]
+    cache = None if args.no_cache else ResponseCache()
+    for label, limits in parse_rate_limits(args.rate_limit or "").items():
+        provider, _, model = label.partition(':')
+        scheduler.configure(provider, limits, model or None)
+
+    # Near-duplicates of an earlier resume reuse its suggestions instead of a call
+    duplicates, texts = {}, {}
+    if args.near_duplicates:
+        duplicates, texts = near_duplicate_resumes(paths, args.near_duplicates)
+        if duplicates:
+            print(f"{len(duplicates)} near-duplicate resume(s) will reuse the suggestions of "
+                  f"{len({source for source, _ in duplicates.values()})} other(s)",
+                  file=sys.stderr)
+    unique = [path for path in paths if path not in duplicates]
+
+    # Resumes are sent concurrently, at most --concurrency requests in flight
+    suggest = lambda path: suggest_for_resume(path, jd, configs, cache, args, texts.get(path))
+    if args.concurrency == 1:
+        records = with_near_duplicates(paths, map(suggest, unique), duplicates, texts)
+        status = write_records(records, args.output, len(paths), args.format, args.append)
+    else:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            records = with_near_duplicates(paths, executor.map(suggest, unique), duplicates,
+                                           texts)
+            status = write_records(records, args.output, len(paths), args.format, args.append)
+
+    for label, stats in latency_stats.summary().items():
+        print(f"{label}: {stats['count']} calls, p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s",
+              file=sys.stderr)
+    for label, outcomes in latency_stats.outcomes().items():
+        if outcomes['cancelled'] or outcomes['late']:
+            print(f"{label}: {outcomes['cancelled']} attempts cancelled, {outcomes['late']} "
+                  f"replied after losing (sent and paid for)", file=sys.stderr)
+    for label, stats in scheduler.summary().items():
+        print(f"{label}: {stats['sent']} sent, {stats['throttled']} rate limited (429), "
+              f"{stats['expired']} expired and {stats['cancelled']} cancelled in queue, "
+              f"queue wait p50 {stats['wait_p50']:.2f}s, p95 {stats['wait_p95']:.2f}s",
+              file=sys.stderr)
+    return status
+
+
+def add_pool_arguments(parser):
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: CPU count, 1 = no pool)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="Resumes handed to a worker at a time")
+    parser.add_argument("--cache", help="Extracted text cache file (default: ATS_CACHE_DIR)")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="Text cache size limit in MB")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-extract resume text")
+    parser.add_argument("--corpus", help="JD corpus statistics directory (default: ATS_CACHE_DIR/corpus)")
+    parser.add_argument("--no-corpus", action="store_true",
+                        help="Rank missing keywords by frequency and leave the corpus untouched")
+    parser.add_argument("--output", "-o", help="JSON Lines output file (default: stdout)")
+
+
+def add_export_arguments(parser):
+    parser.add_argument("--format", choices=["jsonl", "csv", "parquet", "arrow"],
+                        help="--output file format (default: by extension - .jsonl, .csv, "
+                             ".parquet or a directory, .arrow; anything else gets JSON Lines)")
+    parser.add_argument("--append", action="store_true",
+                        help="Add to an existing JSON Lines/CSV --output (or a new part file "
+                             "to a Parquet directory) instead of replacing it")
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Record stage timings: JSON Lines spans, or a Prometheus text "
+                             "file if FILE ends in .prom (default: ATS_METRICS_FILE)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Save a cProfile of the run to FILE (runs in one process/thread)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ats-suggest",
+                                     description="ATS Keyword Suggestor command line tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser("batch", help="Score a directory of resumes against one JD")
+    batch.add_argument("resumes", nargs="+", help="Resume files or directories (.tex/.pdf)")
+    batch.add_argument("--jd", required=True, help="Job description text file")
+    add_pool_arguments(batch)
+    add_export_arguments(batch)
+    add_metrics_arguments(batch)
+    batch.set_defaults(func=cmd_batch)
+
+    matrix = subparsers.add_parser("matrix", help="Rank many resumes against many JDs")
+    matrix.add_argument("resumes", nargs="+", help="Resume files or directories (.tex/.pdf)")
+    matrix.add_argument("--jds", action="append", required=True,
+                        help="Job description .txt file or directory (repeatable)")
+    matrix.add_argument("--top-k", type=int, default=5,
+                        help="Matches to keep per resume and per JD")
+    add_pool_arguments(matrix)
+    add_metrics_arguments(matrix)
+    matrix.set_defaults(func=cmd_matrix)
+
+    rank = subparsers.add_parser("rank", help="Rank resumes by match score against one JD")
+    rank.add_argument("resumes", nargs="*", help="Resume files or directories (.tex/.pdf)")
+    rank.add_argument("--jd", required=True, help="Job description text file")
+    rank.add_argument("--top-k", type=int, help="Only output the best K resumes")
+    rank.add_argument("--store", nargs="?", const="", metavar="DIR",
+                      help="Rank the resumes of a token store (see `store`) instead of files "
+                           "(default DIR: ATS_CACHE_DIR/resumes)")
+    add_pool_arguments(rank)
+    add_export_arguments(rank)
+    add_metrics_arguments(rank)
+    rank.set_defaults(func=cmd_rank)
+
+    dedupe = subparsers.add_parser("dedupe", help="Report clusters of near-duplicate resumes "
+                                                  "and JDs")
+    dedupe.add_argument("resumes", nargs="*", help="Resume files or directories (.tex/.pdf)")
+    dedupe.add_argument("--jds", action="append",
+                        help="Job description .txt file or directory (repeatable)")
+    dedupe.add_argument("--threshold", type=float,
+                        help="Estimated word-shingle Jaccard similarity that counts as a "
+                             "near-duplicate (default: 0.85)")
+    add_pool_arguments(dedupe)
+    add_metrics_arguments(dedupe)
+    dedupe.set_defaults(func=cmd_dedupe)
+
+    store = subparsers.add_parser("store", help="Add resumes to a compact token store for "
+                                                "repeated ranking")
+    store.add_argument("resumes", nargs="+", help="Resume files or directories (.tex/.pdf)")
+    store.add_argument("--store", metavar="DIR",
+                       help="Token store directory (default: ATS_CACHE_DIR/resumes)")
+    add_pool_arguments(store)
+    add_metrics_arguments(store)
+    store.set_defaults(func=cmd_store)
+
+    suggest = subparsers.add_parser("suggest", help="AI suggestions from one or more providers")
+    suggest.add_argument("resumes", nargs="+", help="Resume files or directories (.tex/.pdf)")
+    suggest.add_argument("--jd", required=True, help="Job description text file")
+    suggest.add_argument("--provider", action="append", required=True,
+                         help="NAME[:MODEL][@URL], repeatable; keys come from "
+                              "OPENAI_API_KEY, ANTHROPIC_API_KEY, GOOGLE_API_KEY, CUSTOM_API_KEY")
+    suggest.add_argument("--mode", choices=["race", "hedge"], default="race",
+                         help="race: ask all providers at once; hedge: ask the next provider "
+                              "only when the current one is slower than its p95 latency")
+    suggest.add_argument("--timeout", type=float, default=120, help="Timeout per resume in seconds")
+    suggest.add_argument("--concurrency", type=int, default=4,
+                         help="Resumes analyzed at the same time")
+    suggest.add_argument("--rate-limit", metavar="SPEC",
+                         help="Provider limits as NAME[:MODEL]=REQUESTS/MIN[/TOKENS/MIN"
+                              "[/IN_FLIGHT]], comma-separated (default: PROVIDER_RATE_LIMITS / "
+                              "ATS_RATE_LIMITS)")
+    suggest.add_argument("--prompt-tokens", type=int,
+                         help="Prompt size budget in tokens (default: per provider, see "
+                              "PROMPT_TOKEN_BUDGETS / ATS_PROMPT_TOKENS)")
+    suggest.add_argument("--near-duplicates", type=float, nargs="?", const=0.85, metavar="THRESHOLD",
+                         help="Reuse the suggestions of an earlier resume at least THRESHOLD "
+                              "similar (default 0.85) instead of calling a provider again")
+    suggest.add_argument("--output", "-o", help="Output file (default: JSON Lines on stdout)")
+    add_export_arguments(suggest)
+    suggest.add_argument("--refresh", action="store_true",
+                         help="Ignore cached suggestions and ask the providers again")
+    suggest.add_argument("--no-cache", action="store_true",
+                         help="Neither read nor store cached suggestions")
+    add_metrics_arguments(suggest)
+    suggest.set_defaults(func=cmd_suggest)
+
+    return parser
+
+
+def run_command(args):
+    """Run the selected command, profiled and/or timed as requested"""
+    if not args.profile:
+        return args.func(args)
+
+    # cProfile only sees the calling thread: keep all the work on it
+    if hasattr(args, 'workers'):
+        args.workers = 1
+    if hasattr(args, 'concurrency'):
+        args.concurrency = 1
+    with profiled(args.profile) as profile:
+        status = args.func(args)
+    print(profile.report, file=sys.stderr)
+    print(f"Profile saved to {args.profile}", file=sys.stderr)
+    return status
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    sink = configure(args.metrics)
+    try:
+        status = run_command(args)
+    finally:
+        metrics.close()
+    if sink is not None:
+        for line in format_summary(metrics.summary()):
+            print(line, file=sys.stderr)
+        print(f"Stage timings written to {sink.path}", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Corpus statistics scaling benchmark
+Adds synthetic JDs to a fresh CorpusStats and times updates, BM25 lookups, flush
+and reopening as the corpus grows; per-document costs should stay flat
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus_stats import CorpusStats
+from keyword_engine import DocumentIndex
+from bench_keyword_engine import best_of, synthetic_text
+
+
+def main(total=200000, checkpoints=(1000, 10000, 50000, 200000)):
+    rng = random.Random(42)
+    # A pool of pre-tokenized JDs keeps the benchmark about the corpus, not tokenizing
+    pool = [DocumentIndex(synthetic_text(rng, 400)) for _ in range(500)]
+    texts = [jd.text for jd in pool]
+    directory = tempfile.mkdtemp(prefix="corpus_bench_")
+    try:
+        corpus = CorpusStats(directory)
+        print(f"{'documents':>10} {'terms':>8} {'add us/doc':>11} {'bm25 ms':>8} "
+              f"{'flush ms':>9} {'open ms':>8}")
+        added = 0
+        add_time = 0.0
+        for checkpoint in checkpoints:
+            if checkpoint > total:
+                break
+            batch_start = added
+            start = time.perf_counter()
+            while added < checkpoint:
+                jd = pool[added % len(pool)]
+                # Unique text per document so the digest check never skips it
+                jd.text = f"{added} {texts[added % len(pool)]}"
+                corpus.add_document(jd)
+                added += 1
+            add_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            corpus.flush()
+            flush_time = time.perf_counter() - start
+            bm25_time = best_of(lambda: corpus.bm25_weights(pool[0]))
+            start = time.perf_counter()
+            CorpusStats(directory).close()
+            open_time = time.perf_counter() - start
+            print(f"{added:>10} {len(corpus):>8} {add_time * 1e6 / (added - batch_start):>11.1f} "
+                  f"{bm25_time * 1000:>8.3f} {flush_time * 1000:>9.1f} {open_time * 1000:>8.1f}")
+        corpus.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
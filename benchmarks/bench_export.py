@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suggestion export benchmark
+Writes 100k synthetic analysis records (immutable fields, keyword lists, scores,
+timings) with ExportWriter in every available format, and with the previous
+one-write-and-flush-per-record JSON Lines output for comparison
+
+Usage:
+    python benchmarks/bench_export.py [--records 100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from suggestion_export import ExportWriter
+from bench_keyword_engine import WORDS
+
+
+def synthetic_record(rng, number):
+    words = lambda count: [rng.choice(WORDS).title() for _ in range(count)]
+    return {
+        'file': f"resumes/candidate{number:06d}.pdf",
+        'format': 'pdf',
+        'provider': rng.choice(['openai:gpt-4o-mini', 'anthropic', 'local']),
+        'cache': rng.choice(['hit', 'miss']),
+        'seconds': round(rng.uniform(0.01, 3.0), 4),
+        'immutable_fields': {'name': f"Candidate {number}", 'email': f"c{number}@example.com",
+                             'phone': '+1 555 010 0000'},
+        'keywords': {
+            'missing_keywords': words(20),
+            'technical_terms': words(15),
+            'key_phrases': [" ".join(words(2)) for _ in range(15)],
+            'suggestions': {'skills': words(10), 'experience': [" ".join(words(2))] * 8,
+                            'action_verbs': words(6)},
+        },
+    }
+
+
+def per_record(records, path):
+    """The previous write_records file output: one write and flush per record"""
+    with open(path, 'w', encoding='utf-8') as out:
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggestion export benchmark")
+    parser.add_argument("--records", type=int, default=100000, help="Records to export")
+    args = parser.parse_args()
+
+    rng = random.Random(9)
+    records = [synthetic_record(rng, number) for number in range(args.records)]
+    directory = tempfile.mkdtemp(prefix="export_bench_")
+    try:
+        print(f"{'output':>24} {'seconds':>8} {'records/s':>10} {'MB':>7}")
+
+        def report(label, path, seconds):
+            size = os.path.getsize(path) / 2**20
+            print(f"{label:>24} {seconds:>8.2f} {len(records) / seconds:>10,.0f} {size:>7.1f}")
+
+        path = os.path.join(directory, 'per_record.jsonl')
+        started = time.perf_counter()
+        per_record(records, path)
+        report("per-record flush jsonl", path, time.perf_counter() - started)
+
+        for export_format, extension in (('jsonl', 'jsonl'), ('csv', 'csv'),
+                                         ('parquet', 'parquet'), ('arrow', 'arrow')):
+            path = os.path.join(directory, f"results.{extension}")
+            started = time.perf_counter()
+            try:
+                with ExportWriter(path, export_format) as writer:
+                    writer.write_many(records)
+            except ImportError as e:
+                print(f"{export_format:>24} skipped: {e}")
+                continue
+            report(f"ExportWriter {export_format}", path, time.perf_counter() - started)
+
+        # Streaming batch jobs append in chunks
+        path = os.path.join(directory, 'appended.csv')
+        started = time.perf_counter()
+        for start in range(0, len(records), 10000):
+            with ExportWriter(path, append=True) as writer:
+                writer.write_many(records[start:start + 10000])
+        report("csv, appended by 10k", path, time.perf_counter() - started)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
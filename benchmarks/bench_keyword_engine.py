@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Keyword engine scaling benchmark
+Times extract_keywords on growing resume/JD sizes; time per word should stay flat
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_engine import extract_keywords
+
+
+WORDS = (
+    "Python Java SQL AWS Docker Kubernetes Terraform React experience team data "
+    "science machine learning pipelines distributed systems designed built led "
+    "managed deployed services customers platform reliability analytics Senior "
+    "Engineer cloud REST APIs testing mentoring stakeholders roadmap ownership"
+).split()
+
+
+def synthetic_text(rng, n_words):
+    """Random words with a sprinkling of unique tokens so the vocabulary grows"""
+    out = []
+    for i in range(n_words):
+        if i % 7 == 0:
+            out.append(f"term{rng.randrange(n_words)}")
+        else:
+            out.append(rng.choice(WORDS))
+        if i % 12 == 11:
+            out[-1] += "."
+    return " ".join(out)
+
+
+def best_of(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'words':>8} {'ms':>10} {'us/word':>10}")
+    for n_words in (1000, 4000, 16000, 64000):
+        resume = synthetic_text(rng, n_words)
+        jd = synthetic_text(rng, n_words)
+        elapsed = best_of(lambda: extract_keywords(resume, jd))
+        print(f"{n_words:>8} {elapsed * 1000:>10.2f} {elapsed * 1e6 / (2 * n_words):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Live analysis benchmark
+Simulates typing into a five-page JD and times each incremental update (suggestions
+included) against a full re-analysis of the same text
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_engine import extract_keywords
+from live_analysis import LiveAnalysis
+from bench_keyword_engine import synthetic_text
+
+
+def five_page_jd(rng, lines=250, words_per_line=12):
+    return "\n".join(synthetic_text(rng, words_per_line) for _ in range(lines))
+
+
+def main(edits=200):
+    rng = random.Random(42)
+    resume = synthetic_text(rng, 800)
+    jd = five_page_jd(rng)
+    live = LiveAnalysis(resume)
+    live.update(jd)
+
+    incremental = []
+    full = []
+    lines = jd.split("\n")
+    for _ in range(edits):
+        # Type one character somewhere in the JD
+        i = rng.randrange(len(lines))
+        position = rng.randrange(len(lines[i]) + 1)
+        lines[i] = lines[i][:position] + rng.choice("abcdefgh ") + lines[i][position:]
+        text = "\n".join(lines)
+
+        start = time.perf_counter()
+        live.update(text)
+        incremental.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        extract_keywords(resume, text)
+        full.append(time.perf_counter() - start)
+
+    print(f"JD: {len(lines)} lines, {len(jd.split())} words; {edits} single-character edits")
+    for name, samples in (("incremental", incremental), ("full re-analysis", full)):
+        samples = sorted(samples)
+        print(f"{name:>17}: median {statistics.median(samples) * 1000:6.2f} ms, "
+              f"p95 {samples[int(0.95 * len(samples))] * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Near-duplicate detection benchmark
+10k synthetic resumes, a share of them lightly edited copies of others: MinHash
+signing, LSH indexing and lookups, with recall and precision against the exact
+shingle Jaccard similarity and the candidates compared per lookup
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex, minhash, shingles
+from bench_keyword_engine import synthetic_text
+
+
+def edit(rng, text, changes):
+    """Copy of text with `changes` words replaced, inserted or deleted"""
+    words = text.split()
+    for _ in range(changes):
+        position = rng.randrange(len(words))
+        action = rng.random()
+        if action < 0.4:
+            words[position] = f"edit{rng.randrange(1000)}"
+        elif action < 0.7:
+            words.insert(position, f"added{rng.randrange(1000)}")
+        else:
+            del words[position]
+    return " ".join(words)
+
+
+def jaccard(first, second):
+    first, second = set(shingles(first).tolist()), set(shingles(second).tolist())
+    return len(first & second) / len(first | second)
+
+
+def main(n_documents=10000, n_edited=1000, n_words=500):
+    rng = random.Random(11)
+    documents = [synthetic_text(rng, n_words) for _ in range(n_documents - n_edited)]
+    edited = []
+    for _ in range(n_edited):
+        source = rng.randrange(len(documents))
+        edited.append((source, edit(rng, documents[source], rng.choice((1, 3, 10, 40)))))
+
+    started = time.perf_counter()
+    signatures = [minhash(text) for text in documents]
+    elapsed = time.perf_counter() - started
+    print(f"minhash {len(documents)} documents of {n_words} words: {elapsed:.2f}s "
+          f"({elapsed * 1e6 / len(documents):.0f} us/doc)")
+
+    index = NearDuplicateIndex(DEFAULT_THRESHOLD)
+    started = time.perf_counter()
+    for key, signature in enumerate(signatures):
+        index.add(key, signature=signature)
+    elapsed = time.perf_counter() - started
+    print(f"index ({index.bands} bands x {index.rows} rows): {elapsed * 1e6 / len(documents):.0f} "
+          f"us/doc")
+
+    found = missed = spurious = candidates = 0
+    started = time.perf_counter()
+    results = [(source, text, index.query(text)) for source, text in edited]
+    elapsed = time.perf_counter() - started
+    for source, text, matches in results:
+        true_similarity = jaccard(documents[source], text)
+        keys = [key for key, _ in matches]
+        candidates += len(keys)
+        if true_similarity >= DEFAULT_THRESHOLD:
+            found += source in keys
+            missed += source not in keys
+        else:
+            spurious += source in keys
+    print(f"query {len(edited)} edited copies: {elapsed * 1e6 / len(edited):.0f} us/query, "
+          f"{candidates / len(edited):.2f} matches/query out of {len(index)} documents")
+    print(f"at threshold {DEFAULT_THRESHOLD}: {found} found, {missed} missed, "
+          f"{spurious} reported below the threshold (by exact shingle Jaccard)")
+
+    for number, (_, text) in enumerate(edited):
+        index.add(f"edited{number}", text)
+    started = time.perf_counter()
+    clusters = index.clusters()
+    print(f"clusters over {len(index)} documents: {len(clusters)} in "
+          f"{time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
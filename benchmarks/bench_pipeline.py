@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+End-to-end pipeline benchmark on a synthetic corpus
+Generates seeded resumes (TeX and PDF) and JDs for each size tier, then times every
+stage (file read, immutable fields, local keywords, AI suggestions against the
+in-process fake provider) in a fresh process per tier. Reports throughput, latency
+percentiles and peak RSS per stage, plus the timing spans each stage is made of,
+and compares the results with a stored baseline. No network access is needed.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--tiers 1p,5p,20p,50p] [--count 5] [--rounds 3]
+    python benchmarks/bench_pipeline.py --save-baseline      # record benchmarks/baseline.json
+    python benchmarks/bench_pipeline.py --tolerance 0.3      # exit 1 on a >30% p50 regression
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_corpus import TIERS, write_tier
+
+
+STAGES = ('read_tex', 'read_pdf', 'immutable_fields', 'local_keywords', 'ai_suggestions')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def percentile(values, q):
+    """Nearest-rank q-quantile (0..1)"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def _proc_status_kb(field):
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS mark (Linux); False where that is not possible"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process since the last reset, in MB"""
+    peak = _proc_status_kb('VmHWM')
+    if peak is None:
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            peak //= 1024  # bytes there, KB on Linux
+    return peak / 1024
+
+
+def _stage_calls(stage, corpus, texts, provider_url):
+    """Zero-argument callables for one stage, one per document"""
+    from keyword_engine import extract_keywords
+    from llm_providers import get_keyword_suggestions_cached
+    from resume_reader import extract_immutable_fields, read_resume_cached
+
+    jd = texts['jd']
+    if stage == 'read_tex':
+        # read_resume_cached keeps parsed TeX in memory, so it would only time cache
+        # hits after the first round; this stage measures the parse itself
+        from tex_parser import parse_tex_file
+        return [lambda path=path: parse_tex_file(path) for path in corpus['tex']]
+    if stage == 'read_pdf':
+        return [lambda path=path: read_resume_cached(path, None) for path in corpus['pdf']]
+    if stage == 'immutable_fields':
+        return [lambda text=text, fmt=fmt: extract_immutable_fields(text, fmt)
+                for fmt in ('tex', 'pdf') for text in texts[fmt]]
+    if stage == 'local_keywords':
+        return [lambda text=text: extract_keywords(text, jd) for text in texts['pdf']]
+    if stage == 'ai_suggestions':
+        return [lambda text=text, fields=extract_immutable_fields(text, 'pdf'):
+                get_keyword_suggestions_cached(text, jd, fields, 'custom', 'bench', 'fake',
+                                               provider_url)
+                for text in texts['pdf']]
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def run_tier(corpus, stages, rounds, provider_url):
+    """Child process: time each stage over the tier's documents; returns {stage: result}"""
+    from pipeline_metrics import collect_spans
+    from resume_reader import read_resume
+
+    texts = {fmt: [read_resume(path)[0] for path in corpus[fmt]] for fmt in ('tex', 'pdf')}
+    with open(corpus['jd'], 'r', encoding='utf-8') as f:
+        texts['jd'] = f.read()
+
+    results = {}
+    for stage in stages:
+        calls = _stage_calls(stage, corpus, texts, provider_url)
+        calls[0]()  # warm up imports and caches outside the measurement
+        precise_peak = reset_peak_rss()
+        latencies = []
+        spans = {}
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for call in calls:
+                call_started = time.perf_counter()
+                _, records = collect_spans(call)
+                latencies.append(time.perf_counter() - call_started)
+                for record in records:
+                    spans.setdefault(record['span'], []).append(record['seconds'])
+        elapsed = time.perf_counter() - started
+
+        results[stage] = {
+            'calls': len(latencies),
+            'per_second': len(latencies) / elapsed,
+            'words_per_second': len(latencies) * corpus['words'] / elapsed,  # resume words
+            'p50_ms': percentile(latencies, 0.5) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_rss_precise': precise_peak,
+            'spans': {name: {'count': len(values), 'p50_ms': percentile(values, 0.5) * 1000,
+                             'total_s': sum(values)}
+                      for name, values in spans.items()},
+        }
+    return results
+
+
+def run_benchmark(tiers, stages, count, rounds, seed, provider_latency):
+    """Generate the corpus and run every tier in its own fresh process"""
+    from fake_provider import start_fake_provider
+
+    server = start_fake_provider(latency=provider_latency, seed=seed)
+    spawn = multiprocessing.get_context('spawn')
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="ats-bench-") as corpus_dir:
+            for tier in tiers:
+                corpus = write_tier(corpus_dir, tier, count, seed)
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                    results[tier] = executor.submit(run_tier, corpus, stages, rounds,
+                                                    server.url).result()
+                results[tier]['_corpus'] = {'resume_words': corpus['words'],
+                                            'jd_words': corpus['jd_words']}
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def print_results(results, show_spans):
+    print(f"{'tier':>4} {'stage':>18} {'calls':>6} {'docs/s':>9} {'words/s':>11} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+    for tier, stages in results.items():
+        corpus = stages['_corpus']
+        print(f"{tier:>4}  resumes ~{corpus['resume_words']} words, JD {corpus['jd_words']} words")
+        for stage, result in stages.items():
+            if stage.startswith('_'):
+                continue
+            peak = result['peak_rss_mb']
+            print(f"{'':>4} {stage:>18} {result['calls']:>6} {result['per_second']:>9.1f} "
+                  f"{result['words_per_second']:>11.0f} {result['p50_ms']:>9.2f} "
+                  f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                  f"{peak if peak is not None else float('nan'):>8.1f}")
+            if show_spans:
+                for name, span in sorted(result['spans'].items(),
+                                         key=lambda item: -item[1]['total_s']):
+                    print(f"{'':>4} {'- ' + name:>18} {span['count']:>6} {'':>9} {'':>11} "
+                          f"{span['p50_ms']:>9.2f}")
+
+
+def compare_with_baseline(results, baseline, tolerance, min_ms):
+    """Print p50 changes against the baseline; returns the regressions found
+
+    Stages faster than min_ms are shown but never flagged: at that scale the
+    noise between runs is larger than the changes worth catching.
+    """
+    regressions = []
+    print(f"\nCompared with baseline ({baseline['meta']['python']} on {baseline['meta']['machine']}, "
+          f"tolerance {tolerance:.0%}):")
+    for tier, stages in results.items():
+        for stage, result in stages.items():
+            before = baseline['results'].get(tier, {}).get(stage)
+            if stage.startswith('_') or before is None:
+                continue
+            change = result['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] else 0.0
+            marker = ""
+            if before['p50_ms'] < min_ms:
+                marker = "  (too fast to compare)"
+            elif change > tolerance:
+                marker = "  REGRESSION"
+                regressions.append(f"{tier}/{stage}: p50 {before['p50_ms']:.2f} -> "
+                                   f"{result['p50_ms']:.2f} ms ({change:+.0%})")
+            elif change < -tolerance:
+                marker = "  faster"
+            print(f"{tier:>4} {stage:>18} {before['p50_ms']:>9.2f} -> {result['p50_ms']:>9.2f} ms "
+                  f"({change:+.0%}){marker}")
+    return regressions
+
+
+def benchmark_meta(args):
+    return {'python': platform.python_version(), 'machine': platform.machine(),
+            'platform': platform.platform(), 'cpus': os.cpu_count(), 'seed': args.seed,
+            'count': args.count, 'rounds': args.rounds,
+            'provider_latency': args.provider_latency,
+            'recorded': time.strftime('%Y-%m-%d')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--tiers", default=','.join(TIERS),
+                        help=f"Comma-separated size tiers (default: {','.join(TIERS)})")
+    parser.add_argument("--stages", default=','.join(STAGES),
+                        help=f"Comma-separated stages (default: {','.join(STAGES)})")
+    parser.add_argument("--count", type=int, default=5, help="Resumes per tier")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over each tier's resumes")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus seed")
+    parser.add_argument("--provider-latency", type=float, default=0.0,
+                        help="Fake provider response delay in seconds")
+    parser.add_argument("--spans", action="store_true",
+                        help="Also show the timing spans inside each stage")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Baseline JSON to compare with (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the new baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed p50 slowdown before a stage counts as regressed")
+    parser.add_argument("--min-ms", type=float, default=0.5,
+                        help="Only flag stages whose baseline p50 is at least this long")
+    parser.add_argument("--output", "-o", help="Also write the full results as JSON")
+    args = parser.parse_args()
+
+    tiers = args.tiers.split(',')
+    stages = args.stages.split(',')
+    for name, known in (('tier', TIERS), ('stage', STAGES)):
+        unknown = [value for value in (tiers if name == 'tier' else stages) if value not in known]
+        if unknown:
+            parser.error(f"unknown {name}(s): {', '.join(unknown)}")
+
+    results = run_benchmark(tiers, stages, args.count, args.rounds, args.seed,
+                            args.provider_latency)
+    print_results(results, args.spans)
+    report = {'meta': benchmark_meta(args), 'results': results}
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; record one with --save-baseline")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    for key in ('seed', 'count', 'rounds', 'provider_latency'):
+        if baseline['meta'].get(key) != report['meta'][key]:
+            print(f"Warning: baseline was recorded with {key}={baseline['meta'].get(key)}",
+                  file=sys.stderr)
+    regressions = compare_with_baseline(results, baseline, args.tolerance, args.min_ms)
+    for regression in regressions:
+        print(f"FAIL: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Provider scheduler benchmark against a throttling fake provider
+The fake provider allows --server-rpm requests per minute and answers the excess
+with HTTP 429 + Retry-After. Compares a batch sent with no client-side rate limit
+(every 429 is waited out) with one paced by the scheduler's token bucket, then
+shows interactive calls overtaking a queued bulk batch and queued calls giving up
+at their deadline.
+
+Usage:
+    python benchmarks/bench_scheduler.py [--server-rpm 600] [--jobs 60]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_provider import start_fake_provider
+from llm_providers import PROMPT_TEMPLATE, call_provider
+from provider_scheduler import BULK, INTERACTIVE, RateLimits, scheduler, scheduling
+from bench_keyword_engine import synthetic_text
+
+
+def run_batch(url, model, prompt, jobs, workers, priority=BULK, timeout=None):
+    """Send jobs calls from `workers` threads; returns (seconds, per-call latencies, errors)"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def one(_):
+        started = time.perf_counter()
+        try:
+            with scheduling(priority, timeout=timeout):
+                call_provider('custom', prompt, 'bench', model, url)
+        except Exception as e:
+            with lock:
+                errors.append(type(e).__name__)
+            return
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(one, range(jobs)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def mean(values):
+    return sum(values) / len(values) if values else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provider scheduler benchmark")
+    parser.add_argument("--server-rpm", type=int, default=600,
+                        help="Requests per minute the fake provider accepts")
+    parser.add_argument("--burst", type=int, default=5, help="Back-to-back requests it accepts")
+    parser.add_argument("--jobs", type=int, default=60, help="Calls per batch")
+    parser.add_argument("--workers", type=int, default=16, help="Threads sending the batch")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake provider delay in seconds")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    prompt = PROMPT_TEMPLATE.format(fields="none", resume=synthetic_text(rng, 300),
+                                    jd=synthetic_text(rng, 150))
+    print(f"Fake provider: {args.server_rpm} requests/min, bursts of {args.burst}, "
+          f"{args.latency * 1000:.0f} ms per reply; {args.jobs} calls from {args.workers} threads\n")
+    print(f"{'client limit':>22} {'seconds':>8} {'calls/s':>8} {'429s':>6} {'errors':>7} "
+          f"{'mean s':>7}")
+
+    scenarios = [
+        ("none (429 + Retry-After)", 'fake-unlimited', RateLimits(None, None, args.workers)),
+        ("token bucket at server", 'fake-paced',
+         RateLimits(args.server_rpm, None, args.workers)),
+    ]
+    for name, model, limits in scenarios:
+        server = start_fake_provider(latency=args.latency, rate_limit=args.server_rpm,
+                                     rate_burst=args.burst)
+        try:
+            scheduler.configure('custom', limits, model)
+            seconds, latencies, errors = run_batch(server.url, model, prompt, args.jobs,
+                                                   args.workers)
+            print(f"{name:>22} {seconds:>8.2f} {len(latencies) / seconds:>8.1f} "
+                  f"{server.throttled:>6} {len(errors):>7} {mean(latencies):>7.2f}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    # Interactive calls made while a bulk batch is queued go to the front
+    server = start_fake_provider(latency=args.latency, rate_limit=args.server_rpm,
+                                 rate_burst=args.burst)
+    deadline_server = start_fake_provider(latency=args.latency, rate_limit=60)
+    try:
+        model = 'fake-priority'
+        scheduler.configure('custom', RateLimits(args.server_rpm, None, 4), model)
+        results = {}
+        bulk = threading.Thread(target=lambda: results.setdefault(
+            'bulk', run_batch(server.url, model, prompt, args.jobs, args.workers)))
+        bulk.start()
+        time.sleep(0.5)  # let the bulk batch fill the queue
+        results['interactive'] = run_batch(server.url, model, prompt, 5, 5, INTERACTIVE)
+        bulk.join()
+        print(f"\nDuring a {args.jobs}-call bulk batch: interactive calls took "
+              f"{mean(results['interactive'][1]):.2f}s on average, bulk calls "
+              f"{mean(results['bulk'][1]):.2f}s")
+
+        # Calls that cannot get a slot within their deadline are never sent
+        model = 'fake-deadline'
+        scheduler.configure('custom', RateLimits(60, None, 4), model)
+        seconds, latencies, errors = run_batch(deadline_server.url, model, prompt, 20, 20,
+                                               timeout=2.0)
+        print(f"20 calls with a 2s deadline at 60 requests/min: {len(latencies)} sent, "
+              f"{errors.count('DeadlineExceeded')} expired in the queue after {seconds:.2f}s")
+    finally:
+        for provider in (server, deadline_server):
+            provider.shutdown()
+            provider.server_close()
+
+    for label, stats in scheduler.summary().items():
+        print(f"  {label}: {stats['sent']} sent, {stats['throttled']} rate limited, "
+              f"{stats['expired']} expired, queue wait p50 {stats['wait_p50']:.2f}s "
+              f"p95 {stats['wait_p95']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
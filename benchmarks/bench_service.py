@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analysis service benchmark
+Requests per second for repeated (warm) and distinct local keyword requests over TCP
+and a Unix socket, and how many provider calls a burst of identical AI requests makes
+"""
+
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_service import ServiceClient, start_service
+from fake_provider import start_fake_provider
+from bench_keyword_engine import synthetic_text
+
+
+def requests_per_second(url, payloads, clients):
+    """Send payloads split over `clients` threads, one keep-alive connection each"""
+    def work(chunk):
+        client = ServiceClient(url)
+        for resume, jd in chunk:
+            client.keywords(resume, jd)
+
+    threads = [threading.Thread(target=work, args=(payloads[i::clients],)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(payloads) / (time.perf_counter() - started)
+
+
+def main():
+    rng = random.Random(3)
+    resume, jd = synthetic_text(rng, 500), synthetic_text(rng, 300)
+    socket_path = f"/tmp/ats-bench-{os.getpid()}.sock"
+    servers = [start_service(port=0)]
+    if hasattr(socket, 'AF_UNIX'):
+        servers.append(start_service(socket_path=socket_path))
+    try:
+        print(f"{'transport':>10} {'clients':>8} {'warm req/s':>11} {'distinct req/s':>15}")
+        for server in servers:
+            transport = server.url.split(':', 1)[0]
+            for clients in (1, 8):
+                warm = requests_per_second(server.url, [(resume, jd)] * 2000, clients)
+                distinct = [(f"{resume} {transport}{clients}x{i}", jd) for i in range(300)]
+                cold = requests_per_second(server.url, distinct, clients)
+                print(f"{transport:>10} {clients:>8} {warm:>11.0f} {cold:>15.0f}")
+
+        provider = start_fake_provider(latency=0.5)
+        try:
+            client = ServiceClient(servers[0].url)
+            settings = {'provider': 'custom', 'api_key': 'bench', 'model': 'fake',
+                        'api_url': provider.url, 'refresh': True}
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=32) as executor:
+                list(executor.map(lambda _: client.analyze(resume, 'pdf', jd, settings),
+                                  range(32)))
+            print(f"\n32 identical AI requests: {provider.requests} provider call(s) in "
+                  f"{time.perf_counter() - started:.2f}s "
+                  f"({servers[0].service.coalescer.merged} merged)")
+        finally:
+            provider.shutdown()
+            provider.server_close()
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
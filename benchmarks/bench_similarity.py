@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized match scoring benchmark
+One JD against 10k resumes with score_batch, and 50 JDs x 10k resumes with
+score_matrix; vectorizing is timed separately from scoring
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_engine import DocumentIndex
+from similarity import TermVectors, score_batch, score_matrix, term_vector
+from bench_keyword_engine import best_of, synthetic_text
+
+
+def main(n_resumes=10000, n_jds=50):
+    rng = random.Random(42)
+    resumes = [DocumentIndex(synthetic_text(rng, 600)) for _ in range(n_resumes)]
+    jds = [DocumentIndex(synthetic_text(rng, 400)) for _ in range(n_jds)]
+
+    start = time.perf_counter()
+    vectors = TermVectors.from_documents(resumes)
+    jd_vectors = TermVectors.from_documents(jds)
+    vectorize = time.perf_counter() - start
+    print(f"vectorize {n_resumes + n_jds} indexed documents: {vectorize:.2f}s "
+          f"({vectorize * 1e6 / (n_resumes + n_jds):.0f} us/doc, {len(vectors.indices)} nonzeros)")
+
+    jd = term_vector(jds[0])
+    for method in ("cosine", "overlap"):
+        elapsed = best_of(lambda: score_batch(jd, vectors, method))
+        print(f"score_batch  {method:>7}: 1 x {n_resumes} in {elapsed * 1000:7.1f} ms "
+              f"({elapsed * 1e6 / n_resumes:.2f} us/pair)")
+
+    for method in ("cosine", "overlap"):
+        elapsed = best_of(lambda: score_matrix(jd_vectors, vectors, method), repeat=3)
+        pairs = n_jds * n_resumes
+        print(f"score_matrix {method:>7}: {n_jds} x {n_resumes} in {elapsed * 1000:7.1f} ms "
+              f"({elapsed * 1e6 / pairs:.2f} us/pair)")
+
+
+if __name__ == "__main__":
+    main()
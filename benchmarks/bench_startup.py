@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup import benchmark and regression guard
+Imports each entry point in a fresh interpreter with -X importtime, reports the
+median cumulative import time and fails (exit 1) if a heavy dependency is loaded
+eagerly or an entry point goes over its time budget.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 7] [--no-budget]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('PyPDF2', 'numpy', 'openai', 'anthropic', 'google.generativeai', 'asyncio',
+                 'http.client', 'concurrent.futures.process')
+
+# (module, modules it must not load, import budget in ms)
+ENTRY_POINTS = (
+    ('ats_suggest', HEAVY_MODULES + ('tkinter',), 80),
+    ('keyword_engine', HEAVY_MODULES + ('tkinter',), 30),
+    ('resume_reader', HEAVY_MODULES + ('tkinter',), 30),
+    ('llm_providers', HEAVY_MODULES + ('tkinter',), 40),
+    ('ATS_Keyword_Suggestor', HEAVY_MODULES, 150),
+)
+
+
+def import_once(module, forbidden):
+    """(cumulative import time in ms, forbidden modules that got loaded) in a fresh process"""
+    code = (f"import sys, {module}\n"
+            f"print(' '.join(m for m in {forbidden!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module and parts[2].startswith(' ' + module):
+            cumulative_us = int(parts[1])
+    return cumulative_us / 1000, result.stdout.split()
+
+
+def tkinter_available():
+    return subprocess.run([sys.executable, "-c", "import tkinter"],
+                          capture_output=True).returncode == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import benchmark")
+    parser.add_argument("--repeat", type=int, default=7, help="Fresh interpreters per entry point")
+    parser.add_argument("--no-budget", action="store_true",
+                        help="Report times without failing on budget overruns")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':>22} {'median ms':>10} {'min ms':>8} {'budget':>7}  eager heavy imports")
+    for module, forbidden, budget in ENTRY_POINTS:
+        if module == 'ATS_Keyword_Suggestor' and not tkinter_available():
+            print(f"{module:>22}  skipped (tkinter not available)")
+            continue
+        times = []
+        loaded = set()
+        for _ in range(args.repeat):
+            elapsed, eager = import_once(module, forbidden)
+            times.append(elapsed)
+            loaded.update(eager)
+        median = statistics.median(times)
+        print(f"{module:>22} {median:>10.1f} {min(times):>8.1f} {budget:>7}  "
+              f"{', '.join(sorted(loaded)) or '-'}")
+        if loaded:
+            failures.append(f"{module} imports {', '.join(sorted(loaded))} at startup")
+        if median > budget and not args.no_budget:
+            failures.append(f"{module} takes {median:.1f} ms to import (budget {budget} ms)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming suggestions benchmark
+Time to the first suggestion item vs. time to the full reply, against the fake provider
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_provider import start_fake_provider
+from llm_providers import get_keyword_suggestions_cached
+from bench_keyword_engine import synthetic_text
+
+
+def timed_call(server, provider, stream):
+    rng = random.Random(7)
+    resume, jd = synthetic_text(rng, 400), synthetic_text(rng, 300)
+    first = []
+    started = time.perf_counter()
+
+    def on_item(path, item):
+        if not first:
+            first.append(time.perf_counter() - started)
+
+    get_keyword_suggestions_cached(resume, jd, {}, provider, "bench", "fake", server.url,
+                                   on_item=on_item if stream else None)
+    total = time.perf_counter() - started
+    return (first[0] if first else total), total
+
+
+def main():
+    # Roughly 20 ms per 16-character chunk, in the range of hosted models
+    server = start_fake_provider(latency=0.3, token_delay=0.02, chunk_chars=16)
+    try:
+        print(f"{'provider':>8} {'mode':>8} {'first item s':>13} {'full reply s':>13}")
+        for provider in ("custom", "openai"):
+            timed_call(server, provider, stream=False)  # warm up the client
+            for stream in (False, True):
+                first, total = timed_call(server, provider, stream)
+                mode = "stream" if stream else "blocking"
+                print(f"{provider:>8} {mode:>8} {first:>13.3f} {total:>13.3f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
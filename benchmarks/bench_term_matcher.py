@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Term matcher dictionary-size benchmark
+Scans the same text with dictionaries of 1k to 100k terms; scan time should stay flat
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from term_matcher import TermMatcher, default_skills_matcher, term_tokens
+from bench_keyword_engine import best_of, synthetic_text
+
+
+def synthetic_terms(rng, n_terms):
+    """One to three word terms with one synonym each"""
+    terms = []
+    for i in range(n_terms):
+        words = [f"skill{i}"] + [f"w{rng.randrange(n_terms)}" for _ in range(rng.randrange(3))]
+        terms.append((" ".join(words), [f"s{i}"]))
+    return terms
+
+
+def main():
+    rng = random.Random(42)
+    text = synthetic_text(rng, 20000)
+    tokens = term_tokens(text)
+    print(f"{'terms':>8} {'build ms':>10} {'scan ms':>10} {'matches':>8}")
+    for n_terms in (1000, 10000, 100000):
+        start = time.perf_counter()
+        matcher = TermMatcher(synthetic_terms(rng, n_terms))
+        matcher.add("Kubernetes", ["k8s"])
+        build = time.perf_counter() - start
+        elapsed = best_of(lambda: sum(1 for _ in matcher.scan(tokens)))
+        matches = sum(1 for _ in matcher.scan(tokens))
+        print(f"{n_terms:>8} {build * 1000:>10.1f} {elapsed * 1000:>10.2f} {matches:>8}")
+
+    matcher = default_skills_matcher()
+    elapsed = best_of(lambda: matcher.find(text))
+    print(f"skills.txt ({len(matcher)} spellings): find() on {len(tokens)} tokens in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
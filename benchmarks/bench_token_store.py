@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Token store benchmark
+Fills a fresh TokenStore with synthetic resumes and reports the bytes kept per
+resume (on disk and mapped) against the Python objects a DocumentIndex holds,
+then ranks the whole store against a JD in one process and with a worker pool,
+checking the scores against similarity.score_batch.
+
+Usage:
+    python benchmarks/bench_token_store.py [--documents 100000] [--workers 4]
+"""
+
+import argparse
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from ats_suggest import run_rank_store
+from keyword_engine import DocumentIndex
+from similarity import score_batch
+from token_store import TokenStore, jd_query, score_range, tokenize
+from bench_keyword_engine import synthetic_text
+
+
+def directory_bytes(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token store benchmark")
+    parser.add_argument("--documents", type=int, default=100000, help="Resumes to store")
+    parser.add_argument("--words", type=int, default=600, help="Words per resume")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for ranking")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    # A pool of distinct texts, each stored many times under new digests, keeps the
+    # benchmark about the store rather than generating text
+    pool = [synthetic_text(rng, args.words) for _ in range(1000)]
+    pool_tokens = [tokenize(text) for text in pool]
+    jd = synthetic_text(rng, 300)
+
+    tracemalloc.start()
+    indexes = [DocumentIndex(text) for text in pool[:200]]
+    per_document = tracemalloc.get_traced_memory()[0] / len(indexes)
+    tracemalloc.stop()
+    del indexes
+
+    directory = tempfile.mkdtemp(prefix="token_store_bench_")
+    try:
+        store = TokenStore(directory)
+        started = time.perf_counter()
+        for number in range(args.documents):
+            store.add_tokens(f"resume{number}.pdf", pool_tokens[number % len(pool)], number)
+        store.flush()
+        elapsed = time.perf_counter() - started
+        stored = directory_bytes(directory)
+        print(f"add {args.documents} resumes of {args.words} words: {elapsed:.2f}s "
+              f"({elapsed * 1e6 / args.documents:.0f} us/doc), {store.tokens_count} tokens")
+        print(f"store: {stored / args.documents:.0f} bytes/resume on disk; "
+              f"DocumentIndex: {per_document:.0f} bytes/resume in memory "
+              f"(x{per_document * args.documents / stored:.0f})")
+        print(f"for 1M resumes: {stored / args.documents * 1e6 / 2**30:.2f} GB mapped "
+              f"(shared by all workers) vs {per_document * 1e6 / 2**30:.1f} GB of "
+              f"DocumentIndex objects per process")
+        store.close()
+
+        started = time.perf_counter()
+        reader = TokenStore(directory, readonly=True)
+        query = jd_query(reader, jd)
+        print(f"open read-only + JD query: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        cosine, overlap = score_range(reader, query, 0, len(pool))
+        expected = score_batch(jd, pool, 'cosine')
+        print(f"max |cosine - score_batch| over {len(pool)} resumes: "
+              f"{np.abs(cosine - expected).max():.2e}")
+
+        rss_before = peak_rss_mb()
+        for workers in (1, args.workers):
+            started = time.perf_counter()
+            records = list(run_rank_store(jd, reader, top_k=10, workers=workers))
+            elapsed = time.perf_counter() - started
+            print(f"rank {len(reader)} resumes, {workers} worker(s): {elapsed:.2f}s "
+                  f"({len(reader) / elapsed:,.0f} resumes/s), best {records[0]['cosine']}")
+        print(f"parent peak RSS {peak_rss_mb():.0f} MB ({peak_rss_mb() - rss_before:+.0f} MB "
+              f"while ranking)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Seeded synthetic resume and job description generator
+Builds realistic-looking resumes (TeX source and text PDFs) and JDs of a given size:
+contact details, sections, bullet points starting with action verbs, skills from
+skills.txt and a Zipf-distributed filler vocabulary. The same seed always gives
+byte-identical files.
+
+Usage:
+    python benchmarks/synthetic_corpus.py out_dir/ [--seed 1] [--count 5] [--tiers 1p,50p]
+"""
+
+import argparse
+import bisect
+import itertools
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from keyword_engine import COMMON_ACTION_VERBS
+from term_matcher import DEFAULT_SKILLS_FILE, parse_dictionary
+
+
+# name: (resume pages, JD words)
+TIERS = {
+    '1p': (1, 200),
+    '5p': (5, 1000),
+    '20p': (20, 5000),
+    '50p': (50, 20000),
+}
+
+WORDS_PER_PAGE = 450
+PDF_LINES_PER_PAGE = 52
+PDF_LINE_CHARS = 95
+
+COMMON_WORDS = (
+    "experience team data systems customers platform reliability analytics services "
+    "engineering product quality performance design delivery requirements stakeholders "
+    "roadmap ownership mentoring testing infrastructure security scalable distributed "
+    "solutions business processes operations features release production support "
+    "across within using including multiple complex internal external new key high"
+).split()
+
+FIRST_NAMES = ("Jane", "John", "Priya", "Wei", "Maria", "Ahmed", "Olga", "Kenji", "Amara", "Lucas")
+LAST_NAMES = ("Doe", "Smith", "Patel", "Chen", "Garcia", "Hassan", "Ivanova", "Sato", "Okafor", "Silva")
+TITLES = ("Software Engineer", "Data Scientist", "Platform Engineer", "Backend Developer",
+          "Machine Learning Engineer", "Site Reliability Engineer", "Engineering Manager")
+COMPANIES = ("Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Vandelay Industries")
+
+
+def load_skills():
+    with open(DEFAULT_SKILLS_FILE, 'r', encoding='utf-8') as f:
+        return [canonical for canonical, _ in parse_dictionary(f)]
+
+
+def _pseudo_word(rng):
+    consonants, vowels = "bcdfghklmnprstvz", "aeiou"
+    length = rng.randint(2, 4)
+    return ''.join(rng.choice(consonants) + rng.choice(vowels) for _ in range(length))
+
+
+class TextGenerator:
+    """Sentences and sections drawn from a fixed, seeded vocabulary"""
+
+    def __init__(self, seed=1, vocabulary_size=3000):
+        self.rng = random.Random(seed)
+        self.skills = load_skills()
+        filler = list(dict.fromkeys(_pseudo_word(self.rng) for _ in range(vocabulary_size)))
+        self.vocabulary = COMMON_WORDS + filler
+        # Zipf weights: a few very common words, a long tail of rare ones
+        self._cumulative = list(itertools.accumulate(1 / rank for rank in
+                                                     range(1, len(self.vocabulary) + 1)))
+
+    def word(self):
+        position = self.rng.random() * self._cumulative[-1]
+        return self.vocabulary[bisect.bisect_left(self._cumulative, position)]
+
+    def sentence(self, words, verb=True):
+        out = []
+        if verb:
+            out.append(self.rng.choice(COMMON_ACTION_VERBS).title())
+        while len(out) < words:
+            roll = self.rng.random()
+            if roll < 0.12:
+                out.extend(self.rng.choice(self.skills).split())
+            elif roll < 0.16:
+                out.append(f"{self.rng.randint(2, 95)}%")
+            else:
+                out.append(self.word())
+        return ' '.join(out) + '.'
+
+    def contact(self):
+        first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+        handle = f"{first}{last}{self.rng.randint(1, 99)}".lower()
+        return {
+            'name': f"{first} {last}",
+            'email': f"{handle}@example.com",
+            'phone': f"+1 555 {self.rng.randint(100, 999)} {self.rng.randint(1000, 9999)}",
+            'linkedin': f"linkedin.com/in/{handle}",
+            'github': f"github.com/{handle}",
+        }
+
+    def resume_sections(self, words):
+        """[(heading, [bullet, ...])] totalling about `words` words"""
+        sections = [('Summary', [self.sentence(30, verb=False)]),
+                    ('Skills', [', '.join(self.rng.sample(self.skills, 25))])]
+        total = 30 + 40
+        experience = []
+        while total < words - 40:
+            role = (f"{self.rng.choice(TITLES)}, {self.rng.choice(COMPANIES)} "
+                    f"({self.rng.randint(2005, 2020)} - {self.rng.randint(2021, 2025)})")
+            bullets = [self.sentence(self.rng.randint(12, 24)) for _ in range(self.rng.randint(4, 8))]
+            experience.append((role, bullets))
+            total += sum(len(bullet.split()) for bullet in bullets) + 6
+        sections.append(('Experience', experience))
+        sections.append(('Education', ["B.Sc. Computer Science, State University (2008)"]))
+        return sections
+
+    def job_description(self, words):
+        title = self.rng.choice(TITLES)
+        required = self.rng.sample(self.skills, 12)
+        lines = [f"{title} - {self.rng.choice(COMPANIES)}", "",
+                 self.sentence(40, verb=False), "",
+                 "Requirements: " + ', '.join(required) + '.', "", "Responsibilities:"]
+        total = sum(len(line.split()) for line in lines)
+        while total < words:
+            line = "- " + self.sentence(self.rng.randint(10, 22))
+            lines.append(line)
+            total += len(line.split())
+        return '\n'.join(lines) + '\n'
+
+
+def resume_plain_lines(contact, sections):
+    lines = [contact['name'],
+             f"{contact['email']} | {contact['phone']} | {contact['linkedin']} | {contact['github']}", ""]
+    for heading, body in sections:
+        lines.append(heading.upper())
+        for entry in body:
+            if isinstance(entry, tuple):
+                role, bullets = entry
+                lines.append(role)
+                lines.extend(f"- {bullet}" for bullet in bullets)
+            else:
+                lines.append(entry)
+        lines.append("")
+    return lines
+
+
+def _tex_escape(text):
+    return text.replace('%', '\\%').replace('&', '\\&').replace('#', '\\#').replace('_', '\\_')
+
+
+def resume_tex(contact, sections):
+    out = ["\\documentclass[11pt]{article}", "\\usepackage[margin=1in]{geometry}",
+           f"\\name{{{contact['name']}}}", "\\begin{document}",
+           f"\\textbf{{{contact['name']}}} \\\\",
+           f"{contact['email']} $|$ {contact['phone']} $|$ {contact['linkedin']} $|$ "
+           f"{contact['github']}", ""]
+    for heading, body in sections:
+        out.append(f"\\section*{{{heading}}}")
+        for entry in body:
+            if isinstance(entry, tuple):
+                role, bullets = entry
+                out.append(f"\\textbf{{{_tex_escape(role)}}}")
+                out.append("\\begin{itemize}")
+                out.extend(f"  \\item {_tex_escape(bullet)}" for bullet in bullets)
+                out.append("\\end{itemize}")
+            else:
+                out.append(_tex_escape(entry))
+        out.append("")
+    out.append("\\end{document}")
+    return '\n'.join(out) + '\n'
+
+
+def _wrap(lines, width):
+    for line in lines:
+        words = line.split()
+        if not words:
+            yield ""
+            continue
+        current = words[0]
+        for word in words[1:]:
+            if len(current) + 1 + len(word) > width:
+                yield current
+                current = word
+            else:
+                current += ' ' + word
+        yield current
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def pdf_bytes(lines, lines_per_page=PDF_LINES_PER_PAGE, width=PDF_LINE_CHARS):
+    """A minimal text PDF (Helvetica, one content stream per page)"""
+    wrapped = list(_wrap(lines, width))
+    pages = [wrapped[i:i + lines_per_page] for i in range(0, len(wrapped), lines_per_page)] or [[]]
+    kids = ' '.join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+               f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>",
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    for i, page in enumerate(pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>")
+        body = "BT /F1 10 Tf 14 TL 50 760 Td " + ' '.join(
+            f"({_pdf_escape(line)}) Tj T*" for line in page) + " ET"
+        objects.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode('latin-1')
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii')
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode('ascii')
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n").encode('ascii')
+    return bytes(out)
+
+
+def write_tier(out_dir, tier, count=5, seed=1):
+    """Write count resumes (.tex and .pdf) and one JD for a tier; returns their paths
+
+    {'tex': [...], 'pdf': [...], 'jd': path, 'words': resume words, 'jd_words': JD words}
+    """
+    pages, jd_words = TIERS[tier]
+    generator = TextGenerator(f"{seed}:{tier}")
+    tier_dir = os.path.join(out_dir, tier)
+    os.makedirs(tier_dir, exist_ok=True)
+
+    paths = {'tex': [], 'pdf': []}
+    words = 0
+    for i in range(count):
+        contact = generator.contact()
+        sections = generator.resume_sections(pages * WORDS_PER_PAGE)
+        lines = resume_plain_lines(contact, sections)
+        words += sum(len(line.split()) for line in lines)
+
+        tex_path = os.path.join(tier_dir, f"resume{i:03d}.tex")
+        with open(tex_path, 'w', encoding='utf-8') as f:
+            f.write(resume_tex(contact, sections))
+        pdf_path = os.path.join(tier_dir, f"resume{i:03d}.pdf")
+        with open(pdf_path, 'wb') as f:
+            f.write(pdf_bytes(lines))
+        paths['tex'].append(tex_path)
+        paths['pdf'].append(pdf_path)
+
+    jd_path = os.path.join(tier_dir, "jd.txt")
+    with open(jd_path, 'w', encoding='utf-8') as f:
+        f.write(generator.job_description(jd_words))
+    paths['jd'] = jd_path
+    paths['words'] = words // max(count, 1)
+    paths['jd_words'] = jd_words
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume/JD corpus")
+    parser.add_argument("out_dir")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--count", type=int, default=5, help="Resumes per tier")
+    parser.add_argument("--tiers", default=','.join(TIERS),
+                        help=f"Comma-separated tiers (default: all of {', '.join(TIERS)})")
+    args = parser.parse_args()
+
+    for tier in args.tiers.split(','):
+        paths = write_tier(args.out_dir, tier, args.count, args.seed)
+        print(f"{tier:>4}: {args.count} resumes of ~{paths['words']} words (.tex + .pdf), "
+              f"JD of {paths['jd_words']} words -> {os.path.dirname(paths['jd'])}")
+
+
+if __name__ == "__main__":
+    main()
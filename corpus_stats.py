@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent corpus statistics for keyword ranking
+Accumulates document frequencies over every job description processed, so JD
+terms can be weighted by BM25 instead of raw frequency and boilerplate words
+("experience", "team") sink below the distinctive ones.
+
+On disk (one directory):
+    terms.txt   vocabulary, one term per line, append-only (line number = term id)
+    df.u32      document frequency per term id, memory-mapped uint32 array
+    seen.u64    64-bit digests of documents already counted
+    meta.json   document count, total length, committed terms and a generation number
+    df.journal  new df values of a flush being committed (only while it is applied)
+    lock        locked by whoever reads or commits, so the GUI, the CLI and the
+                service can share one corpus
+
+Counts of added documents are held in memory until flush. The flush takes the
+lock, first catches up with what other processes committed (their new terms
+take the next ids, documents they already counted are dropped), appends terms
+and digests, then writes the new df values to df.journal. Renaming the journal
+into place commits the flush; the values are then written into df.u32 and
+meta.json, and the journal is removed. A crash before the rename leaves
+appended lines past the counts in meta.json, which are ignored and cut off; a
+crash after it is finished by the next process to take the lock.
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from disk_cache import default_cache_dir
+from keyword_engine import is_keyword
+
+
+INITIAL_CAPACITY = 1 << 14
+
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def storable_term(term):
+    """Terms are stored one per line, so fold any whitespace run into a space"""
+    return ' '.join(term.split())
+
+
+def document_digest(text):
+    """64-bit content hash used to count each distinct document once"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class CorpusStats:
+    """Document frequencies of keyword terms across all JDs seen so far (thread-safe)"""
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(default_cache_dir(), 'corpus')
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+
+        # Committed state as of the last look at the directory ...
+        self._terms = []
+        self._vocabulary = {}
+        self._committed_terms = 0
+        self._terms_bytes = 0
+        self._committed_documents = 0
+        self._committed_length = 0
+        self._generation = None
+        self._seen = set()
+        self._df = None
+        # ... and documents added since, as (digest, term ids, length)
+        self._pending = []
+        self._delta = np.zeros(INITIAL_CAPACITY, dtype=np.uint32)
+        self.documents = 0
+        self.total_length = 0
+
+        with self._file_lock():
+            self._recover()
+            self._load(self._read_meta())
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the directory, held while loading or committing"""
+        with open(self._file('lock'), 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is None:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read_meta(self):
+        meta = {'documents': 0, 'total_length': 0, 'terms': 0, 'generation': 0}
+        if os.path.exists(self._file('meta.json')):
+            with open(self._file('meta.json'), 'r', encoding='utf-8') as f:
+                meta.update(json.load(f))
+        return meta
+
+    def _write_meta(self, meta):
+        meta_path = self._file('meta.json')
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def _open_df(self, capacity):
+        """Map df.u32, growing the file to hold at least capacity terms (under the file lock)"""
+        if self._df is not None and len(self._df) >= capacity:
+            return
+        df_path = self._file('df.u32')
+        if self._df is not None:
+            self._df.flush()
+            self._df = None
+        size = os.path.getsize(df_path) // 4 if os.path.exists(df_path) else 0
+        if size < capacity:
+            new_size = max(capacity, size * 2, INITIAL_CAPACITY)
+            with open(df_path, 'ab') as f:
+                f.truncate(new_size * 4)
+            size = new_size
+        self._df = np.memmap(df_path, dtype='<u4', mode='r+', shape=(size,))
+
+    def _recover(self):
+        """Finish a flush that was committed (its journal exists) but not completed"""
+        journal_path = self._file('df.journal')
+        if not os.path.exists(journal_path):
+            return
+        with open(journal_path, 'rb') as f:
+            meta = json.loads(f.readline())
+            ids, values = np.split(np.frombuffer(f.read(), dtype='<u4'), 2)
+        if meta['generation'] > self._read_meta()['generation']:
+            self._apply(meta, ids, values)
+        os.remove(journal_path)
+
+    def _apply(self, meta, ids, values):
+        self._open_df(max(INITIAL_CAPACITY, meta['terms']))
+        self._df[ids] = values
+        self._df.flush()
+        self._write_meta(meta)
+
+    def _load(self, meta):
+        """Catch up with what was committed since this instance last looked (under the file lock)
+
+        Terms committed by others take the ids after the known ones and this
+        instance's new terms move behind them; pending documents another process
+        already counted are dropped.
+        """
+        if meta['generation'] == self._generation:
+            return
+        new_count = meta['terms'] - self._committed_terms
+        new_terms = []
+        if new_count > 0:
+            with open(self._file('terms.txt'), 'rb') as f:
+                f.seek(self._terms_bytes)
+                data = f.read()
+            if self._committed_terms:
+                data = data[1:]
+            new_terms = data.decode('utf-8').split('\n')[:new_count]
+            self._terms_bytes += (len('\n'.join(new_terms).encode('utf-8'))
+                                  + (1 if self._committed_terms else 0))
+
+        provisional = self._terms[self._committed_terms:]
+        for term in provisional:
+            del self._vocabulary[term]
+        self._terms = self._terms[:self._committed_terms]
+        for term in new_terms:
+            self._vocabulary[term] = len(self._terms)
+            self._terms.append(term)
+        moved = np.empty(len(provisional), dtype=np.int64)
+        for offset, term in enumerate(provisional):
+            term_id = self._vocabulary.get(term)
+            if term_id is None:
+                term_id = self._vocabulary[term] = len(self._terms)
+                self._terms.append(term)
+            moved[offset] = term_id
+
+        counted = set()
+        new_documents = meta['documents'] - self._committed_documents
+        if new_documents > 0:
+            counted = set(np.fromfile(self._file('seen.u64'), dtype='<u8', count=new_documents,
+                                      offset=self._committed_documents * 8).tolist())
+            self._seen |= counted
+        pending, self._pending = self._pending, []
+        for digest, ids, length in pending:
+            if digest not in counted:
+                provisional_ids = ids >= self._committed_terms
+                ids[provisional_ids] = moved[ids[provisional_ids] - self._committed_terms]
+                self._pending.append((digest, ids, length))
+
+        self._committed_terms = meta['terms']
+        self._committed_documents = meta['documents']
+        self._committed_length = meta['total_length']
+        self._generation = meta['generation']
+        self._open_df(max(INITIAL_CAPACITY, self._committed_terms))
+        self._count_pending()
+
+    def _count_pending(self):
+        """Recompute the in-memory counts from the pending documents"""
+        self._delta = np.zeros(max(len(self._delta), len(self._terms)), dtype=np.uint32)
+        for _, ids, _ in self._pending:
+            self._delta[ids] += 1
+        self.documents = self._committed_documents + len(self._pending)
+        self.total_length = self._committed_length + sum(length for _, _, length in self._pending)
+
+    def __len__(self):
+        return len(self._terms)
+
+    @property
+    def average_length(self):
+        return self.total_length / self.documents if self.documents else 0.0
+
+    def add_document(self, index):
+        """Count one indexed JD (a DocumentIndex); False if it was already counted"""
+        digest = document_digest(index.text)
+        terms = {storable_term(term) for term in index.counts if is_keyword(term)}
+        with self._lock:
+            if digest in self._seen:
+                return False
+            ids = []
+            for term in terms:
+                term_id = self._vocabulary.get(term)
+                if term_id is None:
+                    term_id = len(self._terms)
+                    self._vocabulary[term] = term_id
+                    self._terms.append(term)
+                ids.append(term_id)
+            if len(self._terms) > len(self._delta):
+                self._delta = np.concatenate(
+                    [self._delta, np.zeros(len(self._delta), dtype=np.uint32)])
+            ids = np.array(ids, dtype=np.int64)
+            # Term ids within one document are unique, so plain fancy indexing is enough
+            self._delta[ids] += 1
+
+            self._seen.add(digest)
+            self._pending.append((digest, ids, len(index.tokens)))
+            self.documents += 1
+            self.total_length += len(index.tokens)
+            return True
+
+    def _frequencies(self, ids):
+        """Committed plus pending document frequency of term ids (-1 = unknown term)"""
+        df = self._delta[np.maximum(ids, 0)].astype(np.int64)
+        committed = (ids >= 0) & (ids < self._committed_terms)
+        df[committed] += self._df[ids[committed]]
+        df[ids < 0] = 0
+        return df
+
+    def document_frequency(self, term):
+        term_id = self._vocabulary.get(storable_term(term), -1)
+        with self._lock:
+            return int(self._frequencies(np.array([term_id], dtype=np.int64))[0])
+
+    def idf(self, term):
+        """BM25 inverse document frequency (never negative)"""
+        df = self.document_frequency(term)
+        return math.log((self.documents - df + 0.5) / (df + 0.5) + 1)
+
+    def bm25_weights(self, index, k1=BM25_K1, b=BM25_B):
+        """BM25 weight of every keyword term of an indexed document: term -> weight"""
+        terms = [term for term in index.counts if is_keyword(term)]
+        if not terms:
+            return {}
+        tf = np.array([index.counts[term] for term in terms], dtype=np.float64)
+        with self._lock:
+            ids = np.array([self._vocabulary.get(storable_term(term), -1) for term in terms],
+                           dtype=np.int64)
+            documents = self.documents
+            average_length = self.average_length or len(index.tokens) or 1
+            df = self._frequencies(ids).astype(np.float64)
+
+        idf = np.log((documents - df + 0.5) / (df + 0.5) + 1)
+        length_norm = k1 * (1 - b + b * len(index.tokens) / average_length)
+        weights = idf * tf * (k1 + 1) / (tf + length_norm)
+        return dict(zip(terms, weights.tolist()))
+
+    def flush(self):
+        """Commit the documents added since the last flush (see the module docstring)"""
+        with self._lock, self._file_lock():
+            self._recover()
+            self._load(self._read_meta())
+            if not self._pending:
+                return
+
+            # Cut off anything a crashed flush appended past the committed counts
+            for name, size in (('terms.txt', self._terms_bytes),
+                               ('seen.u64', self._committed_documents * 8)):
+                if os.path.exists(self._file(name)) and os.path.getsize(self._file(name)) > size:
+                    os.truncate(self._file(name), size)
+
+            new_terms = self._terms[self._committed_terms:]
+            terms_bytes = self._terms_bytes
+            if new_terms:
+                data = ('\n' if self._committed_terms else '') + '\n'.join(new_terms)
+                data = data.encode('utf-8')
+                with open(self._file('terms.txt'), 'ab') as f:
+                    f.write(data)
+                terms_bytes += len(data)
+            with open(self._file('seen.u64'), 'ab') as f:
+                np.array([digest for digest, _, _ in self._pending], dtype='<u8').tofile(f)
+
+            self._open_df(len(self._terms))
+            # Changed counts, and every new term (any stale value past the old end is replaced)
+            ids = np.concatenate([np.flatnonzero(self._delta[:self._committed_terms]),
+                                  np.arange(self._committed_terms, len(self._terms))])
+            values = self._frequencies(ids).astype('<u4')
+            ids = ids.astype('<u4')
+            meta = {'documents': self.documents, 'total_length': self.total_length,
+                    'terms': len(self._terms), 'generation': self._generation + 1}
+            journal_path = self._file('df.journal')
+            with open(journal_path + '.tmp', 'wb') as f:
+                f.write(json.dumps(meta).encode('utf-8') + b'\n')
+                f.write(ids.tobytes())
+                f.write(values.tobytes())
+            os.replace(journal_path + '.tmp', journal_path)
+            self._apply(meta, ids, values)
+            os.remove(journal_path)
+
+            self._committed_terms = len(self._terms)
+            self._terms_bytes = terms_bytes
+            self._committed_documents = self.documents
+            self._committed_length = self.total_length
+            self._generation = meta['generation']
+            self._pending = []
+            self._delta[:] = 0
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._df = None
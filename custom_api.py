@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Client for self-hosted OpenAI-compatible model servers (the GUI's "Custom API URL")
+Standard library only: keep-alive connection pool, streaming (server-sent events),
+retries with exponential backoff and bounded-concurrency batches. Rate limits
+(HTTP 429) are raised at once with the server's Retry-After, for provider_scheduler
+to wait out for all callers together. A call given a cancel token (a
+provider_scheduler.CancelToken) shuts its connection down when the token is cancelled.
+"""
+
+import http.client
+import json
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+DEFAULT_MODEL = "local-model"
+RETRY_STATUSES = {408, 500, 502, 503, 504}
+
+
+def normalize_api_url(api_url):
+    """Canonical scheme://host:port/path of an API URL, for comparing URLs and cache keys
+
+    The client adds /chat/completions itself, so URLs with and without it are the same.
+    """
+    api_url = api_url.strip()
+    parts = urlsplit(api_url if "://" in api_url else "http://" + api_url)
+    scheme = parts.scheme.lower()
+    port = parts.port or {'http': 80, 'https': 443}.get(scheme)
+    path = parts.path.rstrip('/')
+    if path.endswith("/chat/completions"):
+        path = path[:-len("/chat/completions")]
+    return f"{scheme}://{(parts.hostname or '').lower()}:{port}{path}"
+
+
+# What sending on a keep-alive connection the server already closed raises. Only
+# these are retried at once on a fresh connection; a timeout or any other error
+# may mean the request was processed, so it counts as an attempt and backs off.
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+def _abort(connection):
+    """Shut down a connection's socket so a thread blocked reading it returns at once"""
+    sock = connection.sock if connection is not None else None
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class CustomAPIError(Exception):
+    """Non-retryable error, or retries exhausted, talking to a custom API server"""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class ConnectionPool:
+    """Idle keep-alive connections to one host, shared between threads"""
+
+    def __init__(self, scheme, host, port, timeout, max_idle=8):
+        self.connection_class = (http.client.HTTPSConnection if scheme == "https"
+                                 else http.client.HTTPConnection)
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Return (connection, reused)"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self.connection_class(self.host, self.port, timeout=self.timeout), False
+
+    def release(self, connection):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class CustomAPIClient:
+    """Chat completions against an OpenAI-compatible endpoint"""
+
+    def __init__(self, api_url, api_key=None, timeout=60, max_retries=3, backoff=0.5,
+                 max_idle=8):
+        if not api_url:
+            raise ValueError("Custom API URL is required for the custom provider")
+        parts = urlsplit(api_url if "://" in api_url else "http://" + api_url)
+        path = parts.path.rstrip('/')
+        if not path.endswith("/chat/completions"):
+            path += "/chat/completions"
+        self.path = path
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool = ConnectionPool(parts.scheme, parts.hostname, parts.port, timeout, max_idle)
+
+    def _headers(self, stream):
+        headers = {"Content-Type": "application/json",
+                   "Accept": "text/event-stream" if stream else "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    @staticmethod
+    def _retry_after(response):
+        """Seconds from the response's Retry-After header, or None"""
+        retry_after = response.getheader("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return None
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            return retry_after
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    def _request(self, body, stream, cancel=None, active=None):
+        """POST with retries; returns (connection, response) with the body unread
+
+        The connection in use is kept in active['connection'] for cancel's callback.
+        """
+        payload = json.dumps(body).encode('utf-8')
+        attempt = 0
+        while True:
+            connection, reused = self.pool.acquire()
+            if active is not None:
+                active['connection'] = connection
+            try:
+                if connection.sock is None:
+                    connection.connect()
+                # Checked once the socket exists, so a cancel from now on shuts it down
+                if cancel is not None and cancel.cancelled:
+                    connection.close()
+                    raise CustomAPIError("Custom API call cancelled")
+                connection.request("POST", self.path, body=payload, headers=self._headers(stream))
+                response = connection.getresponse()
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                if cancel is not None and cancel.cancelled:
+                    raise CustomAPIError("Custom API call cancelled")
+                if reused and isinstance(e, STALE_CONNECTION_ERRORS):
+                    continue  # the server dropped an idle keep-alive connection
+                if attempt >= self.max_retries:
+                    raise CustomAPIError(f"Custom API unreachable: {e}")
+                time.sleep(self._retry_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status == 200:
+                return connection, response
+
+            detail = response.read().decode('utf-8', 'replace')[:300]
+            self._finish(connection, response)
+            if response.status not in RETRY_STATUSES or attempt >= self.max_retries:
+                raise CustomAPIError(f"Custom API returned HTTP {response.status}: {detail}",
+                                     response.status, self._retry_after(response))
+            time.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+            if cancel is not None and cancel.cancelled:
+                raise CustomAPIError("Custom API call cancelled")
+
+    def _finish(self, connection, response):
+        if response.will_close:
+            connection.close()
+        else:
+            self.pool.release(connection)
+
+    def complete(self, prompt, model=None, temperature=None, max_tokens=1500,
+                 stream=False, on_token=None, cancel=None):
+        """Return the assistant's reply text
+
+        With stream=True the reply is read as server-sent events and on_token(text)
+        is called for every content delta as it arrives. Cancelling cancel (a
+        CancelToken) shuts the connection down and the call raises CustomAPIError.
+        """
+        body = {
+            "model": model or DEFAULT_MODEL,
+            "messages": [
+                {"role": "system", "content": "You are a resume optimization expert. Return only JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": max_tokens,
+            "stream": stream,
+        }
+        if temperature is not None:
+            body["temperature"] = temperature
+
+        active = {}
+        unregister = (cancel.on_cancel(lambda: _abort(active.get('connection')))
+                      if cancel is not None else None)
+        try:
+            connection, response = self._request(body, stream, cancel, active)
+            try:
+                if stream:
+                    text = "".join(self._iter_stream(response, on_token))
+                else:
+                    text = json.loads(response.read())["choices"][0]["message"]["content"]
+            except Exception as e:
+                connection.close()
+                if cancel is not None and cancel.cancelled:
+                    raise CustomAPIError("Custom API call cancelled") from e
+                raise
+        finally:
+            if unregister is not None:
+                unregister()
+        if cancel is not None and cancel.cancelled:
+            connection.close()  # its socket may have been shut down
+        else:
+            self._finish(connection, response)
+        return text
+
+    def _iter_stream(self, response, on_token):
+        for raw_line in response:
+            line = raw_line.decode('utf-8').strip()
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+            if delta:
+                if on_token is not None:
+                    on_token(delta)
+                yield delta
+        response.read()  # drain the terminating chunk so the connection can be reused
+
+    def complete_many(self, prompts, max_concurrency=4, **options):
+        """Complete several prompts concurrently; returns replies (or exceptions) in order"""
+        def run(prompt):
+            try:
+                return self.complete(prompt, **options)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(run, prompts))
+
+    def close(self):
+        self.pool.close()
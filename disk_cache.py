@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent SQLite key/value cache
+Size-bounded LRU eviction, optional per-entry TTL and hit/miss counters.
+Safe to share between threads and between worker processes (WAL mode).
+
+The total size of the entries is kept in a one-row table by triggers, in the
+same transaction as every change, so a write never has to sum the whole table.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def default_cache_dir():
+    """ATS_CACHE_DIR, or ~/.cache/ats_keyword_suggestor"""
+    return os.environ.get('ATS_CACHE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'ats_keyword_suggestor')
+
+
+class DiskCache:
+    """Bytes/str values stored by string key in a single SQLite file"""
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        if path is None:
+            path = os.path.join(default_cache_dir(), 'cache.sqlite3')
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._connect()
+
+    def _connect(self):
+        # A connection must not cross a fork, so reopen in child processes
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                               isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+                            key TEXT PRIMARY KEY,
+                            value BLOB NOT NULL,
+                            size INTEGER NOT NULL,
+                            accessed REAL NOT NULL,
+                            expires REAL)""")
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_expires ON entries(expires) "
+                     "WHERE expires IS NOT NULL")
+        # Created together with the triggers that maintain it and seeded from the
+        # table once, in one transaction so no concurrent write is missed
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""CREATE TABLE IF NOT EXISTS totals (
+                                id INTEGER PRIMARY KEY CHECK (id = 0),
+                                bytes INTEGER NOT NULL)""")
+            conn.execute("""CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+                            BEGIN UPDATE totals SET bytes = bytes + new.size WHERE id = 0; END""")
+            conn.execute("""CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+                            BEGIN UPDATE totals SET bytes = bytes - old.size WHERE id = 0; END""")
+            conn.execute("""CREATE TRIGGER IF NOT EXISTS entries_update
+                            AFTER UPDATE OF size ON entries
+                            BEGIN UPDATE totals SET bytes = bytes + new.size - old.size
+                                  WHERE id = 0; END""")
+            if conn.execute("SELECT 1 FROM totals WHERE id = 0").fetchone() is None:
+                conn.execute("INSERT INTO totals (id, bytes) "
+                             "SELECT 0, COALESCE(SUM(size), 0) FROM entries")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._conn = conn
+        self._pid = os.getpid()
+        return conn
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, expires FROM entries WHERE key = ?",
+                               (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return default
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        size = len(value.encode('utf-8')) if isinstance(value, str) else len(value)
+        expires = now + ttl if ttl else None
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # An upsert, not INSERT OR REPLACE: a replace deletes without firing triggers
+                conn.execute("INSERT INTO entries (key, value, size, accessed, expires) "
+                             "VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                             "value = excluded.value, size = excluded.size, "
+                             "accessed = excluded.accessed, expires = excluded.expires",
+                             (key, value, size, now, expires))
+                self._evict(conn, now)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, key):
+        with self._lock:
+            self._connect().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM entries")
+
+    def _evict(self, conn, now):
+        """Drop expired entries, then least recently used ones until under max_bytes
+
+        Both use an index, so the cost depends on what is dropped, not on the cache size.
+        """
+        conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (now,))
+        total = conn.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total = conn.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses,
+                'entries': entries, 'bytes': total}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake LLM provider server for offline testing
+Speaks the OpenAI chat completions protocol (POST /v1/chat/completions, plain or
+streamed as server-sent events) and answers with keyword suggestions computed
+locally from the prompt. Latency, errors and malformed replies can be injected to
+exercise fan-out, hedging and retries, and a requests/min limit answers the excess
+with HTTP 429 and a Retry-After header, like a throttling provider. Tests can
+script the status of the next replies (fail_next) and read the connection,
+concurrency and Authorization counters the server keeps.
+
+Usage:
+    python fake_provider.py --port 8765 --latency 0.5 --jitter 0.3 --fail-rate 0.1
+    python fake_provider.py --rate-limit 60 --rate-burst 5
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from keyword_engine import extract_keywords
+from provider_scheduler import TokenBucket
+
+
+def suggestions_for_prompt(prompt):
+    """Answer a keyword prompt the way a model would, using the local engine"""
+    resume, _, jd = prompt.partition("JOB DESCRIPTION:")
+    jd = jd.split("Provide suggestions in this EXACT JSON format:")[0]
+    resume = resume.partition("RESUME CONTENT:")[2] or resume
+    suggestions = extract_keywords(resume, jd)
+    suggestions['placement_tips'] = [f"Skills section - add {keyword}"
+                                     for keyword in suggestions['missing_keywords'][:3]]
+    return suggestions
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, model, content):
+        """Send the reply as server-sent events, a few characters per chunk"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_chunk(data):
+            self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        size = self.server.chunk_chars
+        for start in range(0, len(content), size):
+            delta = {"choices": [{"index": 0, "delta": {"content": content[start:start + size]}}],
+                     "model": model, "object": "chat.completion.chunk"}
+            write_chunk(f"data: {json.dumps(delta)}\n\n".encode('utf-8'))
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+        write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+
+    def do_POST(self):
+        self.server.track_active(1)
+        try:
+            self.handle_post()
+        finally:
+            self.server.track_active(-1)
+
+    def handle_post(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self.send_json(400, {"error": {"message": "invalid JSON body"}})
+            return
+
+        if not self.path.rstrip('/').endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": f"unknown endpoint {self.path}"}})
+            return
+
+        server = self.server
+        server.count_request()
+        server.last_authorization = self.headers.get("Authorization")
+        retry_after = server.over_rate_limit()
+        if retry_after is not None:
+            # Fractional seconds keep throttling tests fast; real servers send whole seconds
+            self.send_json(429, {"error": {"message": "rate limit exceeded",
+                                           "type": "rate_limit_exceeded"}},
+                           {"Retry-After": f"{retry_after:.2f}"})
+            return
+        scripted = server.next_scripted()
+        if scripted is not None:
+            status, retry_after = scripted
+            self.send_json(status, {"error": {"message": f"scripted HTTP {status}"}},
+                           {"Retry-After": retry_after} if retry_after is not None else None)
+            return
+        with server.rng_lock:
+            delay = max(0.0, server.latency + server.rng.uniform(-server.jitter, server.jitter))
+            roll = server.rng.random()
+        time.sleep(delay)
+
+        if roll < server.fail_rate:
+            self.send_json(500, {"error": {"message": "injected failure"}})
+            return
+
+        prompt = "\n".join(message.get("content", "") for message in request.get("messages", []))
+        if roll < server.fail_rate + server.garbage_rate:
+            content = "Sorry, I cannot produce JSON right now."
+        else:
+            content = json.dumps(suggestions_for_prompt(prompt))
+
+        if request.get("stream"):
+            self.send_stream(request.get("model", "fake-model"), content)
+            return
+
+        # A real model takes as long to generate the reply whether or not it is streamed
+        if server.token_delay:
+            chunks = -(-len(content) // server.chunk_chars)
+            time.sleep(server.token_delay * chunks)
+
+        self.send_json(200, {
+            "id": f"fake-{server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake-model"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt) // 4,
+                      "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4},
+        })
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 fail_rate=0.0, garbage_rate=0.0, seed=None, verbose=False,
+                 token_delay=0.0, chunk_chars=16, rate_limit=None, rate_burst=1):
+        super().__init__((host, port), FakeProviderHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.garbage_rate = garbage_rate
+        self.verbose = verbose
+        self.token_delay = token_delay
+        self.chunk_chars = chunk_chars
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.last_authorization = None
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self._scripted = []
+        self._count_lock = threading.Lock()
+        # Requests/min allowed, in bursts of up to rate_burst; None = unlimited
+        self.bucket = TokenBucket(rate_limit, rate_burst) if rate_limit else None
+
+    def count_request(self):
+        with self._count_lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self._count_lock:
+            self.connections += 1
+
+    def track_active(self, change):
+        """Count requests being handled; max_active is the most handled at once"""
+        with self._count_lock:
+            self.active += change
+            self.max_active = max(self.max_active, self.active)
+
+    def fail_next(self, status, count=1, retry_after=None):
+        """Answer the next count requests with HTTP status (and Retry-After, if given)"""
+        with self._count_lock:
+            self._scripted.extend([(status, retry_after)] * count)
+
+    def next_scripted(self):
+        with self._count_lock:
+            return self._scripted.pop(0) if self._scripted else None
+
+    def over_rate_limit(self):
+        """None if this request is within the rate limit, else seconds until one would be"""
+        if self.bucket is None:
+            return None
+        with self._count_lock:
+            now = time.monotonic()
+            wait = self.bucket.wait_time(1, now)
+            if wait > 0:
+                self.throttled += 1
+                return wait
+            self.bucket.take(1, now)
+            return None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_fake_provider(**options):
+    """Start a FakeProviderServer on a background thread and return it
+
+    Use server.url as the provider's API URL and server.shutdown() to stop it.
+    """
+    server = FakeProviderServer(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible provider for offline tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- delay jitter in seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500")
+    parser.add_argument("--garbage-rate", type=float, default=0.0, help="Share of replies that are not JSON")
+    parser.add_argument("--token-delay", type=float, default=0.0,
+                        help="Generation time per chunk of reply in seconds (streamed or not)")
+    parser.add_argument("--rate-limit", type=int,
+                        help="Requests per minute; the excess gets HTTP 429 with Retry-After")
+    parser.add_argument("--rate-burst", type=int, default=1,
+                        help="Requests allowed back to back under --rate-limit")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = FakeProviderServer(args.host, args.port, args.latency, args.jitter,
+                                args.fail_rate, args.garbage_rate, args.seed, verbose=True,
+                                token_delay=args.token_delay, rate_limit=args.rate_limit,
+                                rate_burst=args.rate_burst)
+    print(f"Fake provider listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
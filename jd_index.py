@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JD index and resume x JD matching matrix
+Each job description is parsed once; resumes are tokenized once and scored against every JD
+through an inverted index of sparse keyword weights
+"""
+
+import heapq
+from collections import defaultdict
+
+from keyword_engine import DocumentIndex, compare_documents, is_keyword
+from pipeline_metrics import timed
+
+
+class JDIndex(DocumentIndex):
+    """A parsed job description with its stop-word-filtered keyword weights"""
+
+    def __init__(self, text, name=None):
+        super().__init__(text)
+        self.name = name
+
+        # Sparse keyword vector: term -> frequency in the JD
+        self.keyword_weights = {word: count for word, count in self.counts.items()
+                                if is_keyword(word)}
+        self.total_weight = sum(self.keyword_weights.values())
+
+    def score(self, resume):
+        """Share of the JD's keyword weight present in an indexed resume (0..1)"""
+        if not self.total_weight:
+            return 0.0
+        matched = sum(weight for word, weight in self.keyword_weights.items()
+                      if word in resume.vocabulary)
+        return matched / self.total_weight
+
+    def suggestions(self, resume):
+        """Full keyword suggestion dict for an indexed resume"""
+        return compare_documents(resume, self)
+
+
+class JDMatrix:
+    """Scores resumes against many JDs at once using an inverted term index"""
+
+    def __init__(self, jds):
+        # jds: mapping of name -> text, or iterable of (name, text)
+        items = jds.items() if hasattr(jds, 'items') else jds
+        self.jds = [JDIndex(text, name) for name, text in items]
+        self.names = [jd.name for jd in self.jds]
+
+        self.postings = defaultdict(list)
+        for position, jd in enumerate(self.jds):
+            for word, weight in jd.keyword_weights.items():
+                self.postings[word].append((position, weight))
+
+    def __len__(self):
+        return len(self.jds)
+
+    @timed('keyword_scoring')
+    def scores(self, resume):
+        """Coverage score of one resume (text or DocumentIndex) against every JD"""
+        if isinstance(resume, str):
+            resume = DocumentIndex(resume)
+        # Integer accumulation keeps scores identical across processes
+        matched = [0] * len(self.jds)
+        for word in resume.vocabulary:
+            for position, weight in self.postings.get(word, ()):
+                matched[position] += weight
+        return [count / jd.total_weight if jd.total_weight else 0.0
+                for count, jd in zip(matched, self.jds)]
+
+    def match(self, resumes, top_k=5):
+        """Rank resumes and JDs against each other
+
+        resumes: mapping or iterable of (name, text or DocumentIndex) pairs.
+        Returns {'by_resume': {resume: [(jd, score), ...]},
+                 'by_jd': {jd: [(resume, score), ...]}}
+        """
+        ranking = MatchRanking(self.names, top_k)
+        items = resumes.items() if hasattr(resumes, 'items') else resumes
+        for name, resume in items:
+            ranking.add(name, self.scores(resume))
+        return ranking.result()
+
+
+class MatchRanking:
+    """Keeps the top-k results per resume and per JD while score rows stream in"""
+
+    def __init__(self, jd_names, top_k=5):
+        self.jd_names = list(jd_names)
+        self.top_k = top_k
+        self.by_resume = {}
+        self._jd_heaps = [[] for _ in self.jd_names]
+        self._order = 0
+
+    def add(self, resume_name, scores):
+        best = heapq.nlargest(self.top_k, range(len(scores)), key=scores.__getitem__)
+        self.by_resume[resume_name] = [(self.jd_names[i], scores[i]) for i in best]
+
+        # Min-heaps of (score, -order, name) keep the earliest resume on ties
+        self._order += 1
+        for heap, score in zip(self._jd_heaps, scores):
+            entry = (score, -self._order, resume_name)
+            if len(heap) < self.top_k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        return self.by_resume[resume_name]
+
+    def jd_rankings(self):
+        return {
+            name: [(resume, score) for score, _, resume in sorted(heap, reverse=True)]
+            for name, heap in zip(self.jd_names, self._jd_heaps)
+        }
+
+    def result(self):
+        return {'by_resume': self.by_resume, 'by_jd': self.jd_rankings()}
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local keyword engine
+Tokenizes each document once and compares resume and job description with set lookups
+"""
+
+import re
+from collections import Counter
+from functools import cached_property
+
+from pipeline_metrics import span, timed
+from term_matcher import TermMatcher, default_skills_matcher
+
+
+# Capitalized phrases, acronyms and plain words (same tokens the GUI always used)
+TOKEN_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b|\b[A-Z]+\b|\b\w+\b')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+# Common stop words to ignore
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
+    'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'should', 'could', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'
+})
+
+COMMON_ACTION_VERBS = (
+    'developed', 'designed', 'implemented', 'created', 'built', 'managed',
+    'led', 'coordinated', 'executed', 'delivered', 'achieved', 'improved',
+    'optimized', 'analyzed', 'evaluated', 'collaborated', 'contributed',
+    'established', 'maintained', 'enhanced', 'streamlined', 'automated',
+    'integrated', 'deployed', 'architected', 'engineered', 'facilitated'
+)
+
+# Whole-word matcher for all verbs at once
+ACTION_VERB_MATCHER = TermMatcher(COMMON_ACTION_VERBS)
+
+
+class DocumentIndex:
+    """Tokens, vocabulary, counts and bigrams of one document, computed once"""
+
+    def __init__(self, text):
+        self.text = text
+
+        with span('tokenize'):
+            # Token stream used for keyword and technical term extraction
+            self.tokens = TOKEN_PATTERN.findall(text)
+            lower_tokens = [token.lower() for token in self.tokens]
+            self.vocabulary = set(lower_tokens)
+            self.counts = Counter(lower_tokens)
+
+            # Punctuation-free word stream used for phrase extraction
+            self.words = PUNCTUATION_PATTERN.sub(' ', text.lower()).split()
+            self.bigrams = set(zip(self.words, self.words[1:]))
+
+    @cached_property
+    def action_verbs(self):
+        return extract_action_verbs(self.text)
+
+    @cached_property
+    def skills(self):
+        """Canonical names of skills-dictionary terms (and synonyms) in the text"""
+        return default_skills_matcher().find(self.text)
+
+
+def is_keyword(word):
+    """True for lowercase tokens worth suggesting as keywords"""
+    return len(word) > 3 and word not in STOP_WORDS and not word.isdigit()
+
+
+def missing_keywords(resume, jd, limit=100, weights=None):
+    """Most frequent JD words that never appear in the resume
+
+    With weights (term -> weight, e.g. CorpusStats.bm25_weights) the words are
+    ranked by weight instead, ties keeping frequency order.
+    """
+    if weights is None:
+        keywords = []
+        for word, count in jd.counts.most_common(limit):
+            if is_keyword(word) and word not in resume.vocabulary:
+                keywords.append(word.title())
+        return keywords
+
+    candidates = [word for word, count in jd.counts.most_common()
+                  if is_keyword(word) and word not in resume.vocabulary]
+    candidates.sort(key=lambda word: -weights.get(word, 0.0))
+    return [word.title() for word in candidates[:limit]]
+
+
+def technical_terms(resume, jd):
+    """Capitalized words and acronyms from the JD that the resume lacks"""
+    terms = {}
+    for word in jd.tokens:
+        if (len(word) > 2 and
+                (word.isupper() or word[0].isupper())):
+            lowered = word.lower()
+            if lowered not in STOP_WORDS and lowered not in resume.vocabulary:
+                terms[word] = None
+    return list(terms)
+
+
+def missing_bigrams(resume, jd):
+    """Two-word JD phrases that the resume does not contain"""
+    phrases = {}
+    for first, second in zip(jd.words, jd.words[1:]):
+        if ((first, second) not in resume.bigrams and
+                first not in STOP_WORDS and
+                second not in STOP_WORDS and
+                len(first) > 2 and len(second) > 2):
+            phrases[f"{first} {second}".title()] = None
+    return list(phrases)
+
+
+def ordered_action_verbs(found):
+    """Up to 10 of the found (lowercase) verbs, titled, in COMMON_ACTION_VERBS order"""
+    found_verbs = [verb.title() for verb in COMMON_ACTION_VERBS if verb in found]
+
+    return found_verbs[:10]
+
+
+def extract_action_verbs(text):
+    """Extract action verbs from job description"""
+    return ordered_action_verbs(set(ACTION_VERB_MATCHER.find(text)))
+
+
+def missing_skills(resume, jd):
+    """Dictionary skills the JD asks for that the resume covers under no spelling"""
+    covered = set(resume.skills)
+    return [skill for skill in jd.skills if skill not in covered]
+
+
+def _merge_terms(skills, terms, known):
+    """skills followed by the terms that are neither repeats nor spellings of a known skill"""
+    matcher = default_skills_matcher()
+    seen = {skill.lower() for skill in skills}
+    merged = list(skills)
+    for term in terms:
+        if term.lower() in seen:
+            continue
+        canonical = matcher.find(term)
+        if canonical and known.issuperset(canonical):
+            continue
+        seen.add(term.lower())
+        merged.append(term)
+    return merged
+
+
+@timed('keyword_scoring')
+def compare_documents(resume, jd, weights=None):
+    """Build the suggestion dict for two already indexed documents
+
+    weights optionally ranks the JD's missing keywords (see missing_keywords).
+    """
+    skills = missing_skills(resume, jd)
+    covered = set(resume.skills)
+    keywords = _merge_terms([], missing_keywords(resume, jd, weights=weights), covered)
+    known = covered.union(skills)
+    tech_terms = _merge_terms(skills, technical_terms(resume, jd), known)
+    bigrams = missing_bigrams(resume, jd)
+
+    return {
+        'missing_keywords': keywords[:20],
+        'technical_terms': tech_terms[:15],
+        'key_phrases': bigrams[:15],
+        'suggestions': {
+            'skills': _merge_terms(skills, keywords, known)[:10],
+            'experience': bigrams[:8],
+            'action_verbs': list(jd.action_verbs)
+        }
+    }
+
+
+def extract_keywords(resume_content, jd, corpus=None):
+    """Extract keywords locally without API
+
+    With a CorpusStats the JD is counted into the corpus and its missing keywords
+    are ranked by BM25 weight.
+    """
+    jd = DocumentIndex(jd)
+    weights = None
+    if corpus is not None:
+        corpus.add_document(jd)
+        weights = corpus.bm25_weights(jd)
+    return compare_documents(DocumentIndex(resume_content), jd, weights)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental JD analysis for live mode
+The JD is indexed line by line. An edit only re-tokenizes the lines between the
+unchanged head and tail of the text, and the JD's term counts, bigrams and the
+resume's keyword coverage are updated from the difference.
+
+Tokens do not span line breaks here, so a capitalized phrase broken over two
+lines counts as two words (DocumentIndex would join them).
+"""
+
+from collections import Counter
+from itertools import chain
+
+from keyword_engine import (ACTION_VERB_MATCHER, TOKEN_PATTERN, PUNCTUATION_PATTERN,
+                            DocumentIndex, compare_documents, is_keyword, ordered_action_verbs)
+from term_matcher import default_skills_matcher
+
+
+class LineIndex:
+    """Tokens, words, skills and action verbs of one line"""
+
+    __slots__ = ('tokens', 'lower_tokens', 'words', 'skills', 'verbs')
+
+    def __init__(self, line):
+        self.tokens = TOKEN_PATTERN.findall(line)
+        self.lower_tokens = [token.lower() for token in self.tokens]
+        self.words = PUNCTUATION_PATTERN.sub(' ', line.lower()).split()
+        self.skills = default_skills_matcher().find(line)
+        self.verbs = ACTION_VERB_MATCHER.find(line)
+
+
+def _bigrams(words):
+    return Counter(zip(words, words[1:]))
+
+
+class LiveDocument:
+    """A DocumentIndex stand-in that is updated in place as its text is edited"""
+
+    def __init__(self, text=""):
+        self.text = ""
+        self.lines = [""]
+        self.line_indexes = [LineIndex("")]
+        self.counts = Counter()
+        self.bigram_counts = Counter()
+        self._cache = {}
+        self.update(text)
+
+    def update(self, text):
+        """Re-index only the changed lines; returns {term: change in count}"""
+        new_lines = text.split('\n')
+        old_lines = self.lines
+        shortest = min(len(old_lines), len(new_lines))
+        head = 0
+        while head < shortest and old_lines[head] == new_lines[head]:
+            head += 1
+        tail = 0
+        while (tail < shortest - head and
+               old_lines[len(old_lines) - 1 - tail] == new_lines[len(new_lines) - 1 - tail]):
+            tail += 1
+
+        old_region = self.line_indexes[head:len(old_lines) - tail]
+        new_region = [LineIndex(line) for line in new_lines[head:len(new_lines) - tail]]
+
+        delta = Counter()
+        for line_index in old_region:
+            delta.subtract(line_index.lower_tokens)
+        for line_index in new_region:
+            delta.update(line_index.lower_tokens)
+
+        # Bigrams may cross line breaks: include the nearest word on either side
+        before = self._word_before(head)
+        after = self._word_after(len(old_lines) - tail)
+        old_words = before + [word for index in old_region for word in index.words] + after
+        new_words = before + [word for index in new_region for word in index.words] + after
+        bigram_delta = _bigrams(new_words)
+        bigram_delta.subtract(_bigrams(old_words))
+
+        self.lines = new_lines
+        self.line_indexes[head:len(old_lines) - tail] = new_region
+        self.text = text
+        self._apply(self.counts, delta)
+        self._apply(self.bigram_counts, bigram_delta)
+        self._cache.clear()
+        return {term: change for term, change in delta.items() if change}
+
+    @staticmethod
+    def _apply(counter, delta):
+        for key, change in delta.items():
+            if change:
+                count = counter[key] + change
+                if count > 0:
+                    counter[key] = count
+                else:
+                    del counter[key]
+
+    def _word_before(self, line_number):
+        for index in reversed(self.line_indexes[:line_number]):
+            if index.words:
+                return [index.words[-1]]
+        return []
+
+    def _word_after(self, line_number):
+        for index in self.line_indexes[line_number:]:
+            if index.words:
+                return [index.words[0]]
+        return []
+
+    def _joined(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def tokens(self):
+        return self._joined('tokens', lambda: list(chain.from_iterable(
+            index.tokens for index in self.line_indexes)))
+
+    @property
+    def words(self):
+        return self._joined('words', lambda: list(chain.from_iterable(
+            index.words for index in self.line_indexes)))
+
+    @property
+    def vocabulary(self):
+        return self.counts.keys()
+
+    @property
+    def bigrams(self):
+        return self.bigram_counts.keys()
+
+    @property
+    def skills(self):
+        return self._joined('skills', lambda: list(dict.fromkeys(chain.from_iterable(
+            index.skills for index in self.line_indexes))))
+
+    @property
+    def action_verbs(self):
+        return self._joined('action_verbs', lambda: ordered_action_verbs(set(chain.from_iterable(
+            index.verbs for index in self.line_indexes))))
+
+
+class LiveAnalysis:
+    """Keeps the suggestions for one resume current while its JD is being edited"""
+
+    def __init__(self, resume_text, corpus=None):
+        self.resume = DocumentIndex(resume_text)
+        self.jd = LiveDocument()
+        self.corpus = corpus
+        # Keyword occurrences in the JD, and those whose word the resume contains
+        self.total_weight = 0
+        self.matched_weight = 0
+
+    def update(self, jd_text):
+        """Apply the edited JD text and return the refreshed suggestion dict"""
+        for term, change in self.jd.update(jd_text).items():
+            if is_keyword(term):
+                self.total_weight += change
+                if term in self.resume.vocabulary:
+                    self.matched_weight += change
+        return self.suggestions()
+
+    @property
+    def coverage(self):
+        """Share of the JD's keyword occurrences covered by the resume (0..1), like JDIndex.score"""
+        return self.matched_weight / self.total_weight if self.total_weight else 0.0
+
+    def suggestions(self):
+        weights = None
+        if self.corpus is not None and self.jd.counts:
+            # Ranked against the corpus without counting every draft of the JD into it
+            weights = self.corpus.bm25_weights(self.jd)
+        return compare_documents(self.resume, self.jd, weights)
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM provider calls for AI keyword suggestions
+Headless so the calls can run on worker threads: every setting is passed in
+explicitly instead of being read from Tk variables.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+from pipeline_metrics import span, timed
+from prompt_builder import estimate_tokens, fit_to_budget, format_immutable_fields
+from provider_scheduler import REPLY_TOKENS, current_cancel_token, scheduler
+from suggestion_stream import SuggestionStreamParser, extract_json_object
+
+
+SUGGESTION_LIST_FIELDS = ('missing_keywords', 'technical_terms', 'key_phrases')
+
+DEFAULT_MODELS = {
+    'openai': "gpt-3.5-turbo",
+    'anthropic': "claude-3-haiku-20240307",
+    'google': "gemini-1.5-flash",
+    'custom': "local-model",  # custom_api.DEFAULT_MODEL (not imported: it loads http.client)
+}
+
+# Sampling temperature sent with each request (None = provider default)
+PROVIDER_TEMPERATURES = {
+    'openai': 0.5,
+    'custom': 0.5,
+}
+
+
+# Prompt size limit in tokens (estimated), per "provider:model" or provider;
+# ATS_PROMPT_TOKENS overrides all of them
+DEFAULT_PROMPT_TOKENS = 2000
+PROMPT_TOKEN_BUDGETS = {
+    # Self-hosted models often run with a small context window
+    'custom': 1500,
+}
+
+PROMPT_TEMPLATE = """Analyze this resume and job description. Provide keyword suggestions for manual optimization.
+
+PROTECTED FIELDS (keep unchanged): {fields}
+
+RESUME CONTENT:
+{resume}
+
+JOB DESCRIPTION:
+{jd}
+
+Provide suggestions in this EXACT JSON format:
+{{
+  "missing_keywords": ["keyword1", "keyword2", ...],
+  "technical_terms": ["term1", "term2", ...],
+  "key_phrases": ["phrase1", "phrase2", ...],
+  "suggestions": {{
+    "skills": ["skill1", "skill2", ...],
+    "experience": ["accomplishment phrase1", ...],
+    "action_verbs": ["verb1", "verb2", ...]
+  }},
+  "placement_tips": [
+    "Where to add: specific section - keyword suggestion",
+    ...
+  ]
+}}
+
+Focus on keywords that naturally fit the resume without lying. Return ONLY the JSON, no other text."""
+
+
+def prompt_token_budget(provider=None, model=None):
+    """Token budget for a prompt to provider/model"""
+    override = os.environ.get('ATS_PROMPT_TOKENS')
+    if override:
+        return int(override)
+    if model and f"{provider}:{model}" in PROMPT_TOKEN_BUDGETS:
+        return PROMPT_TOKEN_BUDGETS[f"{provider}:{model}"]
+    return PROMPT_TOKEN_BUDGETS.get(provider, DEFAULT_PROMPT_TOKENS)
+
+
+@timed('prompt_build')
+def build_prompt(resume_content, jd, immutable_fields, token_budget=None):
+    """The suggestion prompt, within token_budget (default: DEFAULT_PROMPT_TOKENS)
+
+    LaTeX markup and contact details are stripped and the resume sections and JD
+    lines most relevant to the JD are kept (see prompt_builder).
+    """
+    if token_budget is None:
+        token_budget = DEFAULT_PROMPT_TOKENS
+    fields = format_immutable_fields(immutable_fields)
+    overhead = estimate_tokens(PROMPT_TEMPLATE.format(fields=fields, resume="", jd=""))
+    resume_text, jd_text = fit_to_budget(resume_content, jd, token_budget - overhead,
+                                         immutable_fields)
+    return PROMPT_TEMPLATE.format(fields=fields, resume=resume_text, jd=jd_text)
+
+
+def _import_openai():
+    # NOTE: This requires the 'openai' library to be installed and configured
+    try:
+        import openai
+    except ImportError:
+        raise ImportError("The 'openai' library is not installed. Please install it with 'pip install openai'")
+    return openai
+
+
+def _import_anthropic():
+    # NOTE: This requires the 'anthropic' library to be installed and configured
+    try:
+        import anthropic
+    except ImportError:
+        raise ImportError("The 'anthropic' library is not installed. Please install it with 'pip install anthropic'")
+    return anthropic
+
+
+def _import_genai():
+    # NOTE: This requires the 'google-genai' library to be installed and configured
+    try:
+        import google.generativeai as genai
+    except ImportError:
+        raise ImportError("The 'google-genai' library is not installed. Please install it with 'pip install google-genai'")
+    return genai
+
+
+class ProviderClients:
+    """Thread-safe registry that builds each provider client once and reuses it
+
+    Clients keep their HTTP connection pools (keep-alive, TLS sessions) between
+    calls. OpenAI, Anthropic and custom clients are keyed by (key, url); Google models by
+    (key, model). google-generativeai only supports one configured key per process,
+    so switching Google keys rebuilds its models.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._google_key = None
+
+    def get(self, provider, api_key, model=None, api_url=None):
+        if provider == "google":
+            cache_key = (provider, api_key, model or DEFAULT_MODELS['google'], None)
+        else:
+            cache_key = (provider, api_key, None, api_url)
+
+        client = self._clients.get(cache_key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(cache_key)
+            if client is None:
+                client = self._build(provider, api_key, model, api_url)
+                self._clients[cache_key] = client
+            return client
+
+    def _build(self, provider, api_key, model, api_url):
+        if provider == "openai":
+            openai = _import_openai()
+            return openai.OpenAI(api_key=api_key or "none", base_url=api_url or None)
+        if provider == "anthropic":
+            anthropic = _import_anthropic()
+            return anthropic.Anthropic(api_key=api_key, base_url=api_url or None)
+        if provider == "custom":
+            # http.client is only loaded once a custom server is actually used
+            from custom_api import CustomAPIClient
+            return CustomAPIClient(api_url, api_key)
+        if provider == "google":
+            genai = _import_genai()
+            if self._google_key != api_key:
+                genai.configure(api_key=api_key)
+                self._google_key = api_key
+                for key in [key for key in self._clients if key[0] == "google"]:
+                    del self._clients[key]
+            return genai.GenerativeModel(model or DEFAULT_MODELS['google'])
+        raise ValueError(f"Unsupported API provider: {provider}")
+
+    def clear(self):
+        with self._lock:
+            for client in self._clients.values():
+                close = getattr(client, 'close', None)
+                if close is not None:
+                    close()
+            self._clients.clear()
+
+
+# Shared by every call in the process
+provider_clients = ProviderClients()
+
+
+def _collect_stream(deltas, on_token):
+    """Pass each streamed text delta to on_token and return the whole reply"""
+    parts = []
+    for delta in deltas:
+        if delta:
+            on_token(delta)
+            parts.append(delta)
+    return ''.join(parts)
+
+
+def call_openai_simple(prompt, api_key, model=None, api_url=None, on_token=None):
+    """Simplified OpenAI call for suggestions
+
+    api_url points the call at any OpenAI-compatible server (e.g. fake_provider.py).
+    With on_token the reply is streamed and on_token(text) is called per delta.
+    """
+    client = provider_clients.get("openai", api_key, model, api_url)
+
+    response = client.chat.completions.create(
+        model=model or DEFAULT_MODELS['openai'],
+        messages=[
+            {"role": "system", "content": "You are a resume optimization expert. Return only JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=PROVIDER_TEMPERATURES['openai'],
+        max_tokens=1500,
+        stream=on_token is not None
+    )
+    if on_token is None:
+        return response.choices[0].message.content
+    with response:
+        return _collect_stream((chunk.choices[0].delta.content
+                                for chunk in response if chunk.choices), on_token)
+
+
+def call_anthropic_simple(prompt, api_key, model=None, api_url=None, on_token=None):
+    """Simplified Anthropic call for suggestions"""
+    client = provider_clients.get("anthropic", api_key, model, api_url)
+
+    request = dict(
+        model=model or DEFAULT_MODELS['anthropic'],
+        max_tokens=2000,
+        messages=[{"role": "user", "content": prompt}]
+    )
+    if on_token is None:
+        message = client.messages.create(**request)
+        return message.content[0].text
+    with client.messages.stream(**request) as stream:
+        return _collect_stream(stream.text_stream, on_token)
+
+
+def call_google_simple(prompt, api_key, model=None, on_token=None):
+    """Simplified Google call for suggestions"""
+    generative_model = provider_clients.get("google", api_key, model)
+
+    if on_token is None:
+        response = generative_model.generate_content(prompt)
+        return response.text
+    response = generative_model.generate_content(prompt, stream=True)
+    return _collect_stream((chunk.text for chunk in response), on_token)
+
+
+def call_custom_api(prompt, api_key, model=None, api_url=None, on_token=None):
+    """Call a self-hosted OpenAI-compatible server at api_url"""
+    client = provider_clients.get("custom", api_key, model, api_url)
+    return client.complete(prompt, model=model, temperature=PROVIDER_TEMPERATURES.get('custom'),
+                           stream=on_token is not None, on_token=on_token,
+                           cancel=current_cancel_token())
+
+
+def call_custom_api_batch(prompts, api_key, model=None, api_url=None, max_concurrency=4):
+    """Send several prompts to a custom server over one connection pool
+
+    Returns the replies in order; a failed prompt yields its exception instead.
+    """
+    client = provider_clients.get("custom", api_key, model, api_url)
+    return client.complete_many(prompts, max_concurrency=max_concurrency, model=model,
+                                temperature=PROVIDER_TEMPERATURES.get('custom'))
+
+
+def _timing_first_token(on_token, stage):
+    """Wrap on_token to note the time to first token on the provider_call span"""
+    started = time.perf_counter()
+    waiting = True
+
+    def timed_on_token(text):
+        nonlocal waiting
+        if waiting:
+            waiting = False
+            stage.set(first_token_s=round(time.perf_counter() - started, 6))
+        on_token(text)
+    return timed_on_token
+
+
+def call_provider(provider, prompt, api_key, model=None, api_url=None, on_token=None):
+    """Send a prompt to the selected provider and return the raw response text
+
+    With on_token the reply is streamed and on_token(text) is called as text arrives.
+    The call waits its turn in the provider's rate limits and is retried after
+    HTTP 429 replies (see provider_scheduler.scheduling for priority and deadline).
+    """
+    return scheduler.call(provider, model, api_url, estimate_tokens(prompt) + REPLY_TOKENS,
+                          _timed_call, time.perf_counter(), provider, prompt, api_key, model,
+                          api_url, on_token)
+
+
+def _timed_call(queued, provider, prompt, api_key, model, api_url, on_token):
+    with span('provider_call', provider=provider, model=model,
+              wait_s=round(time.perf_counter() - queued, 6)) as stage:
+        if on_token is not None:
+            on_token = _timing_first_token(on_token, stage)
+
+        return _call_provider(provider, prompt, api_key, model, api_url, on_token)
+
+
+def _call_provider(provider, prompt, api_key, model, api_url, on_token):
+    if provider == "openai":
+        return call_openai_simple(prompt, api_key, model, api_url, on_token)
+    elif provider == "anthropic":
+        return call_anthropic_simple(prompt, api_key, model, api_url, on_token)
+    elif provider == "google":
+        return call_google_simple(prompt, api_key, model, on_token)
+    elif provider == "custom":
+        return call_custom_api(prompt, api_key, model, api_url, on_token)
+    else:
+        raise ValueError(f"Unsupported API provider: {provider}")
+
+
+def parse_text_suggestions(text):
+    """Parse plain text suggestions if JSON fails"""
+    return {
+        'missing_keywords': re.findall(r'keyword[s]?:\s*([^\n]+)', text, re.I),
+        'technical_terms': re.findall(r'technical[^:]*:\s*([^\n]+)', text, re.I),
+        'key_phrases': [],
+        'suggestions': {
+            'skills': [],
+            'experience': [],
+            'action_verbs': []
+        }
+    }
+
+
+@timed('json_parse')
+def parse_suggestions(response_text):
+    """Extract the suggestion dict from a provider response"""
+    parser = SuggestionStreamParser()
+    parser.feed(response_text)
+    if parser.started:
+        return json.loads(parser.text())
+    else:
+        # If no JSON found, parse as plain text
+        return parse_text_suggestions(response_text)
+
+
+def validate_suggestions(suggestions):
+    """Return suggestions if it matches the suggestion schema, or raise ValueError"""
+    if not isinstance(suggestions, dict):
+        raise ValueError("response JSON is not an object")
+    for field in SUGGESTION_LIST_FIELDS:
+        if not isinstance(suggestions.get(field), list):
+            raise ValueError(f"response JSON has no '{field}' list")
+    if not isinstance(suggestions.get('suggestions', {}), dict):
+        raise ValueError("response JSON 'suggestions' is not an object")
+    return suggestions
+
+
+@timed('json_parse')
+def parse_json_suggestions(response_text):
+    """Strictly parse a provider reply into the suggestion schema, or raise ValueError"""
+    return validate_suggestions(extract_json_object(response_text or ""))
+
+
+def get_keyword_suggestions(resume_content, jd, immutable_fields, provider, api_key,
+                            model=None, api_url=None):
+    """Use AI API to get intelligent keyword suggestions"""
+    prompt = build_prompt(resume_content, jd, immutable_fields,
+                          prompt_token_budget(provider, model))
+    response_text = call_provider(provider, prompt, api_key, model, api_url)
+    return parse_suggestions(response_text)
+
+
+def stream_suggestions(prompt, provider, api_key, model=None, api_url=None, on_item=None):
+    """Stream a reply, calling on_item(path, item) for each list item as it completes
+
+    Returns (response_text, parser); parser.result() holds the complete object.
+    """
+    parser = SuggestionStreamParser()
+
+    def on_token(text):
+        for path, item in parser.feed(text):
+            on_item(path, item)
+
+    response_text = call_provider(provider, prompt, api_key, model, api_url, on_token)
+    return response_text, parser
+
+
+def get_keyword_suggestions_cached(resume_content, jd, immutable_fields, provider, api_key,
+                                   model=None, api_url=None, cache=None, refresh=False,
+                                   on_item=None):
+    """Like get_keyword_suggestions, but served from a ResponseCache when possible
+
+    Returns (suggestions, cache_hit). refresh=True skips the lookup but still stores
+    the new reply. Only replies that parse into the suggestion schema are cached.
+    With on_item the reply is streamed and on_item(path, item) is called for every
+    list item as soon as it arrives (path as in SuggestionStreamParser).
+    """
+    prompt = build_prompt(resume_content, jd, immutable_fields,
+                          prompt_token_budget(provider, model))
+    if cache is not None and not refresh:
+        cached = cache.get(provider, model, prompt, api_url=api_url)
+        if cached is not None:
+            return cached, True
+
+    if on_item is None:
+        response_text = call_provider(provider, prompt, api_key, model, api_url)
+        parser = SuggestionStreamParser()
+    else:
+        # Items were parsed as they streamed in; only the final check is timed below
+        response_text, parser = stream_suggestions(prompt, provider, api_key, model,
+                                                   api_url, on_item)
+    try:
+        with span('json_parse'):
+            if on_item is None:
+                parser.feed(response_text or "")
+            suggestions = validate_suggestions(parser.result())
+    except ValueError:
+        return parse_suggestions(response_text), False
+
+    if cache is not None:
+        cache.put(provider, model, prompt, suggestions, api_url=api_url)
+    return suggestions, False
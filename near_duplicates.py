@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Near-duplicate detection for resumes and job descriptions
+Documents are cut into overlapping word shingles and summarized by a MinHash
+signature whose agreement with another signature estimates the Jaccard
+similarity of their shingle sets. Signatures are split into LSH bands so a lookup
+only compares against documents sharing at least one band, not the whole index.
+
+Used to reuse the AI suggestions of a near-identical resume/JD pair
+(SuggestionMemo) and to report clusters of near-duplicates in batch runs.
+"""
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+NUM_PERM = 128
+SHINGLE_WORDS = 3
+DEFAULT_THRESHOLD = 0.85
+# Chance that a pair right at the threshold shares an LSH band
+LSH_RECALL = 0.9
+
+# Permutations are multiply-shift hashes: the top 32 bits of a * x + b computed
+# modulo 2**64 (uint64 arithmetic wraps), with fixed random odd a and random b
+_SEED = 0x5EED
+_EMPTY = np.uint32(0xFFFFFFFF)
+
+# Shingles hashed per block, bounding the (shingles x permutations) temporary
+BLOCK_SHINGLES = 4096
+
+WORD_PATTERN = re.compile(r'\w+')
+
+_permutations = {}
+
+
+def _coefficients(num_perm):
+    """Fixed (a, b) hash coefficients, identical in every process"""
+    if num_perm not in _permutations:
+        rng = np.random.RandomState(_SEED)
+        a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2)
+        _permutations[num_perm] = (a, b)
+    return _permutations[num_perm]
+
+
+def shingles(text, size=SHINGLE_WORDS):
+    """Unique 32-bit hashes of the text's lower-cased word `size`-grams
+
+    Texts shorter than size words give one shingle of all their words.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    ids = {}
+    word_hashes = np.fromiter(
+        (ids.setdefault(word, zlib.crc32(word.encode('utf-8'))) for word in words),
+        dtype=np.uint64, count=len(words))
+    size = min(size, len(words))
+    count = len(words) - size + 1
+    hashes = word_hashes[:count].copy()
+    for offset in range(1, size):
+        hashes = (hashes * np.uint64(1000003)) ^ word_hashes[offset:offset + count]
+        hashes &= np.uint64(0xFFFFFFFF)
+    return np.unique(hashes)
+
+
+def minhash(text, num_perm=NUM_PERM, size=SHINGLE_WORDS):
+    """MinHash signature (uint32 array of num_perm values) of a text's shingles"""
+    values = shingles(text, size)
+    a, b = _coefficients(num_perm)
+    signature = np.full(num_perm, _EMPTY, dtype=np.uint32)
+    for start in range(0, len(values), BLOCK_SHINGLES):
+        hashed = np.multiply(values[start:start + BLOCK_SHINGLES, None], a)
+        hashed += b
+        hashed >>= np.uint64(32)
+        np.minimum(signature, hashed.min(axis=0), out=signature, casting='unsafe')
+    return signature
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures (share of equal values)"""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+def lsh_params(threshold, num_perm=NUM_PERM, recall=LSH_RECALL):
+    """(bands, rows) for an LSH index finding pairs at least threshold similar
+
+    A pair with similarity s shares a band with probability 1 - (1 - s**rows)**bands.
+    Takes the most rows (fewest spurious candidates to check) that still catch a
+    pair right at the threshold with probability `recall`; more similar pairs are
+    caught even more surely.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of keyed documents in LSH buckets (thread-safe)"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM, shingle_words=SHINGLE_WORDS):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key):
+        return key in self._signatures
+
+    def signature(self, text):
+        return minhash(text, self.num_perm, self.shingle_words)
+
+    def signature_of(self, key):
+        """Signature of an indexed document"""
+        return self._signatures[key]
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                for band in range(self.bands)]
+
+    def add(self, key, text=None, signature=None):
+        """Index a document by key (replacing an earlier one); returns its signature"""
+        if signature is None:
+            signature = self.signature(text)
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+            self._signatures[key] = signature
+            for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+                buckets.setdefault(band_key, []).append(key)
+        return signature
+
+    def remove(self, key):
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+
+    def _remove(self, key):
+        signature = self._signatures.pop(key)
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            keys = buckets[band_key]
+            keys.remove(key)
+            if not keys:
+                del buckets[band_key]
+
+    def query(self, text=None, signature=None, threshold=None):
+        """[(key, similarity)] of indexed documents at least threshold similar, best first"""
+        if signature is None:
+            signature = self.signature(text)
+        if threshold is None:
+            threshold = self.threshold
+        with self._lock:
+            candidates = set()
+            for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+                candidates.update(buckets.get(band_key, ()))
+            scored = [(key, similarity(signature, self._signatures[key])) for key in candidates]
+        matches = [(key, score) for key, score in scored if score >= threshold]
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def clusters(self):
+        """Groups of two or more keys linked by near-duplicate pairs, in insertion order"""
+        with self._lock:
+            keys = list(self._signatures)
+        parent = {key: key for key in keys}
+
+        def root(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for key in keys:
+            for other, _ in self.query(signature=self._signatures[key]):
+                if other != key:
+                    parent[root(other)] = root(key)
+        groups = OrderedDict()
+        for key in keys:
+            groups.setdefault(root(key), []).append(key)
+        return [group for group in groups.values() if len(group) > 1]
+
+
+class _Contains:
+    """Whole-word (or whole-phrase) containment test against one text"""
+
+    def __init__(self, text):
+        words = WORD_PATTERN.findall(text.lower())
+        self.words = set(words)
+        self.text = f" {' '.join(words)} "
+
+    def __call__(self, item):
+        item_words = WORD_PATTERN.findall(str(item).lower())
+        if not item_words:
+            return False
+        if len(item_words) == 1:
+            return item_words[0] in self.words
+        return f" {' '.join(item_words)} " in self.text
+
+
+def adapt_suggestions(suggestions, resume, original):
+    """Suggestions made for `original`, updated for its near-identical edit `resume`
+
+    Keywords, terms and phrases the edit added to the resume are no longer missing,
+    and placement tips that mention them go too; everything else is kept as is.
+    """
+    in_resume, in_original = _Contains(resume), _Contains(original)
+
+    def added(item):
+        return in_resume(item) and not in_original(item)
+
+    adapted = dict(suggestions)
+    dropped = []
+    for field in ('missing_keywords', 'technical_terms', 'key_phrases'):
+        if isinstance(adapted.get(field), list):
+            dropped.extend(item for item in adapted[field] if added(item))
+            adapted[field] = [item for item in adapted[field] if not added(item)]
+    if isinstance(adapted.get('suggestions'), dict):
+        nested = dict(adapted['suggestions'])
+        for field in ('skills', 'experience'):
+            if isinstance(nested.get(field), list):
+                nested[field] = [item for item in nested[field] if not added(item)]
+        adapted['suggestions'] = nested
+    if dropped and isinstance(adapted.get('placement_tips'), list):
+        dropped_lower = [str(item).lower() for item in dropped]
+        adapted['placement_tips'] = [tip for tip in adapted['placement_tips']
+                                     if not any(item in str(tip).lower() for item in dropped_lower)]
+    return adapted
+
+
+class SuggestionMemo:
+    """AI suggestions of earlier analyses, found again for near-identical resume/JD pairs
+
+    An entry matches when its resume and its JD are both at least threshold similar
+    and it came from the same provider settings (setup_key). Keeps the newest
+    max_entries entries in memory.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_entries=2048):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.resumes = NearDuplicateIndex(threshold)
+        self._entries = OrderedDict()  # id -> (setup_key, jd signature, resume, suggestions)
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def get(self, resume, jd, setup_key):
+        """(suggestions adapted to resume, resume similarity, JD similarity) or None"""
+        resume_signature = self.resumes.signature(resume)
+        jd_signature = self.resumes.signature(jd)
+        for entry_id, resume_score in self.resumes.query(signature=resume_signature):
+            with self._lock:
+                entry = self._entries.get(entry_id)
+            if entry is None or entry[0] != setup_key:
+                continue
+            jd_score = similarity(jd_signature, entry[1])
+            if jd_score >= self.threshold:
+                with self._lock:
+                    self.hits += 1
+                return adapt_suggestions(entry[3], resume, entry[2]), resume_score, jd_score
+        return None
+
+    def put(self, resume, jd, setup_key, suggestions):
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (setup_key, self.resumes.signature(jd), resume, suggestions)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+        self.resumes.add(entry_id, resume)
+        for old_id in evicted:
+            self.resumes.remove(old_id)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits}
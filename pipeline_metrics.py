@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Timing spans for the analysis pipeline
+Stages (file read, PDF pages, tokenization, scoring, provider calls...) are timed
+as structured spans and written to a JSON Lines file or a Prometheus text file.
+With no sink configured a span costs a flag check, so the calls stay in place.
+
+Stages recorded:
+    file_read         read_resume_cached (attrs: format, cache)
+    pdf_page          text extraction of one PDF page (or one page range in a worker)
+    immutable_fields  contact/name extraction
+    tokenize          DocumentIndex construction, token_store.tokenize
+    keyword_scoring   compare_documents, score_batch, score_matrix, JDMatrix.scores,
+                      token_store.score_range
+    prompt_build      build_prompt
+    provider_call     one provider request (attrs: provider, wait_s spent in the provider
+                      scheduler's queue, first_token_s when streamed)
+    json_parse        turning the reply into the suggestion dict
+    render            GUI suggestion window redraw / CLI output record
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+
+# Histogram bucket upper bounds in seconds for the Prometheus sink
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                    1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Span attributes exported as Prometheus labels (all attributes go to JSON Lines)
+PROMETHEUS_LABELS = ('provider', 'format')
+
+# (trace, enclosing span name) of the running code; trace labels one unit of work
+_current = ContextVar('ats_span', default=(None, None))
+# Span list of an enclosing collect_spans() call, if any
+_collector = ContextVar('ats_span_collector', default=None)
+
+
+class Span:
+    """One timed stage; use as a context manager, set() adds attributes on the way"""
+
+    __slots__ = ('name', 'attrs', 'trace', 'parent', 'start', '_started', '_token')
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.trace, self.parent = _current.get()
+        self._token = _current.set((self.trace, self.name))
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        seconds = time.perf_counter() - self._started
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        metrics.record(span_record(self.name, seconds, self.start, self.trace, self.parent,
+                                   self.attrs))
+        return False
+
+
+class _NullSpan:
+    """Stand-in returned while nothing is recording"""
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span_record(name, seconds, start=None, trace=None, parent=None, attrs=None):
+    """The JSON-ready dict written for one span"""
+    record = {'span': name, 'seconds': round(seconds, 6),
+              'start': round(start if start is not None else time.time() - seconds, 6)}
+    if trace is not None:
+        record['trace'] = trace
+    if parent is not None:
+        record['parent'] = parent
+    if attrs:
+        record.update(attrs)
+    return record
+
+
+class JsonLinesSink:
+    """Appends one JSON object per span to a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class PrometheusTextSink:
+    """Duration histograms per stage, rewritten as a Prometheus text file on flush
+
+    Suited to node_exporter's textfile collector; the file is replaced atomically.
+    """
+
+    def __init__(self, path, buckets=DURATION_BUCKETS):
+        self.path = path
+        self.buckets = buckets
+        self._series = {}  # (stage, labels) -> [bucket counts..., count, sum]
+
+    def write(self, record):
+        labels = tuple((label, str(record[label])) for label in PROMETHEUS_LABELS
+                       if label in record)
+        key = (record['span'], labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        seconds = record['seconds']
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += seconds
+
+    def text(self):
+        lines = ["# HELP ats_stage_duration_seconds Time spent in each analysis stage",
+                 "# TYPE ats_stage_duration_seconds histogram"]
+        for (stage, labels), series in sorted(self._series.items()):
+            label_text = ''.join(f',{name}="{_escape_label(value)}"' for name, value in labels)
+            base = f'stage="{_escape_label(stage)}"{label_text}'
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'ats_stage_duration_seconds_bucket{{{base},le="{bound}"}} {count}')
+            lines.append(f'ats_stage_duration_seconds_bucket{{{base},le="+Inf"}} {series[-2]}')
+            lines.append(f'ats_stage_duration_seconds_sum{{{base}}} {series[-1]:.6f}')
+            lines.append(f'ats_stage_duration_seconds_count{{{base}}} {series[-2]}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(self.text())
+        os.replace(self.path + '.tmp', self.path)
+
+    def close(self):
+        self.flush()
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def open_sink(path):
+    """Prometheus text format for *.prom files, JSON Lines otherwise"""
+    if path.endswith('.prom'):
+        return PrometheusTextSink(path)
+    return JsonLinesSink(path)
+
+
+class StageStats:
+    """Count, total and max duration of one stage, for a quick summary"""
+
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+class Metrics:
+    """Process-wide span recorder (thread-safe); inactive until a sink is added"""
+
+    def __init__(self):
+        self.sinks = []
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return bool(self.sinks)
+
+    def add_sink(self, sink):
+        with self._lock:
+            self.sinks.append(sink)
+        return sink
+
+    def record(self, record):
+        """Hand a span record to the enclosing collector, or to the sinks"""
+        collected = _collector.get()
+        if collected is not None:
+            collected.append(record)
+            return
+        with self._lock:
+            if not self.sinks:
+                return
+            stats = self.stages.get(record['span'])
+            if stats is None:
+                stats = self.stages[record['span']] = StageStats()
+            stats.add(record['seconds'])
+            for sink in self.sinks:
+                sink.write(record)
+
+    def record_many(self, records):
+        for record in records:
+            self.record(record)
+
+    def observe(self, name, seconds, **attrs):
+        """Record a duration measured elsewhere (e.g. in another process)"""
+        if self.active or _collector.get() is not None:
+            trace, parent = _current.get()
+            self.record(span_record(name, seconds, trace=trace, parent=parent, attrs=attrs))
+
+    def summary(self):
+        """{stage: {'count', 'total', 'mean', 'max'}} in seconds"""
+        with self._lock:
+            return {name: {'count': stats.count, 'total': stats.total,
+                           'mean': stats.total / stats.count, 'max': stats.max}
+                    for name, stats in self.stages.items()}
+
+    def flush(self):
+        with self._lock:
+            for sink in self.sinks:
+                sink.flush()
+
+    def close(self):
+        with self._lock:
+            sinks, self.sinks = self.sinks, []
+        for sink in sinks:
+            sink.close()
+
+
+metrics = Metrics()
+
+
+def span(name, **attrs):
+    """Time a block as one stage: `with span('tokenize'): ...`"""
+    if not metrics.sinks and _collector.get() is None:
+        return _NULL_SPAN
+    return Span(name, attrs)
+
+
+def timed(name):
+    """Decorator form of span() for functions that are one stage"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class trace:
+    """Label every span recorded inside the block, e.g. with the resume's file name"""
+
+    def __init__(self, label):
+        self.label = label
+
+    def __enter__(self):
+        self._token = _current.set((self.label, None))
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        _current.reset(self._token)
+        return False
+
+
+def collect_spans(func, *args):
+    """Call func(*args) and return (result, span records made during the call)
+
+    Used in worker processes, whose spans cannot reach the parent's sinks directly.
+    """
+    records = []
+    token = _collector.set(records)
+    try:
+        return func(*args), records
+    finally:
+        _collector.reset(token)
+
+
+def configure(path=None):
+    """Add a sink for path, or for ATS_METRICS_FILE when path is None; returns the sink"""
+    path = path or os.environ.get('ATS_METRICS_FILE')
+    if not path:
+        return None
+    return metrics.add_sink(open_sink(path))
+
+
+def format_summary(summary):
+    """Lines of a per-stage timing table, slowest total first"""
+    lines = []
+    for name, stats in sorted(summary.items(), key=lambda item: -item[1]['total']):
+        lines.append(f"{name:>16}: {stats['count']:>6} spans, total {stats['total']:.3f}s, "
+                     f"mean {stats['mean'] * 1000:.2f}ms, max {stats['max'] * 1000:.2f}ms")
+    return lines
+
+
+class profiled:
+    """Capture a cProfile of the block (current thread only) into path
+
+    Writes the binary stats to path (readable with pstats or snakeviz) and keeps a
+    text report of the top functions by cumulative time in self.report.
+    """
+
+    def __init__(self, path, top=25):
+        import cProfile
+        self.path = path
+        self.top = top
+        self.report = ""
+        self._profile = cProfile.Profile()
+
+    def __enter__(self):
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._profile.disable()
+        self._profile.dump_stats(self.path)
+        import io
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats('cumulative').print_stats(self.top)
+        self.report = out.getvalue()
+        return False
+
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Token-budgeted resume and JD excerpts for AI prompts
+Strips LaTeX markup and contact details, splits the resume into sections, drops
+repeated bullets and keeps the sections (and within them the bullets) that share
+the most keywords with the JD until the prompt's token budget is used up.
+"""
+
+import math
+import re
+from collections import namedtuple
+
+from keyword_engine import DocumentIndex, is_keyword
+from term_matcher import default_skills_matcher
+from tex_parser import parse_tex
+
+
+# Rough size of a token in characters for English text (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+# Share of the budget the JD may take when the resume needs the rest
+JD_SHARE = 0.4
+
+SECTION_HEADINGS = frozenset({
+    'summary', 'profile', 'objective', 'about', 'about me', 'experience', 'work experience',
+    'professional experience', 'employment', 'employment history', 'work history',
+    'skills', 'technical skills', 'core competencies', 'competencies', 'technologies',
+    'tools', 'education', 'projects', 'personal projects', 'certifications',
+    'certificates', 'publications', 'awards', 'honors', 'achievements', 'languages',
+    'volunteering', 'volunteer experience', 'leadership', 'activities', 'interests',
+})
+
+# Sections that list skills are short and always worth their tokens
+SKILL_HEADINGS = frozenset({'skills', 'technical skills', 'core competencies', 'competencies',
+                            'technologies', 'tools'})
+
+BULLET_MARKERS = ('-', '•', '*', '–', '·', '▪', '◦')
+
+URL_PATTERN = re.compile(r'(?:https?://|www\.)\S+', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+WORD_PATTERN = re.compile(r'\w+')
+SEPARATOR_LINE_PATTERN = re.compile(r'^[\W_]*$')
+# An all-caps line of a few words ("WORK EXPERIENCE", "SKILLS & TOOLS") is a heading
+PLAIN_HEADING_PATTERN = re.compile(r'^[A-Z][A-Z &/]{3,}$')
+
+# A line at least this long was probably wrapped by the PDF layout
+WRAPPED_LINE_CHARS = 60
+
+Section = namedtuple('Section', 'title items')
+
+
+def estimate_tokens(text):
+    """Approximate token count of text"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def is_tex(text):
+    return '\\documentclass' in text or '\\begin{' in text or '\\section' in text
+
+
+def strip_tex(text):
+    """Plain text of a LaTeX resume (headings upper-cased, items as '- ' lines)"""
+    return parse_tex(text).text
+
+
+def strip_contact(text, immutable_fields=None):
+    """Remove e-mail addresses, URLs and the protected field values from text"""
+    for value in (immutable_fields or {}).values():
+        if value and len(value) > 3:
+            text = text.replace(value, ' ')
+    text = EMAIL_PATTERN.sub(' ', text)
+    text = URL_PATTERN.sub(' ', text)
+    lines = (' '.join(line.split()) for line in text.split('\n'))
+    return '\n'.join(line for line in lines if not SEPARATOR_LINE_PATTERN.match(line))
+
+
+def _heading(line):
+    """Section title if line is a heading, else None"""
+    bare = line.rstrip(':').strip()
+    if bare.lower() in SECTION_HEADINGS:
+        return bare
+    if PLAIN_HEADING_PATTERN.match(bare) and len(bare.split()) <= 4:
+        return bare
+    return None
+
+
+def _is_bullet(line):
+    return line.startswith(BULLET_MARKERS)
+
+
+def split_sections(text):
+    """[Section(title, items)] where items are bullets and other lines, in order
+
+    Lines before the first heading go to a section titled ''. PDF text wraps long
+    bullets over several lines: a line continues the bullet above it unless the
+    bullet already ends a sentence, or the line starts with a capital after a short
+    line.
+    """
+    sections = [Section('', [])]
+    previous = ""
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        title = _heading(line)
+        if title is not None:
+            sections.append(Section(title, []))
+            previous = ""
+            continue
+        items = sections[-1].items
+        if (items and _is_bullet(items[-1]) and not _is_bullet(line)
+                and not items[-1].endswith(('.', '!', '?', ';', ':'))
+                and (not line[0].isupper() or len(previous) >= WRAPPED_LINE_CHARS)):
+            items[-1] = f"{items[-1]} {line}"
+        else:
+            items.append(line)
+        previous = line
+    return [section for section in sections if section.items or section.title]
+
+
+def _item_key(item):
+    return ' '.join(WORD_PATTERN.findall(item.lower()))
+
+
+def dedupe_items(sections):
+    """Drop items whose words repeat an earlier item anywhere in the resume"""
+    seen = set()
+    deduped = []
+    for section in sections:
+        items = []
+        for item in section.items:
+            key = _item_key(item)
+            if key and key in seen:
+                continue
+            seen.add(key)
+            items.append(item)
+        deduped.append(Section(section.title, items))
+    return deduped
+
+
+def keyword_weights(jd):
+    """JD relevance weight of each keyword: 1 + log of its count in the JD, skills 3 more
+
+    The log keeps words the JD repeats everywhere ("experience", "team") from
+    outweighing the skills it asks for.
+    """
+    index = jd if isinstance(jd, DocumentIndex) else DocumentIndex(jd)
+    weights = {term: 1 + math.log(count) for term, count in index.counts.items()
+               if is_keyword(term)}
+    for skill in index.skills:
+        weights[skill.lower()] = weights.get(skill.lower(), 0) + 3
+    return weights
+
+
+def relevance(text, weights):
+    """Summed JD weight of the distinct keywords and skills text contains"""
+    terms = {word.lower() for word in WORD_PATTERN.findall(text)}
+    terms.update(skill.lower() for skill in default_skills_matcher().find(text))
+    return sum(weights.get(term, 0) for term in terms)
+
+
+def _select_items(items, weights, budget):
+    """Indexes of the most relevant items (per token) that fit budget, plus their cost
+
+    A bullet is only taken together with the line that introduces it (e.g. the
+    role and company above a group of bullets).
+    """
+    costs = [estimate_tokens(item) + 1 for item in items]
+    if sum(costs) <= budget:
+        return set(range(len(items))), sum(costs)
+
+    header_of = {}
+    header = None
+    for i, item in enumerate(items):
+        if not _is_bullet(item):
+            header = i
+        elif header is not None:
+            header_of[i] = header
+    order = sorted(range(len(items)),
+                   key=lambda i: (-relevance(items[i], weights) / costs[i], i))
+    chosen, used = set(), 0
+    for i in order:
+        if i in chosen:
+            continue
+        needed = [i]
+        if i in header_of and header_of[i] not in chosen:
+            needed.append(header_of[i])
+        cost = sum(costs[j] for j in needed)
+        if used + cost <= budget:
+            chosen.update(needed)
+            used += cost
+    return chosen, used
+
+
+def compress_resume(text, jd, budget, immutable_fields=None, weights=None):
+    """The most JD-relevant parts of a resume in about `budget` tokens, in resume order
+
+    Skills sections come first, then sections by JD keyword density; a section
+    that does not fit whole contributes its most relevant bullets. weights
+    (from keyword_weights) saves re-indexing the JD.
+    """
+    if is_tex(text):
+        text = strip_tex(text)
+    sections = dedupe_items(split_sections(strip_contact(text, immutable_fields)))
+    if weights is None:
+        weights = keyword_weights(jd)
+
+    def priority(position):
+        section = sections[position]
+        body = '\n'.join(section.items)
+        density = relevance(body, weights) / (estimate_tokens(body) or 1)
+        return (section.title.lower() not in SKILL_HEADINGS, -density, position)
+
+    chosen = {}
+    remaining = budget
+    for position in sorted(range(len(sections)), key=priority):
+        section = sections[position]
+        heading_cost = estimate_tokens(section.title) + 1 if section.title else 0
+        if remaining <= heading_cost:
+            continue
+        items, used = _select_items(section.items, weights, remaining - heading_cost)
+        if items:
+            chosen[position] = items
+            remaining -= used + heading_cost
+
+    lines = []
+    for position, section in enumerate(sections):
+        if position not in chosen:
+            continue
+        if section.title:
+            lines.append(section.title.upper())
+        lines.extend(item for i, item in enumerate(section.items) if i in chosen[position])
+    return '\n'.join(lines)
+
+
+def compress_jd(jd, budget, weights=None):
+    """The JD without repeated lines, keeping its most keyword-rich lines within budget"""
+    lines = []
+    seen = set()
+    for line in jd.split('\n'):
+        line = ' '.join(line.split())
+        key = _item_key(line)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    if estimate_tokens('\n'.join(lines)) <= budget:
+        return '\n'.join(lines)
+
+    if weights is None:
+        weights = keyword_weights(jd)
+    chosen, _ = _select_items(lines, weights, budget)
+    return '\n'.join(line for i, line in enumerate(lines) if i in chosen)
+
+
+def fit_to_budget(resume_content, jd, budget, immutable_fields=None):
+    """(resume excerpt, JD excerpt) sharing budget tokens
+
+    The JD keeps up to JD_SHARE of the budget, or more when the resume is short.
+    """
+    budget = max(budget, 0)
+    resume_plain = strip_contact(strip_tex(resume_content) if is_tex(resume_content)
+                                 else resume_content, immutable_fields)
+    weights = keyword_weights(jd)
+    jd_budget = max(int(budget * JD_SHARE), budget - estimate_tokens(resume_plain))
+    jd_text = compress_jd(jd, jd_budget, weights)
+    resume_text = compress_resume(resume_plain, jd, budget - estimate_tokens(jd_text),
+                                  weights=weights)
+    return resume_text, jd_text
+
+
+def format_immutable_fields(immutable_fields):
+    """'name: Jane Doe; email: ...' instead of the dict's repr"""
+    return '; '.join(f"{field}: {value}" for field, value in immutable_fields.items()) or "none"
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Async multi-provider fan-out for AI keyword suggestions
+Sends one prompt to several providers at once (race) or sends a hedged backup
+request when the first provider is slower than usual (hedge). The first reply that
+parses into the suggestion schema wins and the other requests are cancelled:
+attempts still queued for a rate-limit slot are never sent, and custom API calls
+close their connection. An SDK call (OpenAI, Anthropic, Google) cannot be
+interrupted; it runs to completion in its thread and the reply is discarded. Every
+attempt's outcome is counted per provider (LatencyStats.outcomes).
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_providers import call_provider, parse_json_suggestions
+from provider_scheduler import CancelToken, scheduling
+
+
+# Hedge delay used until a provider has enough latency samples
+DEFAULT_HEDGE_DELAY = 4.0
+MIN_SAMPLES = 5
+
+API_KEY_ENV_VARS = {
+    'openai': 'OPENAI_API_KEY',
+    'anthropic': 'ANTHROPIC_API_KEY',
+    'google': 'GOOGLE_API_KEY',
+    'custom': 'CUSTOM_API_KEY',
+}
+
+
+# How a fan-out attempt ended: a reply that was used or lost the race, an error,
+# cancelled before or while it was sent, or a reply that arrived after cancelling
+OUTCOMES = ('replied', 'failed', 'cancelled', 'late')
+
+
+class LatencyStats:
+    """Rolling window of call latencies, and attempt outcomes, per provider (thread-safe)"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._outcomes = {}
+        self._lock = threading.Lock()
+
+    def record_outcome(self, provider, outcome):
+        with self._lock:
+            counts = self._outcomes.setdefault(provider, dict.fromkeys(OUTCOMES, 0))
+            counts[outcome] += 1
+
+    def outcomes(self):
+        """{provider: {outcome: count}} for every provider attempted so far"""
+        with self._lock:
+            return {provider: dict(counts) for provider, counts in self._outcomes.items()}
+
+    def record(self, provider, seconds):
+        with self._lock:
+            self._samples.setdefault(provider, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, provider, q):
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def count(self, provider):
+        with self._lock:
+            return len(self._samples.get(provider, ()))
+
+    def hedge_delay(self, provider, q=0.95, default=DEFAULT_HEDGE_DELAY):
+        """How long to wait on provider before hedging: its q-th latency quantile"""
+        if self.count(provider) < MIN_SAMPLES:
+            return default
+        return self.quantile(provider, q)
+
+    def summary(self):
+        with self._lock:
+            providers = list(self._samples)
+        return {provider: {'count': self.count(provider),
+                           'p50': self.quantile(provider, 0.5),
+                           'p95': self.quantile(provider, 0.95)}
+                for provider in providers}
+
+
+# Shared by every fan-out in the process so hedge thresholds adapt over time
+latency_stats = LatencyStats()
+
+# Blocking SDK calls run here rather than in asyncio's default executor, so a
+# losing request that cannot be interrupted never delays the winner's return
+_call_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="ats-provider")
+
+
+def provider_label(config):
+    return config['provider'] + (f":{config['model']}" if config.get('model') else "")
+
+
+def parse_provider_spec(spec, api_key=None):
+    """'name[:model][@url]' -> provider config dict; the key defaults to $<NAME>_API_KEY"""
+    spec, _, api_url = spec.partition('@')
+    provider, _, model = spec.partition(':')
+    return {
+        'provider': provider,
+        'api_key': api_key or os.environ.get(API_KEY_ENV_VARS.get(provider, ''), ''),
+        'model': model or None,
+        'api_url': api_url or None,
+    }
+
+
+def _call(prompt, config, call, stats, cancel):
+    """Thread side of an attempt: the call, made under the fan-out's cancel token"""
+    outcome = 'failed'
+    try:
+        with scheduling(cancel=cancel):
+            response_text = call(config['provider'], prompt, config.get('api_key'),
+                                 config.get('model'), config.get('api_url'))
+        outcome = 'late' if cancel.cancelled else 'replied'
+        return response_text
+    except Exception:
+        if cancel.cancelled:
+            outcome = 'cancelled'
+        raise
+    finally:
+        if stats is not None:
+            stats.record_outcome(provider_label(config), outcome)
+
+
+async def _attempt(prompt, config, call, stats, cancel):
+    """One provider request, run in a thread; returns (config, suggestions)"""
+    started = time.perf_counter()
+    # copy_context keeps the caller's timing trace on the provider_call span
+    response_text = await asyncio.get_running_loop().run_in_executor(
+        _call_executor, contextvars.copy_context().run, _call, prompt, config, call, stats,
+        cancel)
+    suggestions = parse_json_suggestions(response_text)
+    if stats is not None:
+        stats.record(provider_label(config), time.perf_counter() - started)
+    return config, suggestions
+
+
+async def _first_good(pending, errors):
+    """Wait until one attempt returns valid suggestions; cancel the rest"""
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in done:
+                try:
+                    return attempt.result()
+                except Exception as e:
+                    errors.append(e)
+        return None
+    finally:
+        for attempt in pending:
+            attempt.cancel()
+
+
+async def race(prompt, configs, call=call_provider, stats=latency_stats, timeout=None):
+    """Send prompt to every provider at once; return (config, suggestions) of the first valid reply"""
+    errors = []
+    cancel = CancelToken()
+    pending = {asyncio.ensure_future(_attempt(prompt, config, call, stats, cancel))
+               for config in configs}
+    try:
+        result = await asyncio.wait_for(_first_good(pending, errors), timeout)
+    finally:
+        cancel.cancel()
+    if result is None:
+        raise RuntimeError(f"All providers failed: {'; '.join(str(e) for e in errors)}")
+    return result
+
+
+async def hedge(prompt, configs, call=call_provider, stats=latency_stats, timeout=None,
+                hedge_quantile=0.95, hedge_delay=None):
+    """Try providers in order, starting the next one when the current is slower than usual
+
+    The delay before each backup request is the previous provider's hedge_quantile
+    latency (or hedge_delay if given). A failed attempt starts the next one immediately.
+    """
+    errors = []
+    remaining = list(configs)
+    pending = set()
+    cancel = CancelToken()
+    deadline = time.monotonic() + timeout if timeout else None
+
+    try:
+        while remaining or pending:
+            delay = None
+            if remaining:
+                config = remaining.pop(0)
+                pending.add(asyncio.ensure_future(_attempt(prompt, config, call, stats,
+                                                           cancel)))
+                delay = hedge_delay if hedge_delay is not None else (
+                    stats.hedge_delay(provider_label(config), hedge_quantile)
+                    if stats is not None else DEFAULT_HEDGE_DELAY)
+                if not remaining:
+                    delay = None
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise asyncio.TimeoutError()
+                delay = left if delay is None else min(delay, left)
+
+            done, pending = await asyncio.wait(pending, timeout=delay,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for attempt in done:
+                try:
+                    return attempt.result()
+                except Exception as e:
+                    errors.append(e)
+    finally:
+        cancel.cancel()
+        for attempt in pending:
+            attempt.cancel()
+
+    raise RuntimeError(f"All providers failed: {'; '.join(str(e) for e in errors)}")
+
+
+def get_first_suggestions(prompt, configs, mode='race', timeout=None, cache=None,
+                          refresh=False, **options):
+    """Blocking wrapper for race()/hedge(), for worker threads and the CLI
+
+    With a ResponseCache, a cached reply from any of the providers is returned
+    without a call, and the winning reply is stored. Returns (config, suggestions, cache_hit).
+    """
+    if cache is not None and not refresh:
+        for config in configs:
+            cached = cache.get(config['provider'], config.get('model'), prompt,
+                               api_url=config.get('api_url'))
+            if cached is not None:
+                return config, cached, True
+
+    strategy = race if mode == 'race' else hedge
+    # Attempts still waiting for a rate-limit slot when the timeout ends are dropped
+    with scheduling(timeout=timeout):
+        config, suggestions = asyncio.run(strategy(prompt, configs, timeout=timeout, **options))
+    if cache is not None:
+        cache.put(config['provider'], config.get('model'), prompt, suggestions,
+                  api_url=config.get('api_url'))
+    return config, suggestions, False
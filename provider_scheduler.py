@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rate-limited, priority-aware scheduling of LLM provider calls
+Every provider call waits for a slot in its provider's lane: token buckets for
+requests/min and tokens/min, a cap on calls in flight and a priority queue, so
+interactive (GUI) requests go ahead of bulk jobs. An HTTP 429 pauses the whole
+lane for the server's Retry-After, drops it to one call in flight (growing back by
+one per answered call) and the call is retried; a call still queued when its
+deadline passes fails with DeadlineExceeded instead of being sent late, and one
+whose CancelToken is cancelled (the caller no longer wants it) fails with
+CallCancelled instead of being sent at all.
+
+The calling thread makes the call itself once its slot is granted; nothing here
+starts threads. Priority, deadline, a rate-limit callback and a
+cancel token are set for the calls made inside a `with scheduling(...)` block.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+INTERACTIVE = 0
+BULK = 1
+PRIORITIES = {'interactive': INTERACTIVE, 'bulk': BULK}
+
+# Requests/min, tokens/min and calls in flight; None leaves a limit off
+RateLimits = namedtuple('RateLimits', 'requests_per_minute tokens_per_minute concurrency')
+
+DEFAULT_LIMITS = RateLimits(None, None, 8)
+
+# Per "provider:model" or provider; the entry-level tiers of each provider.
+# ATS_RATE_LIMITS overrides them, e.g. "openai=3500/90000/16,custom=600"
+PROVIDER_RATE_LIMITS = {
+    'openai': RateLimits(500, 200000, 8),
+    'anthropic': RateLimits(50, 50000, 4),
+    'google': RateLimits(15, 1000000, 4),
+    'custom': RateLimits(None, None, 4),
+}
+
+# Buckets hold this many seconds' worth of their rate: a batch starts with a short
+# burst, not a minute's worth of requests at once (providers meter in short windows)
+BURST_SECONDS = 10
+
+# Tokens a reply is expected to take, charged on top of the prompt's
+REPLY_TOKENS = 600
+
+# Retries after HTTP 429, and the wait when the server gives no Retry-After
+MAX_RATE_LIMIT_RETRIES = 5
+DEFAULT_RETRY_AFTER = 1.0
+MAX_RETRY_AFTER = 60.0
+
+# (priority, absolute monotonic deadline or None, on_rate_limit, CancelToken or None)
+# of the running code
+_settings = ContextVar('ats_schedule', default=(INTERACTIVE, None, None, None))
+
+
+class DeadlineExceeded(TimeoutError):
+    """A call's deadline passed (or would pass while rate limited) before it was sent"""
+
+
+class CallCancelled(Exception):
+    """A call's CancelToken was cancelled before it was sent"""
+
+
+class CancelToken:
+    """Cancelled by a caller that no longer wants the results of calls made under it
+
+    Queued calls give up with CallCancelled; code making a call registers
+    on_cancel callbacks to stop it early (the custom client closes its connection).
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """Run callback() on cancel (now, if already cancelled); returns an unregister function"""
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+def current_cancel_token():
+    """The CancelToken of the enclosing scheduling() block, or None"""
+    return _settings.get()[3]
+
+
+def parse_rate_limits(spec):
+    """'openai=500/200000/8,custom:fake=60' -> {'openai': RateLimits(...), ...}
+
+    Each value is requests/min[/tokens/min[/concurrency]]; an empty or '-' part
+    leaves that limit off (concurrency then falls back to the default).
+    """
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, values = entry.partition('=')
+        parts = [None if value in ('', '-') else int(value) for value in values.split('/')]
+        parts += [None] * (3 - len(parts))
+        if parts[2] is None:
+            parts[2] = DEFAULT_LIMITS.concurrency
+        limits[name.strip()] = RateLimits(*parts[:3])
+    return limits
+
+
+def rate_limits_for(provider, model=None):
+    """RateLimits for provider/model: ATS_RATE_LIMITS, then PROVIDER_RATE_LIMITS"""
+    configured = dict(PROVIDER_RATE_LIMITS)
+    override = os.environ.get('ATS_RATE_LIMITS')
+    if override:
+        configured.update(parse_rate_limits(override))
+    if model and f"{provider}:{model}" in configured:
+        return configured[f"{provider}:{model}"]
+    return configured.get(provider, DEFAULT_LIMITS)
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date); None if unusable"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(error):
+    """Whether a provider error is an HTTP 429 / quota response (any SDK)"""
+    for name in ('status', 'status_code', 'code'):
+        if getattr(error, name, None) == 429:
+            return True
+    return type(error).__name__ in ('RateLimitError', 'ResourceExhausted', 'TooManyRequests')
+
+
+def retry_after(error):
+    """The server's requested wait in seconds for a rate-limit error, or None"""
+    seconds = getattr(error, 'retry_after', None)
+    if seconds is not None:
+        return seconds
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    milliseconds = parse_retry_after(headers.get('retry-after-ms'))
+    if milliseconds is not None:
+        return milliseconds / 1000
+    return parse_retry_after(headers.get('retry-after'))
+
+
+@contextmanager
+def scheduling(priority=None, timeout=None, on_rate_limit=None, cancel=None):
+    """Schedule provider calls made inside the block with this priority and deadline
+
+    Unset arguments keep the enclosing block's values (INTERACTIVE, no deadline at
+    the top). timeout is in seconds from now; a tighter enclosing deadline still
+    applies. on_rate_limit(label, seconds) is called before waiting out an HTTP 429.
+    cancel is a CancelToken for the calls (see CancelToken). The settings follow the
+    context into threads started with contextvars.copy_context.
+    """
+    current, deadline, callback, token = _settings.get()
+    if timeout is not None:
+        ends = time.monotonic() + timeout
+        deadline = ends if deadline is None else min(deadline, ends)
+    reset = _settings.set((current if priority is None else priority, deadline,
+                           on_rate_limit or callback, cancel or token))
+    try:
+        yield
+    finally:
+        _settings.reset(reset)
+
+
+class TokenBucket:
+    """Refills at rate_per_minute up to capacity (default: one minute's worth)
+
+    Not locked: the scheduler only touches buckets while holding its lock.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.level = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount (capped at capacity) can be taken"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def drain(self, now):
+        """Empty the bucket, e.g. after the server said we sent too much"""
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+
+class _Lane:
+    """Queue, buckets and counters of one provider (and model and URL)"""
+
+    def __init__(self, label, limits, lock):
+        self.label = label
+        self.limits = limits
+        self.requests = self.tokens = None
+        if limits.requests_per_minute:
+            self.requests = TokenBucket(limits.requests_per_minute,
+                                        max(1, limits.requests_per_minute * BURST_SECONDS / 60))
+        if limits.tokens_per_minute:
+            self.tokens = TokenBucket(limits.tokens_per_minute,
+                                      limits.tokens_per_minute * BURST_SECONDS / 60)
+        self.ready = threading.Condition(lock)
+        self.queue = []  # heap of (priority, deadline, seq)
+        self.in_flight = 0
+        # Calls allowed in flight: one after a 429, back up to the limit as calls succeed
+        self.window = limits.concurrency
+        self.paused_until = 0.0
+        self.sent = 0
+        self.throttled = 0
+        self.expired = 0
+        self.cancelled = 0
+        self.waits = deque(maxlen=500)
+
+    def wait_time(self, tokens, now):
+        """Seconds until a call of `tokens` may be sent, ignoring the queue"""
+        wait = self.paused_until - now
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return max(wait, 0.0)
+
+    def take(self, tokens, now):
+        if self.requests is not None:
+            self.requests.take(1, now)
+        if self.tokens is not None:
+            self.tokens.take(tokens, now)
+        self.in_flight += 1
+        self.sent += 1
+
+    def pause(self, seconds, now):
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.window = 1
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket.drain(now)
+
+    def remove(self, entry):
+        self.queue.remove(entry)
+        heapq.heapify(self.queue)
+
+
+class ProviderScheduler:
+    """Grants provider calls in priority order within each provider's rate limits"""
+
+    def __init__(self, max_retries=MAX_RATE_LIMIT_RETRIES):
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._lanes = {}
+        self._limits = {}
+        self._seq = itertools.count()
+
+    def configure(self, provider, limits, model=None):
+        """Use limits for provider (or provider:model) instead of the configured defaults"""
+        label = f"{provider}:{model}" if model else provider
+        with self._lock:
+            self._limits[label] = limits
+            for key in [key for key in self._lanes
+                        if key[0] == provider and (model is None or key[1] == model)]:
+                if not self._lanes[key].in_flight and not self._lanes[key].queue:
+                    del self._lanes[key]
+
+    def _lane(self, provider, model, api_url):
+        key = (provider, model, api_url)
+        lane = self._lanes.get(key)
+        if lane is None:
+            limits = (self._limits.get(f"{provider}:{model}") or self._limits.get(provider)
+                      or rate_limits_for(provider, model))
+            label = provider + (f":{model}" if model else "")
+            lane = self._lanes[key] = _Lane(label, limits, self._lock)
+        return lane
+
+    def _wake(self):
+        """Let every queued call re-check its state (after a CancelToken was cancelled)"""
+        with self._lock:
+            for lane in self._lanes.values():
+                lane.ready.notify_all()
+
+    def acquire(self, provider, model=None, api_url=None, tokens=0, priority=INTERACTIVE,
+                deadline=None, seq=None, cancel=None):
+        """Block until this call may be sent; returns its lane (pass it to release)
+
+        Raises DeadlineExceeded if the monotonic deadline passes first, CallCancelled
+        if cancel (a CancelToken) is cancelled first.
+        """
+        queued = time.monotonic()
+        unregister = cancel.on_cancel(self._wake) if cancel is not None else None
+        try:
+            return self._acquire(provider, model, api_url, tokens, priority, deadline, seq,
+                                 cancel, queued)
+        finally:
+            if unregister is not None:
+                unregister()
+
+    def _acquire(self, provider, model, api_url, tokens, priority, deadline, seq, cancel,
+                 queued):
+        with self._lock:
+            lane = self._lane(provider, model, api_url)
+            entry = (priority, float('inf') if deadline is None else deadline,
+                     next(self._seq) if seq is None else seq)
+            heapq.heappush(lane.queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if cancel is not None and cancel.cancelled:
+                        lane.cancelled += 1
+                        raise CallCancelled(f"{lane.label}: cancelled after {now - queued:.1f}s "
+                                            f"waiting for a rate-limit slot")
+                    if lane.queue[0] is entry and lane.in_flight < lane.window:
+                        wait = lane.wait_time(tokens, now)
+                        if wait <= 0:
+                            heapq.heappop(lane.queue)
+                            lane.take(tokens, now)
+                            lane.waits.append(now - queued)
+                            lane.ready.notify_all()  # the next in line may be sendable too
+                            return lane
+                    if deadline is not None:
+                        left = deadline - now
+                        if left <= 0:
+                            lane.expired += 1
+                            raise DeadlineExceeded(
+                                f"{lane.label}: deadline passed after {now - queued:.1f}s "
+                                f"waiting for a rate-limit slot")
+                        wait = left if wait is None else min(wait, left)
+                    lane.ready.wait(wait)
+            except BaseException:
+                if entry in lane.queue:
+                    lane.remove(entry)
+                    lane.ready.notify_all()
+                raise
+
+    def release(self, lane, rate_limited_for=None):
+        """A call finished; rate_limited_for pauses the lane after an HTTP 429"""
+        with self._lock:
+            lane.in_flight -= 1
+            if rate_limited_for is not None:
+                lane.throttled += 1
+                lane.pause(rate_limited_for, time.monotonic())
+            elif lane.window < lane.limits.concurrency:
+                lane.window += 1
+            lane.ready.notify_all()
+
+    def call(self, provider, model, api_url, tokens, func, *args):
+        """func(*args) once a slot is granted, retrying after HTTP 429 replies
+
+        Priority, deadline and cancel token come from the enclosing scheduling() block.
+        A 429 is retried after the server's Retry-After (or a doubling default) unless
+        the wait would overrun the deadline or retries run out; then the error is raised.
+        """
+        priority, deadline, on_rate_limit, cancel = _settings.get()
+        seq = next(self._seq)  # a retried call keeps its place in the queue
+        attempt = 0
+        while True:
+            lane = self.acquire(provider, model, api_url, tokens, priority, deadline, seq, cancel)
+            try:
+                return func(*args)
+            except Exception as e:
+                if not is_rate_limited(e):
+                    self.release(lane)
+                    lane = None
+                    raise
+                wait = retry_after(e)
+                if wait is None:
+                    wait = DEFAULT_RETRY_AFTER * (2 ** attempt)
+                wait = min(wait, MAX_RETRY_AFTER)
+                self.release(lane, wait)
+                lane = None
+                if attempt >= self.max_retries:
+                    raise
+                if deadline is not None and time.monotonic() + wait >= deadline:
+                    raise DeadlineExceeded(f"{provider} rate limited (retry after {wait:.1f}s) "
+                                           f"past the deadline: {e}") from e
+                attempt += 1
+                if on_rate_limit is not None:
+                    on_rate_limit(provider + (f":{model}" if model else ""), wait)
+            finally:
+                if lane is not None:
+                    self.release(lane)
+
+    def summary(self):
+        """{label: counters and queue wait quantiles} for every lane used so far"""
+        with self._lock:
+            lanes = list(self._lanes.values())
+            snapshot = [(lane, sorted(lane.waits)) for lane in lanes]
+        summary = {}
+        for lane, waits in snapshot:
+            entry = summary.setdefault(lane.label, {'sent': 0, 'throttled': 0, 'expired': 0,
+                                                    'cancelled': 0, 'queued': 0, 'waits': []})
+            entry['sent'] += lane.sent
+            entry['throttled'] += lane.throttled
+            entry['expired'] += lane.expired
+            entry['cancelled'] += lane.cancelled
+            entry['queued'] += len(lane.queue)
+            entry['waits'].extend(waits)
+        for entry in summary.values():
+            waits = sorted(entry.pop('waits'))
+            entry['wait_p50'] = waits[len(waits) // 2] if waits else 0.0
+            entry['wait_p95'] = waits[min(len(waits) - 1, int(0.95 * len(waits)))] if waits else 0.0
+        return summary
+
+
+# Shared by every provider call in the process, so all callers see the same limits
+scheduler = ProviderScheduler()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent cache of parsed AI keyword suggestions
+Keyed by a hash of provider, model, temperature, API URL and the whitespace-
+normalized prompt, so an unchanged resume + JD + provider setup never pays for a
+second call, and two servers behind the same provider name never share replies.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from disk_cache import DiskCache, default_cache_dir
+from llm_providers import DEFAULT_MODELS, PROVIDER_TEMPERATURES
+
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so cosmetic edits do not defeat the cache"""
+    return WHITESPACE_PATTERN.sub(' ', prompt).strip()
+
+
+def response_key(provider, model, prompt, temperature=None, api_url=None):
+    model = model or DEFAULT_MODELS.get(provider, "")
+    if temperature is None:
+        temperature = PROVIDER_TEMPERATURES.get(provider)
+    material = [provider, model, temperature, normalize_prompt(prompt)]
+    if api_url:
+        # Imported here: custom_api loads http.client, which the GUI defers
+        from custom_api import normalize_api_url
+        material.append(normalize_api_url(api_url))
+    material = json.dumps(material)
+    return "suggestions:" + hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Parsed suggestion dicts stored on disk with a TTL and a size limit"""
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        if path is None:
+            path = os.path.join(default_cache_dir(), 'responses.sqlite3')
+        self.ttl = ttl
+        self.store = DiskCache(path, max_bytes=max_bytes)
+
+    def get(self, provider, model, prompt, temperature=None, api_url=None):
+        cached = self.store.get(response_key(provider, model, prompt, temperature, api_url))
+        return json.loads(cached) if cached is not None else None
+
+    def put(self, provider, model, prompt, suggestions, temperature=None, api_url=None):
+        self.store.set(response_key(provider, model, prompt, temperature, api_url),
+                       json.dumps(suggestions), ttl=self.ttl)
+
+    def invalidate(self, provider, model, prompt, temperature=None, api_url=None):
+        self.store.delete(response_key(provider, model, prompt, temperature, api_url))
+
+    def stats(self):
+        return self.store.stats()
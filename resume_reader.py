@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resume reading helpers
+Headless versions of the GUI's file loading and immutable field extraction
+"""
+
+import hashlib
+import os
+import re
+import time
+
+from pipeline_metrics import metrics, span, timed
+from tex_parser import read_tex_cached
+
+
+SUPPORTED_FORMATS = {'.tex': 'tex', '.pdf': 'pdf'}
+
+# Contact info patterns, compiled once
+EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+PHONE_PATTERN = re.compile(r'[\+\d][\d\-\(\)\s]{8,}')
+LINKEDIN_PATTERN = re.compile(r'linkedin\.com/[\w\-/]+', re.IGNORECASE)
+GITHUB_PATTERN = re.compile(r'github\.com/[\w\-]+', re.IGNORECASE)
+TEX_NAME_PATTERN = re.compile(r'\\name\{([^}]+)\}')
+
+# Bump whenever extracted text would change, so stale cache entries are ignored
+EXTRACTOR_VERSION = 1
+
+# Documents at least this long are split across worker processes when workers='auto'
+PARALLEL_MIN_PAGES = 16
+PAGES_PER_TASK = 4
+
+
+def resume_format_for(file_path):
+    """Return 'tex' or 'pdf' for a resume path, or None if unsupported"""
+    return SUPPORTED_FORMATS.get(os.path.splitext(file_path)[1].lower())
+
+
+def _import_pypdf2():
+    # Loaded on first PDF so .tex-only and headless runs start without it
+    try:
+        import PyPDF2
+    except ImportError:
+        raise ImportError("The 'PyPDF2' library is not installed. Please install it with 'pip install PyPDF2'")
+    return PyPDF2
+
+
+def read_tex_file(file_path):
+    """Plain text of a .tex resume and the files it includes (see tex_parser)"""
+    return read_tex_cached(file_path)[0].text
+
+
+def _extract_page_range(file_path, start, stop):
+    """Worker task: (text of pages [start, stop), seconds spent extracting)"""
+    started = time.perf_counter()
+    pdf_reader = _import_pypdf2().PdfReader(file_path)
+    texts = [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+    return texts, time.perf_counter() - started
+
+
+def _pdf_workers(workers, page_count):
+    if workers == 'auto':
+        if page_count < PARALLEL_MIN_PAGES:
+            return 1
+        return min(os.cpu_count() or 1, -(-page_count // PAGES_PER_TASK))
+    return workers or 1
+
+
+def iter_pdf_pages(file_path, max_pages=None, workers=1):
+    """Yield the text of each PDF page in order, as soon as it is available
+
+    workers > 1 (or 'auto' for long documents) extracts page ranges in worker
+    processes. Closing the generator early cancels pages not yet started.
+    """
+    pdf_reader = _import_pypdf2().PdfReader(file_path)
+    page_count = len(pdf_reader.pages)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+
+    workers = _pdf_workers(workers, page_count)
+    if workers <= 1 or page_count <= PAGES_PER_TASK:
+        for i in range(page_count):
+            with span('pdf_page', page=i):
+                text = pdf_reader.pages[i].extract_text() or ""
+            yield text
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(_extract_page_range, file_path, start,
+                                   min(start + PAGES_PER_TASK, page_count))
+                   for start in range(0, page_count, PAGES_PER_TASK)]
+        for start, future in zip(range(0, page_count, PAGES_PER_TASK), futures):
+            texts, seconds = future.result()
+            metrics.observe('pdf_page', seconds, page=start, pages=len(texts))
+            yield from texts
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def read_pdf_file(file_path, max_pages=None, max_chars=None, workers=1, on_page=None):
+    """Extract PDF text, optionally stopping after max_pages pages or max_chars characters
+
+    on_page(page_text) is called for every page as it is extracted, e.g. to fill a preview.
+    """
+    parts = []
+    length = 0
+    pages = iter_pdf_pages(file_path, max_pages=max_pages, workers=workers)
+    try:
+        for page_text in pages:
+            parts.append(page_text)
+            parts.append("\n")
+            length += len(page_text) + 1
+            if on_page is not None:
+                on_page(page_text)
+            if max_chars is not None and length >= max_chars:
+                break
+    finally:
+        pages.close()
+
+    text = "".join(parts)
+    return text[:max_chars] if max_chars is not None else text
+
+
+def read_resume(file_path, **pdf_options):
+    """Read a resume and return (content, format)
+
+    pdf_options are passed to read_pdf_file (max_pages, max_chars, workers, on_page).
+    """
+    resume_format = resume_format_for(file_path)
+    if resume_format == 'tex':
+        return read_tex_file(file_path), resume_format
+    if resume_format == 'pdf':
+        return read_pdf_file(file_path, **pdf_options), resume_format
+    raise ValueError("Unsupported file format. Please use .tex or .pdf")
+
+
+def file_digest(file_path):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_resume_cached(file_path, cache, workers=1, on_page=None):
+    """Like read_resume, but reuses text extracted earlier from identical file content
+
+    Returns (content, format, cache_hit). cache is a DiskCache or None.
+    workers and on_page only apply when a PDF actually has to be extracted.
+    """
+    resume_format = resume_format_for(file_path)
+    with span('file_read', format=resume_format) as stage:
+        if resume_format == 'tex':
+            # Keyed by path and checked against every \input file, not just this one
+            parsed, hit = read_tex_cached(file_path, cache)
+            stage.set(cache='hit' if hit else 'miss')
+            return parsed.text, resume_format, hit
+
+        if cache is None or resume_format is None:
+            stage.set(cache='off')
+            return read_resume(file_path, workers=workers, on_page=on_page) + (False,)
+
+        key = f"text:{resume_format}:v{EXTRACTOR_VERSION}:{file_digest(file_path)}"
+        cached = cache.get(key)
+        if cached is not None:
+            stage.set(cache='hit')
+            return cached, resume_format, True
+
+        stage.set(cache='miss')
+        content, resume_format = read_resume(file_path, workers=workers, on_page=on_page)
+        cache.set(key, content)
+        return content, resume_format, False
+
+
+@timed('immutable_fields')
+def extract_immutable_fields(content, resume_format):
+    """Extract fields that should remain unchanged"""
+    fields = {}
+
+    # First match of each contact pattern (search stops at the first hit)
+    email = EMAIL_PATTERN.search(content)
+    phone = PHONE_PATTERN.search(content)
+    linkedin = LINKEDIN_PATTERN.search(content)
+    github = GITHUB_PATTERN.search(content)
+
+    if email:
+        fields['email'] = email.group()
+    if phone:
+        fields['phone'] = phone.group().strip()
+    if linkedin:
+        fields['linkedin'] = linkedin.group()
+    if github:
+        fields['github'] = github.group()
+
+    # Extract name (\name command in raw LaTeX, else the first line)
+    name_match = TEX_NAME_PATTERN.search(content) if resume_format == 'tex' else None
+    if name_match:
+        fields['name'] = name_match.group(1)
+    elif '\\begin{document}' not in content:
+        lines = content.strip().split('\n')
+        if lines:
+            fields['name'] = lines[0].strip()
+
+    return fields
+
+
+def iter_resume_files(root):
+    """Yield supported resume files under a file or directory, in sorted order"""
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if resume_format_for(filename):
+                yield os.path.join(dirpath, filename)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized resume/JD match scoring
+Documents become hashed sparse term vectors (fixed dimension, no vocabulary to
+share between processes) and whole batches are scored with NumPy array
+operations: one JD against thousands of resumes, or every JD against every resume.
+
+Scores (both 0..1):
+    cosine   cosine similarity of the (1 + log tf) weighted term vectors
+    overlap  share of the JD's term weight whose terms appear in the resume
+             (JDIndex.score with the same (1 + log tf) weights)
+"""
+
+import zlib
+
+import numpy as np
+
+from keyword_engine import DocumentIndex, is_keyword
+from pipeline_metrics import timed
+
+
+HASH_DIMENSION = 1 << 20
+SCORE_METHODS = ('cosine', 'overlap')
+
+# Resumes scored per block in score_matrix, bounding the (JDs x terms) temporary
+MATRIX_BLOCK_TERMS = 1 << 20
+
+
+def term_hash(term, dimension=HASH_DIMENSION):
+    """Stable bucket of a term (Python's hash() differs between processes)"""
+    return zlib.crc32(term.encode('utf-8')) % dimension
+
+
+def _segment_sums(values, starts, length):
+    """Sum values[..., starts[i]:starts[i + 1]] (the last segment runs to length); empty -> 0"""
+    padded = np.concatenate([values, np.zeros(values.shape[:-1] + (1,), dtype=values.dtype)],
+                            axis=-1)
+    sums = np.add.reduceat(padded, starts, axis=-1)
+    ends = np.append(starts[1:], length)
+    sums[..., starts == ends] = 0
+    return sums
+
+
+def _as_index(document):
+    return DocumentIndex(document) if isinstance(document, str) else document
+
+
+def term_vector(document, weights=None, dimension=HASH_DIMENSION):
+    """(indices, values) of one document's hashed keyword vector, indices sorted and unique
+
+    weights (term -> weight, e.g. CorpusStats.bm25_weights) replaces the default
+    1 + log(tf) weighting. Terms that hash to the same bucket are summed.
+    """
+    index = _as_index(document)
+    terms = [term for term in index.counts if is_keyword(term)]
+    if not terms:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    buckets = np.fromiter((term_hash(term, dimension) for term in terms), dtype=np.int64,
+                          count=len(terms))
+    if weights is None:
+        values = 1 + np.log(np.fromiter((index.counts[term] for term in terms),
+                                        dtype=np.float64, count=len(terms)))
+    else:
+        values = np.fromiter((weights.get(term, 0.0) for term in terms), dtype=np.float64,
+                             count=len(terms))
+    indices, inverse = np.unique(buckets, return_inverse=True)
+    return indices, np.bincount(inverse, weights=values).astype(np.float32)
+
+
+class TermVectors:
+    """A batch of hashed term vectors stored as CSR arrays (indptr, indices, data)"""
+
+    def __init__(self, vectors, names=None, dimension=HASH_DIMENSION):
+        vectors = list(vectors)
+        lengths = np.fromiter((len(indices) for indices, _ in vectors), dtype=np.int64,
+                              count=len(vectors))
+        self.indptr = np.zeros(len(vectors) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.indices = (np.concatenate([indices for indices, _ in vectors])
+                        if vectors else np.zeros(0, dtype=np.int64))
+        self.data = (np.concatenate([values for _, values in vectors])
+                     if vectors else np.zeros(0, dtype=np.float32))
+        self.names = list(names) if names is not None else list(range(len(vectors)))
+        self.dimension = dimension
+        self.norms = np.sqrt(self.row_sums(self.data.astype(np.float64) ** 2))
+
+    @classmethod
+    def from_documents(cls, documents, names=None, weights=None, dimension=HASH_DIMENSION):
+        """Vectorize texts or DocumentIndex objects (weights: one dict per document or None)"""
+        documents = list(documents)
+        if weights is None:
+            weights = [None] * len(documents)
+        return cls((term_vector(document, document_weights, dimension)
+                    for document, document_weights in zip(documents, weights)),
+                   names, dimension)
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def row(self, position):
+        start, end = self.indptr[position], self.indptr[position + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def row_sums(self, values):
+        """Sum values (aligned with self.indices) per row; empty rows give 0"""
+        return _segment_sums(np.asarray(values, dtype=np.float64), self.indptr[:-1],
+                             len(self.indices))
+
+
+def _normalize(values, norms):
+    return np.divide(values, norms, out=np.zeros_like(values), where=norms > 0)
+
+
+@timed('keyword_scoring')
+def score_batch(jd, resumes, method='cosine', jd_weights=None):
+    """Score one JD against every resume in a single vectorized pass
+
+    jd: text, DocumentIndex or an (indices, values) vector; resumes: TermVectors,
+    or texts/DocumentIndex objects to vectorize. Returns a float64 array, one
+    score per resume in order.
+    """
+    if method not in SCORE_METHODS:
+        raise ValueError(f"Unknown score method: {method}")
+    if not isinstance(resumes, TermVectors):
+        resumes = TermVectors.from_documents(resumes)
+    if isinstance(jd, tuple):
+        jd_indices, jd_values = jd
+    else:
+        jd_indices, jd_values = term_vector(jd, jd_weights, resumes.dimension)
+
+    # Scatter the JD into a dense vector, then one gather looks up every resume term
+    dense = np.zeros(resumes.dimension, dtype=np.float32)
+    dense[jd_indices] = jd_values
+    jd_weight = dense[resumes.indices]
+
+    if method == 'overlap':
+        total = np.full(len(resumes), jd_values.sum(), dtype=np.float64)
+        return _normalize(resumes.row_sums(jd_weight), total)
+    dots = resumes.row_sums(jd_weight * resumes.data)
+    jd_norm = np.sqrt(np.square(jd_values, dtype=np.float64).sum())
+    return _normalize(dots, resumes.norms * jd_norm)
+
+
+@timed('keyword_scoring')
+def score_matrix(jds, resumes, method='cosine'):
+    """Scores of every JD against every resume: array of shape (len(jds), len(resumes))
+
+    Both arguments are TermVectors (or documents to vectorize). The JDs are packed
+    into a dense (JDs x distinct JD terms) block, so the work per resume term is one
+    binary search plus a column gather.
+    """
+    if method not in SCORE_METHODS:
+        raise ValueError(f"Unknown score method: {method}")
+    if not isinstance(jds, TermVectors):
+        jds = TermVectors.from_documents(jds)
+    if not isinstance(resumes, TermVectors):
+        resumes = TermVectors.from_documents(resumes, dimension=jds.dimension)
+
+    columns = np.unique(jds.indices)
+    dense = np.zeros((len(jds), len(columns) + 1), dtype=np.float32)  # last column: no match
+    rows = np.repeat(np.arange(len(jds)), np.diff(jds.indptr))
+    dense[rows, np.searchsorted(columns, jds.indices)] = jds.data
+
+    positions = np.searchsorted(columns, resumes.indices)
+    positions = np.minimum(positions, max(len(columns) - 1, 0))
+    matched = (columns[positions] == resumes.indices) if len(columns) else \
+        np.zeros(len(resumes.indices), dtype=bool)
+    positions = np.where(matched, positions, len(columns))
+    values = resumes.data if method == 'cosine' else np.ones_like(resumes.data)
+
+    scores = np.zeros((len(jds), len(resumes)), dtype=np.float64)
+    block = max(1, MATRIX_BLOCK_TERMS // max(len(jds), 1))
+    start_row = 0
+    while start_row < len(resumes):
+        # Whole resumes per block, about `block` terms each time
+        end_row = int(np.searchsorted(resumes.indptr, resumes.indptr[start_row] + block,
+                                      side='right')) - 1
+        end_row = min(max(end_row, start_row + 1), len(resumes))
+        start, end = resumes.indptr[start_row], resumes.indptr[end_row]
+        contributions = dense[:, positions[start:end]] * values[start:end]
+        scores[:, start_row:end_row] = _segment_sums(
+            contributions, resumes.indptr[start_row:end_row] - start, end - start)
+        start_row = end_row
+
+    if method == 'overlap':
+        totals = jds.row_sums(jds.data.astype(np.float64))
+        return _normalize(scores, np.broadcast_to(totals[:, None], scores.shape))
+    return _normalize(scores, jds.norms[:, None] * resumes.norms[None, :])
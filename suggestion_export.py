@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Structured export of analysis results
+Writes analysis records (the dicts batch/rank/suggest produce: file, scores,
+timings, provider, cache status, immutable fields and keyword suggestions) in
+batches to JSON Lines, CSV, or Parquet/Arrow when pyarrow is installed, so
+results can be loaded back into pandas, DuckDB or a spreadsheet.
+
+Formats (picked from the file extension unless given):
+    jsonl    .jsonl/.json - one full record per line, nested as produced
+    csv      .csv - one row per record in EXPORT_COLUMNS; list cells hold JSON arrays
+    parquet  .parquet, or a directory of part files - same columns, lists as list<string>
+    arrow    .arrow/.feather - Arrow IPC file with the Parquet schema
+
+JSON Lines and CSV can be appended to; a Parquet directory gets a new part file
+per writer, which Parquet readers load as one table.
+"""
+
+import csv
+import io
+import json
+import os
+import time
+
+
+BATCH_SIZE = 4096
+EXPORT_FORMATS = ('jsonl', 'csv', 'parquet', 'arrow')
+EXTENSIONS = {'.jsonl': 'jsonl', '.json': 'jsonl', '.csv': 'csv', '.parquet': 'parquet',
+              '.arrow': 'arrow', '.feather': 'arrow'}
+
+# (column, type) of the flat formats; type is 'str', 'float', 'int' or 'list'
+EXPORT_COLUMNS = (
+    ('file', 'str'),
+    ('format', 'str'),
+    ('provider', 'str'),
+    ('cache', 'str'),
+    ('error', 'str'),
+    ('duplicate_of', 'str'),
+    ('similarity', 'float'),
+    ('rank', 'int'),
+    ('document', 'int'),
+    ('cosine', 'float'),
+    ('overlap', 'float'),
+    ('seconds', 'float'),
+    ('name', 'str'),
+    ('email', 'str'),
+    ('phone', 'str'),
+    ('linkedin', 'str'),
+    ('github', 'str'),
+    ('missing_keywords', 'list'),
+    ('technical_terms', 'list'),
+    ('key_phrases', 'list'),
+    ('skills', 'list'),
+    ('experience', 'list'),
+    ('action_verbs', 'list'),
+    ('placement_tips', 'list'),
+)
+COLUMN_NAMES = tuple(name for name, _ in EXPORT_COLUMNS)
+IMMUTABLE_COLUMNS = ('name', 'email', 'phone', 'linkedin', 'github')
+_SCALAR_COLUMNS = tuple(name for name, column_type in EXPORT_COLUMNS
+                        if column_type != 'list' and name not in IMMUTABLE_COLUMNS)
+_LIST_COLUMNS = tuple(name for name, column_type in EXPORT_COLUMNS if column_type == 'list')
+
+# One encoder for every record (json.dumps with options builds a new one per call)
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def _import_pyarrow():
+    # NOTE: Parquet/Arrow export requires the optional 'pyarrow' library
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet/Arrow export needs the 'pyarrow' library. Please install it "
+                          "with 'pip install pyarrow', or export to .jsonl/.csv")
+    return pyarrow
+
+
+def format_for(path, default=None):
+    """Export format of an output path: by extension, parquet for a directory
+
+    Other paths get default, or raise ValueError without one.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in EXTENSIONS:
+        return EXTENSIONS[extension]
+    if os.path.isdir(path) or path.endswith(('/', os.sep)):
+        return 'parquet'
+    if default is not None:
+        return default
+    raise ValueError(f"Cannot tell the export format of {path}: use one of "
+                     f"{', '.join(sorted(EXTENSIONS))}, a directory, or pass the format")
+
+
+def flatten(record):
+    """One record as a row of EXPORT_COLUMNS (missing values are None)"""
+    row = dict.fromkeys(COLUMN_NAMES)
+    for name in _SCALAR_COLUMNS:
+        value = record.get(name)
+        if value is not None and not isinstance(value, (dict, list)):
+            row[name] = value
+    immutable_fields = record.get('immutable_fields')
+    if isinstance(immutable_fields, dict):
+        for field in IMMUTABLE_COLUMNS:
+            if field in immutable_fields:
+                row[field] = immutable_fields[field]
+    keywords = record.get('keywords')
+    if isinstance(keywords, dict):
+        nested = keywords.get('suggestions')
+        for source in (keywords, nested if isinstance(nested, dict) else {}):
+            for field in _LIST_COLUMNS:
+                value = source.get(field)
+                if isinstance(value, list):
+                    row[field] = list(map(str, value))
+    return row
+
+
+def _typed(value, column_type):
+    """Cell value coerced to its column type; None for anything that does not fit"""
+    if value is None:
+        return None
+    try:
+        if column_type == 'float':
+            return float(value)
+        if column_type == 'int':
+            return int(value)
+    except (TypeError, ValueError):
+        return None
+    if column_type == 'str':
+        return str(value)
+    return value
+
+
+class ExportWriter:
+    """Buffered writer of analysis records to one export file (use as a context manager)
+
+    Records are held until batch_size have accumulated, then written with a
+    single call. append=True adds to an existing JSON Lines/CSV file (a CSV
+    header is only written to an empty file) or a new part to a Parquet directory.
+    """
+
+    def __init__(self, path, export_format=None, append=False, batch_size=BATCH_SIZE):
+        self.format = export_format or format_for(path)
+        if self.format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {self.format}")
+        self.path = path
+        self.batch_size = batch_size
+        self.written = 0
+        self._buffer = []
+        self._file = None
+        self._writer = None
+
+        if self.format in ('jsonl', 'csv'):
+            exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+            self._file = open(path, 'a' if append else 'w', encoding='utf-8', newline='')
+            self._header = self.format == 'csv' and not exists
+            return
+
+        self._pyarrow = _import_pyarrow()
+        if self.format == 'parquet' and (os.path.isdir(path) or path.endswith(('/', os.sep))):
+            os.makedirs(path, exist_ok=True)
+            self.path = os.path.join(path, f"part-{time.strftime('%Y%m%d-%H%M%S')}-"
+                                           f"{os.getpid()}-{id(self) & 0xFFFF:04x}.parquet")
+        elif append and os.path.exists(path):
+            raise ValueError(f"Cannot append to {path}: {self.format} files are written whole; "
+                             "export to a directory to add Parquet part files")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def write(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """Write the buffered records"""
+        records, self._buffer = self._buffer, []
+        if records:
+            getattr(self, f"_write_{self.format}")(records)
+            self.written += len(records)
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        elif self.format in ('parquet', 'arrow') and not self.written:
+            # Nothing was written, but the file should still exist with its schema
+            self._arrow_writer()
+            self._writer.close()
+            self._writer = None
+
+    def _write_jsonl(self, records):
+        self._file.write(''.join([_encode_json(record) + "\n" for record in records]))
+
+    def _write_csv(self, records):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if self._header:
+            writer.writerow(COLUMN_NAMES)
+            self._header = False
+        for record in records:
+            row = flatten(record)
+            writer.writerow([
+                '' if row[name] is None else
+                _encode_json(row[name]) if column_type == 'list' else row[name]
+                for name, column_type in EXPORT_COLUMNS])
+        self._file.write(buffer.getvalue())
+
+    def _schema(self):
+        pa = self._pyarrow
+        types = {'str': pa.string(), 'float': pa.float64(), 'int': pa.int64(),
+                 'list': pa.list_(pa.string())}
+        return pa.schema([(name, types[column_type]) for name, column_type in EXPORT_COLUMNS])
+
+    def _arrow_writer(self):
+        if self._writer is None:
+            pa = self._pyarrow
+            if self.format == 'parquet':
+                self._writer = pa.parquet.ParquetWriter(self.path, self._schema())
+            else:
+                self._writer = pa.ipc.new_file(self.path, self._schema())
+        return self._writer
+
+    def _write_parquet(self, records):
+        rows = [flatten(record) for record in records]
+        columns = {name: [_typed(row[name], column_type) for row in rows]
+                   for name, column_type in EXPORT_COLUMNS}
+        table = self._pyarrow.Table.from_pydict(columns, schema=self._schema())
+        self._arrow_writer().write_table(table)
+
+    _write_arrow = _write_parquet
+
+
+def export_records(records, path, export_format=None, append=False, batch_size=BATCH_SIZE):
+    """Write records to path; returns the number written"""
+    with ExportWriter(path, export_format, append, batch_size) as writer:
+        writer.write_many(records)
+    return writer.written
+
+
+def format_text(keywords):
+    """Suggestions as the plain-text report the GUI has always exported"""
+    suggestions = keywords.get('suggestions', {})
+    sections = [
+        ("MISSING KEYWORDS (Prioritize):", keywords.get('missing_keywords', [])),
+        ("TECHNICAL TERMS:", keywords.get('technical_terms', [])),
+        ("KEY PHRASES:", keywords.get('key_phrases', [])),
+        ("SKILLS TO ADD:", suggestions.get('skills', [])),
+        ("EXPERIENCE PHRASES:", suggestions.get('experience', [])),
+        ("ACTION VERBS:", suggestions.get('action_verbs', [])),
+    ]
+    if 'placement_tips' in keywords:
+        sections.append(("AI PLACEMENT TIPS:", keywords['placement_tips']))
+    lines = ["ATS KEYWORD SUGGESTIONS FOR MANUAL OPTIMIZATION", "=" * 50, ""]
+    for number, (title, items) in enumerate(sections):
+        if number:
+            lines.extend(["", ""])
+        lines.append(title)
+        lines.extend(f"• {item}" for item in items)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental parser for streamed AI suggestion replies
+Reads the reply's JSON object a chunk at a time and reports every list item
+(a missing keyword, a skill, a placement tip...) as soon as its closing quote
+arrives, so results can be shown while the model is still generating.
+"""
+
+import json
+
+
+class SuggestionStreamParser:
+    """Feed reply text in pieces; feed() returns the (path, item) pairs completed by it
+
+    path is the tuple of object keys leading to the list, e.g. ('missing_keywords',)
+    or ('suggestions', 'skills'). Text before the first '{' (prose, a ```json fence)
+    and after the object closes is ignored.
+    """
+
+    def __init__(self):
+        self._chars = []
+        self._stack = []  # one frame per open object/array
+        self._string = None  # raw characters of the string being read
+        self._escape = False
+        self.started = False
+        self.done = False
+
+    def feed(self, chunk):
+        items = []
+        for ch in chunk:
+            if self.done:
+                break
+            if not self._stack:
+                if ch != '{':
+                    continue
+                self.started = True
+
+            self._chars.append(ch)
+            if self._string is not None:
+                if self._escape:
+                    self._escape = False
+                    self._string.append(ch)
+                elif ch == '\\':
+                    self._escape = True
+                    self._string.append(ch)
+                elif ch == '"':
+                    self._end_string(items)
+                else:
+                    self._string.append(ch)
+            elif ch == '"':
+                self._string = []
+            elif ch == '{':
+                self._stack.append({'array': False, 'key': None, 'expect_key': True})
+            elif ch == '[':
+                # Only lists reached through object keys alone carry items; one
+                # inside a list item (e.g. a tip's list of places) does not
+                path = None
+                if not any(frame['array'] for frame in self._stack):
+                    path = tuple(frame['key'] for frame in self._stack)
+                self._stack.append({'array': True, 'path': path})
+            elif ch in '}]':
+                self._stack.pop()
+                if not self._stack:
+                    self.done = True
+            elif ch == ',' and not self._stack[-1]['array']:
+                self._stack[-1]['expect_key'] = True
+        return items
+
+    def _end_string(self, items):
+        raw = ''.join(self._string)
+        self._string = None
+        try:
+            value = json.loads(f'"{raw}"')
+        except ValueError:
+            value = raw
+        frame = self._stack[-1]
+        if not frame['array']:
+            if frame['expect_key']:
+                frame['key'] = value
+                frame['expect_key'] = False
+        elif frame['path'] is not None:
+            items.append((frame['path'], value))
+
+    def text(self):
+        """The JSON object text received so far"""
+        return ''.join(self._chars)
+
+    def result(self):
+        """The complete parsed object; raises ValueError if it never arrived in full"""
+        if not self.started:
+            raise ValueError("response contains no JSON object")
+        if not self.done:
+            raise ValueError("response JSON object is incomplete")
+        return json.loads(self.text())
+
+
+def extract_json_object(text):
+    """Parse the first balanced JSON object in text, or raise ValueError"""
+    parser = SuggestionStreamParser()
+    parser.feed(text)
+    return parser.result()
+
+
+def add_suggestion_item(suggestions, path, item):
+    """Append a streamed item to a (partial) suggestion dict"""
+    target = suggestions
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+    target.setdefault(path[-1], []).append(item)
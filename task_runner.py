@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Background task runner for the Tk GUI
+Work runs on a thread pool; results, errors and progress are handed back to the
+Tk main thread through a queue drained with root.after, so widgets are only
+ever touched from the main thread.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task when it has been cancelled or timed out"""
+
+
+class Task:
+    """Handle for one background job; passed to the job as its first argument"""
+
+    def __init__(self, task_id, name, timeout=None):
+        self.id = task_id
+        self.name = name
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout if timeout else None
+        self._cancelled = threading.Event()
+        self.finished = False
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check_cancelled(self):
+        """Call between stages of long work to stop early once cancelled"""
+        if self._cancelled.is_set():
+            raise TaskCancelled(f"{self.name} was cancelled")
+
+
+class TaskRunner:
+    """Runs callables off the Tk thread and delivers their outcome back on it"""
+
+    def __init__(self, root, max_workers=4, poll_ms=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="ats-worker")
+        self._queue = queue.Queue()
+        self._tasks = {}
+        self._ids = itertools.count(1)
+        self._closed = False
+        self.root.after(self.poll_ms, self._drain)
+
+    def submit(self, name, func, *args, on_success=None, on_error=None, timeout=None):
+        """Run func(task, *args) in the pool
+
+        on_success(result) / on_error(exception) are called on the Tk thread. A task
+        that is cancelled or passes its timeout reports TaskCancelled / TimeoutError
+        right away; whatever the worker returns afterwards is discarded.
+        """
+        task = Task(next(self._ids), name, timeout)
+        self._tasks[task.id] = (task, on_success, on_error)
+
+        def run():
+            try:
+                result = func(task, *args)
+            except BaseException as e:
+                self._queue.put((task.id, None, e))
+            else:
+                self._queue.put((task.id, result, None))
+
+        self._executor.submit(run)
+        return task
+
+    def call_soon(self, func, *args):
+        """Schedule func(*args) on the Tk thread; safe to call from any thread"""
+        self._queue.put((None, func, args))
+
+    def running(self):
+        return [task for task, _, _ in self._tasks.values()]
+
+    def cancel_all(self):
+        for task in self.running():
+            task.cancel()
+
+    def _finish(self, task_id, result=None, error=None):
+        entry = self._tasks.pop(task_id, None)
+        if entry is None:
+            return
+        task, on_success, on_error = entry
+        task.finished = True
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+        elif on_success is not None:
+            on_success(result)
+
+    def _drain(self):
+        if self._closed:
+            return
+        try:
+            self._process_queue()
+            self._check_deadlines()
+        finally:
+            self.root.after(self.poll_ms, self._drain)
+
+    def _process_queue(self):
+        while True:
+            try:
+                task_id, payload, extra = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if task_id is None:
+                payload(*extra)
+            else:
+                self._finish(task_id, payload, extra)
+
+    def _check_deadlines(self):
+        """Report cancellations and timeouts without waiting for the worker"""
+        now = time.monotonic()
+        for task in self.running():
+            if task.cancelled:
+                self._finish(task.id, error=TaskCancelled(f"{task.name} was cancelled"))
+            elif task.deadline is not None and now > task.deadline:
+                task.cancel()
+                self._finish(task.id, error=TimeoutError(
+                    f"{task.name} timed out after {now - task.started:.1f}s"))
+
+    def shutdown(self):
+        self._closed = True
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
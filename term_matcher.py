@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dictionary term matcher
+Single-pass, word-boundary-aware matching of many (multi-word) terms and their
+synonyms, e.g. the seed skills dictionary in skills.txt ("k8s" -> "Kubernetes"),
+extended with the files listed in ATS_SKILLS_FILE.
+
+Terms are stored in a token trie. The text is tokenized once and each token is
+looked up in a dict, so scan time grows with the length of the text and the
+longest term, not with the number of terms in the dictionary.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+
+# Word-like tokens; keeps "c++", "c#", "node.js", "scikit-learn" and "ci/cd" parts intact
+TERM_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#]*(?:[.\-][A-Za-z0-9+#]+)*")
+
+DEFAULT_SKILLS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skills.txt')
+
+_TERMINAL = None  # trie key holding the canonical name of a complete term
+
+
+def term_tokens(text):
+    """Lowercase matching tokens of a text or a dictionary term"""
+    return [token.lower() for token in TERM_TOKEN_PATTERN.findall(text)]
+
+
+class TermMatcher:
+    """Finds dictionary terms in text, reporting their canonical names"""
+
+    def __init__(self, terms=()):
+        self._root = {}
+        self.size = 0
+        self.max_length = 0
+        for term in terms:
+            if isinstance(term, str):
+                self.add(term)
+            else:
+                canonical, synonyms = term
+                self.add(canonical, synonyms)
+
+    def add(self, canonical, synonyms=()):
+        """Register a canonical term and the alternative spellings that map to it"""
+        for spelling in (canonical, *synonyms):
+            tokens = term_tokens(spelling)
+            if not tokens:
+                continue
+            node = self._root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            if _TERMINAL not in node:
+                self.size += 1
+            node[_TERMINAL] = canonical
+            self.max_length = max(self.max_length, len(tokens))
+
+    def scan(self, tokens):
+        """Yield (canonical, start, end) for leftmost-longest matches in a token list"""
+        root = self._root
+        i = 0
+        n = len(tokens)
+        while i < n:
+            node = root.get(tokens[i])
+            if node is None:
+                i += 1
+                continue
+            match = None
+            j = i + 1
+            while True:
+                if _TERMINAL in node:
+                    match = (node[_TERMINAL], j)
+                if j >= n:
+                    break
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+            if match is None:
+                i += 1
+            else:
+                yield match[0], i, match[1]
+                i = match[1]
+
+    def find(self, text):
+        """Canonical names found in text, in order of first appearance, without repeats"""
+        return list(dict.fromkeys(canonical for canonical, _, _ in self.scan(term_tokens(text))))
+
+    def __len__(self):
+        return self.size
+
+
+def parse_dictionary(lines):
+    """Yield (canonical, synonyms) from 'Canonical | synonym | ...' lines"""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        names = [name.strip() for name in line.split('|')]
+        names = [name for name in names if name]
+        if names:
+            yield names[0], names[1:]
+
+
+def load_dictionary(paths):
+    """Build a TermMatcher from one or more dictionary files"""
+    matcher = TermMatcher()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for canonical, synonyms in parse_dictionary(f):
+                matcher.add(canonical, synonyms)
+    return matcher
+
+
+@lru_cache(maxsize=1)
+def default_skills_matcher():
+    """skills.txt plus any files listed in ATS_SKILLS_FILE, loaded once per process"""
+    paths = [DEFAULT_SKILLS_FILE]
+    extra = os.environ.get('ATS_SKILLS_FILE')
+    if extra:
+        paths.extend(path for path in extra.split(os.pathsep) if path)
+    return load_dictionary(path for path in paths if os.path.exists(path))
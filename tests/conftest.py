@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Shared test setup: import the modules from the repository root"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
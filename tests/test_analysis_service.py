@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Analysis service: requests a web page or a foreign API URL could abuse are refused"""
+
+import http.client
+import json
+
+import pytest
+
+from analysis_service import AnalysisService, ServiceClient, ServiceError, start_service
+from fake_provider import start_fake_provider
+
+RESUME = "Jane Doe\njane@example.com\nPython developer with Flask and SQL experience."
+JD = "We need a Python engineer with Kubernetes, Docker and AWS experience."
+
+
+@pytest.fixture
+def provider():
+    server = start_fake_provider(seed=1)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def service_for(monkeypatch):
+    monkeypatch.setenv("CUSTOM_API_KEY", "service-secret")
+    servers = []
+
+    def start(api_urls=()):
+        server = start_service(AnalysisService(api_urls=api_urls), port=0)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def raw_post(server, path, body, headers):
+    host, port = server.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        connection.request("POST", path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b"{}")
+    finally:
+        connection.close()
+
+
+def analyze_payload(api_url, **fields):
+    payload = {'resume': RESUME, 'format': 'txt', 'jd': JD, 'provider': 'custom',
+               'api_url': api_url}
+    payload.update(fields)
+    return payload
+
+
+def test_rejects_non_json_content_type(service_for):
+    server = service_for()
+    status, reply = raw_post(server, "/keywords", json.dumps({'resume': RESUME, 'jd': JD}),
+                             {"Content-Type": "text/plain"})
+    assert status == 415
+    assert 'application/json' in reply['error']
+
+
+def test_rejects_browser_origin(service_for):
+    server = service_for()
+    status, _ = raw_post(server, "/read", json.dumps({'path': '/etc/passwd'}),
+                         {"Content-Type": "application/json",
+                          "Origin": "https://attacker.example"})
+    assert status == 403
+
+
+def test_json_content_type_with_charset_is_accepted(service_for):
+    server = service_for()
+    status, reply = raw_post(server, "/keywords", json.dumps({'resume': RESUME, 'jd': JD}),
+                             {"Content-Type": "application/json; charset=utf-8"})
+    assert status == 200
+    assert 'missing_keywords' in reply
+
+
+def test_foreign_api_url_does_not_get_service_key(service_for, provider):
+    server = service_for()
+    client = ServiceClient(server.url, timeout=10)
+    with pytest.raises(ServiceError) as error:
+        client.request("POST", "/suggestions", analyze_payload(provider.url))
+    assert error.value.status == 403
+    with pytest.raises(ServiceError) as error:
+        client.request("POST", "/analyze", analyze_payload(provider.url))
+    assert error.value.status == 403
+    assert provider.requests == 0
+
+
+def test_foreign_api_url_with_own_key(service_for, provider):
+    server = service_for()
+    client = ServiceClient(server.url, timeout=10)
+    reply = client.request("POST", "/suggestions",
+                           analyze_payload(provider.url, api_key="caller-key"))
+    assert reply['missing_keywords']
+    assert provider.last_authorization == "Bearer caller-key"
+
+
+def test_configured_api_url_gets_service_key(service_for, provider):
+    # The configured URL matches however the request spells it
+    server = service_for(api_urls=[provider.url + "/"])
+    client = ServiceClient(server.url, timeout=10)
+    reply = client.request("POST", "/suggestions",
+                           analyze_payload(provider.url.upper().replace("/V1", "/v1")
+                                           + "/chat/completions"))
+    assert reply['missing_keywords']
+    assert provider.last_authorization == "Bearer service-secret"
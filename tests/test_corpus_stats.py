@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Corpus statistics: several writers share one directory without losing counts"""
+
+import multiprocessing
+import os
+
+from corpus_stats import CorpusStats
+from keyword_engine import DocumentIndex
+
+JDS = [
+    "Senior Python engineer with Kubernetes and AWS experience",
+    "Python developer, Django and PostgreSQL",
+    "Kubernetes platform engineer: Terraform, AWS, Go",
+    "Data engineer with Python, Spark and Airflow",
+]
+
+
+def add_and_flush(path, texts, every=None):
+    corpus = CorpusStats(path)
+    for number, text in enumerate(texts, 1):
+        corpus.add_document(DocumentIndex(text))
+        if every and number % every == 0:
+            corpus.flush()
+    corpus.close()
+
+
+def frequencies(path):
+    corpus = CorpusStats(path)
+    return corpus.documents, {term: corpus.document_frequency(term) for term in corpus._terms}
+
+
+def test_interleaved_writers_merge(tmp_path):
+    shared, single = str(tmp_path / 'shared'), str(tmp_path / 'single')
+    first = CorpusStats(shared)
+    second = CorpusStats(shared)
+    first.add_document(DocumentIndex(JDS[0]))
+    second.add_document(DocumentIndex(JDS[1]))
+    second.add_document(DocumentIndex(JDS[0]))
+    first.flush()
+    second.flush()
+    # Documents added since the last flush already count
+    first.add_document(DocumentIndex(JDS[2]))
+    assert first.document_frequency('kubernetes') == 2
+    first.close()
+    second.close()
+
+    add_and_flush(single, JDS[:3])
+    assert frequencies(shared) == frequencies(single)
+    assert frequencies(shared)[0] == 3
+
+
+def test_concurrent_processes(tmp_path):
+    shared, single = str(tmp_path / 'shared'), str(tmp_path / 'single')
+    texts = [f"{number} {JDS[number % len(JDS)]}" for number in range(40)]
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=add_and_flush, args=(shared, texts[start::4], 3))
+                 for start in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    add_and_flush(single, texts)
+    assert frequencies(shared) == frequencies(single)
+
+
+def test_committed_journal_is_finished_on_open(tmp_path):
+    add_and_flush(str(tmp_path), JDS[:2])
+    corpus = CorpusStats(str(tmp_path))
+    corpus.add_document(DocumentIndex(JDS[2]))
+    # Simulate a crash right after the journal was committed
+    corpus._apply = lambda meta, ids, values: (_ for _ in ()).throw(KeyboardInterrupt)
+    try:
+        corpus.flush()
+    except KeyboardInterrupt:
+        pass
+    assert os.path.exists(os.path.join(str(tmp_path), 'df.journal'))
+
+    reopened = CorpusStats(str(tmp_path))
+    assert reopened.documents == 3
+    assert reopened.document_frequency('kubernetes') == 2
+    assert not os.path.exists(os.path.join(str(tmp_path), 'df.journal'))
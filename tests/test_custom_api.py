@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Custom API client against the fake provider: pooling, retries, streaming, fan-out"""
+
+import json
+import time
+
+import pytest
+
+from custom_api import CustomAPIClient, CustomAPIError
+from fake_provider import start_fake_provider
+
+WORDS = ['kubernetes', 'terraform', 'django', 'spark', 'airflow', 'postgresql', 'redis', 'kafka']
+
+
+def prompt_for(word):
+    return f"RESUME CONTENT: python developer\nJOB DESCRIPTION: {word} engineer"
+
+
+@pytest.fixture
+def provider_for():
+    servers = []
+
+    def start(**options):
+        server = start_fake_provider(seed=1, **options)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def provider(provider_for):
+    return provider_for()
+
+
+def test_connection_reused_across_calls(provider):
+    client = CustomAPIClient(provider.url, api_key="key")
+    for word in WORDS[:5]:
+        reply = json.loads(client.complete(prompt_for(word)))
+        assert word.title() in reply['missing_keywords']
+    client.complete(prompt_for('redis'), stream=True)
+    client.complete(prompt_for('kafka'))
+    assert provider.requests == 7
+    assert provider.connections == 1
+    assert provider.last_authorization == "Bearer key"
+    client.close()
+
+
+@pytest.mark.parametrize('status', [500, 503])
+def test_retries_server_errors(provider, status):
+    client = CustomAPIClient(provider.url, backoff=0.01)
+    provider.fail_next(status, count=2)
+    reply = json.loads(client.complete(prompt_for('spark')))
+    assert 'Spark' in reply['missing_keywords']
+    assert provider.requests == 3
+
+
+def test_gives_up_after_max_retries(provider):
+    client = CustomAPIClient(provider.url, max_retries=2, backoff=0.01)
+    provider.fail_next(503, count=5)
+    with pytest.raises(CustomAPIError) as error:
+        client.complete(prompt_for('spark'))
+    assert error.value.status == 503
+    assert provider.requests == 3
+
+
+def test_timeout_on_reused_connection_is_not_resent(provider):
+    client = CustomAPIClient(provider.url, timeout=0.5, max_retries=0)
+    client.complete(prompt_for('kafka'))  # leaves a connection in the pool
+    provider.latency = 1.0
+    started = time.perf_counter()
+    with pytest.raises(CustomAPIError):
+        client.complete(prompt_for('kafka'))
+    assert time.perf_counter() - started < 1.0
+    assert provider.requests == 2
+
+
+def test_client_errors_are_not_retried(provider):
+    client = CustomAPIClient(provider.url, backoff=0.01)
+    provider.fail_next(400)
+    with pytest.raises(CustomAPIError) as error:
+        client.complete(prompt_for('spark'))
+    assert error.value.status == 400
+    assert provider.requests == 1
+
+
+def test_retry_after_is_honoured(provider):
+    client = CustomAPIClient(provider.url, backoff=0.0)
+    provider.fail_next(503, retry_after="0.3")
+    started = time.perf_counter()
+    client.complete(prompt_for('redis'))
+    assert time.perf_counter() - started >= 0.3
+    assert provider.requests == 2
+
+
+def test_rate_limit_is_raised_with_retry_after(provider):
+    client = CustomAPIClient(provider.url, backoff=0.01)
+    provider.fail_next(429, retry_after="2")
+    with pytest.raises(CustomAPIError) as error:
+        client.complete(prompt_for('redis'))
+    assert error.value.status == 429
+    assert error.value.retry_after == 2.0
+    assert provider.requests == 1
+
+
+def test_streaming_reassembles_reply(provider_for):
+    provider = provider_for(chunk_chars=5)
+    client = CustomAPIClient(provider.url)
+    tokens = []
+    streamed = client.complete(prompt_for('airflow'), stream=True, on_token=tokens.append)
+    assert len(tokens) > 10
+    assert ''.join(tokens) == streamed
+    assert streamed == client.complete(prompt_for('airflow'))
+    assert 'Airflow' in json.loads(streamed)['missing_keywords']
+    assert provider.connections == 1
+
+
+def test_complete_many_bounds_concurrency_and_keeps_order(provider_for):
+    provider = provider_for(latency=0.05, jitter=0.04)
+    client = CustomAPIClient(provider.url, backoff=0.01)
+    provider.fail_next(400)
+    replies = client.complete_many([prompt_for(word) for word in WORDS * 2], max_concurrency=3)
+    assert provider.max_active == 3
+    assert provider.connections <= 3
+    # The one failed prompt comes back as its exception, in its place
+    errors = [reply for reply in replies if isinstance(reply, CustomAPIError)]
+    assert len(errors) == 1
+    for word, reply in zip(WORDS * 2, replies):
+        if not isinstance(reply, Exception):
+            assert word.title() in json.loads(reply)['missing_keywords']
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Disk cache: LRU eviction within the byte budget, TTLs and hit/miss counters"""
+
+import pytest
+
+from disk_cache import DiskCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable time.time() for the cache, so access order never ties"""
+    now = [1000.0]
+    monkeypatch.setattr('disk_cache.time.time', lambda: now[0])
+
+    def advance(seconds=1.0):
+        now[0] += seconds
+    return advance
+
+
+def total_bytes(cache):
+    return cache._connect().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / 'cache.sqlite3'), max_bytes=30)
+    for key in 'abc':
+        cache.set(key, key * 10)
+        clock()
+    assert cache.get('a') == 'a' * 10  # a is now the most recently used
+    clock()
+    cache.set('d', 'd' * 10)
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in 'acd'] == ['a' * 10, 'c' * 10, 'd' * 10]
+    clock()
+    cache.set('e', 'e' * 20)  # needs two entries' room: the two oldest go
+    assert [key for key in 'acde' if cache.get(key) is not None] == ['d', 'e']
+    assert cache.stats()['bytes'] == 30
+
+
+def test_hit_and_miss_counters(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / 'cache.sqlite3'))
+    cache.set('key', b'value')
+    cache.get('key')
+    cache.get('key')
+    cache.get('other')
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'entries': 1, 'bytes': 5}
+
+
+def test_expired_entries_miss_and_are_purged(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / 'cache.sqlite3'))
+    cache.set('short', 'x' * 4, ttl=5)
+    cache.set('long', 'y' * 6, ttl=60)
+    clock(10)
+    assert cache.get('short') is None
+    cache.set('short2', 'z', ttl=5)
+    clock(10)
+    cache.set('new', 'n')  # a write purges what has expired
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['bytes'] == 7
+    assert cache.get('long') == 'y' * 6
+
+
+def test_byte_total_follows_every_change(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache, other = DiskCache(path), DiskCache(path)  # e.g. two worker processes
+    cache.set('a', 'a' * 10)
+    other.set('b', 'b' * 5)
+    cache.set('a', 'a' * 3)  # replacing an entry
+    other.delete('b')
+    cache.set('c', b'c' * 7)
+    assert cache.stats()['bytes'] == other.stats()['bytes'] == total_bytes(cache) == 10
+    other.clear()
+    assert cache.stats()['bytes'] == 0
+
+
+def test_total_is_seeded_for_an_existing_cache(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = DiskCache(path)
+    cache.set('a', 'a' * 10)
+    # A cache file written before the totals table existed
+    conn = cache._connect()
+    conn.execute("DROP TABLE totals")
+    for name in ('insert', 'delete', 'update'):
+        conn.execute(f"DROP TRIGGER entries_{name}")
+    conn.execute("INSERT INTO entries VALUES ('b', 'bbbb', 4, 0, NULL)")
+    cache.close()
+    assert DiskCache(path).stats()['bytes'] == 14
+
+
+def test_write_does_not_scan_the_table(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache.sqlite3'))
+    conn = cache._connect()
+    plan = conn.execute("EXPLAIN QUERY PLAN DELETE FROM entries "
+                        "WHERE expires IS NOT NULL AND expires <= 0").fetchall()
+    assert any('entries_expires' in row[-1] for row in plan)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Multi-provider fan-out against fake providers: race, hedge, timeouts, cancellation"""
+
+import asyncio
+import time
+
+import pytest
+
+from fake_provider import start_fake_provider
+from provider_fanout import LatencyStats, hedge, race
+from provider_scheduler import RateLimits, scheduler
+
+PROMPT = "RESUME CONTENT: python developer\nJOB DESCRIPTION: kubernetes terraform engineer"
+
+
+@pytest.fixture
+def provider_for():
+    servers = []
+
+    def start(**options):
+        server = start_fake_provider(seed=1, **options)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def config(server, model):
+    return {'provider': 'custom', 'api_key': 'key', 'model': model, 'api_url': server.url}
+
+
+def wait_for(condition, timeout=2.0):
+    ends = time.monotonic() + timeout
+    while not condition() and time.monotonic() < ends:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_race_picks_fast_valid_reply(provider_for):
+    fast = provider_for(latency=0.05)
+    slow = provider_for(latency=1.5)
+    garbage = provider_for(garbage_rate=1.0)
+    stats = LatencyStats()
+    configs = [config(slow, 'slow'), config(garbage, 'garbage'), config(fast, 'fast')]
+
+    started = time.perf_counter()
+    winner, suggestions = asyncio.run(race(PROMPT, configs, stats=stats))
+    assert winner['model'] == 'fast'
+    assert 'Kubernetes' in suggestions['missing_keywords']
+    assert time.perf_counter() - started < 1.0
+
+    # The slow call is cancelled (its connection closed), not waited out
+    assert wait_for(lambda: stats.outcomes().get('custom:slow', {}).get('cancelled') == 1, 1.0)
+    assert stats.outcomes()['custom:garbage']['replied'] == 1
+
+
+def test_hedge_starts_backup_after_delay(provider_for):
+    slow = provider_for(latency=1.5)
+    fast = provider_for(latency=0.05)
+    configs = [config(slow, 'slow'), config(fast, 'fast')]
+
+    started = time.perf_counter()
+    winner, _ = asyncio.run(hedge(PROMPT, configs, stats=None, hedge_delay=0.2))
+    elapsed = time.perf_counter() - started
+    assert winner['model'] == 'fast'
+    assert 0.2 <= elapsed < 1.0
+    assert slow.requests == 1 and fast.requests == 1
+
+
+def test_hedge_waits_when_first_provider_is_quick(provider_for):
+    first = provider_for(latency=0.05)
+    backup = provider_for()
+    winner, _ = asyncio.run(hedge(PROMPT, [config(first, 'first'), config(backup, 'backup')],
+                                  stats=None, hedge_delay=0.5))
+    assert winner['model'] == 'first'
+    assert backup.requests == 0
+
+
+@pytest.mark.parametrize('strategy', [race, hedge])
+def test_timeout(provider_for, strategy):
+    slow = provider_for(latency=1.5)
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        asyncio.run(strategy(PROMPT, [config(slow, 'slow')], stats=None, timeout=0.2))
+    assert time.perf_counter() - started < 1.0
+
+
+def test_queued_losers_are_never_sent(provider_for):
+    slow = provider_for(latency=1.5)
+    fast = provider_for(latency=0.3)
+    # One call in flight to the slow server: the second attempt queues behind the first
+    scheduler.configure('custom', RateLimits(None, None, 1), 'queued')
+    stats = LatencyStats()
+    configs = [config(slow, 'queued'), config(slow, 'queued'), config(fast, 'fast')]
+
+    winner, _ = asyncio.run(race(PROMPT, configs, stats=stats))
+    assert winner['model'] == 'fast'
+    assert wait_for(lambda: stats.outcomes().get('custom:queued', {}).get('cancelled') == 2, 1.0)
+    assert slow.requests == 1
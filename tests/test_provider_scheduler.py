@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Provider scheduler against a fake provider that throttles on purpose"""
+
+import threading
+import time
+
+import pytest
+
+import provider_scheduler
+from custom_api import CustomAPIClient
+from fake_provider import start_fake_provider
+from provider_scheduler import (BULK, INTERACTIVE, DeadlineExceeded, ProviderScheduler,
+                                RateLimits, scheduling)
+
+PROMPT = "RESUME CONTENT: python developer\nJOB DESCRIPTION: kubernetes engineer"
+
+
+@pytest.fixture
+def provider_for():
+    servers = []
+
+    def start(**options):
+        server = start_fake_provider(seed=1, **options)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def scheduler_for(limits, model='test'):
+    scheduler = ProviderScheduler()
+    scheduler.configure('custom', limits, model)
+    return scheduler
+
+
+def wait_for(condition, timeout=2.0):
+    ends = time.monotonic() + timeout
+    while not condition() and time.monotonic() < ends:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_token_bucket_paces_calls(provider_for, monkeypatch):
+    # 600 requests/min with no burst: one call every 0.1 s. The server allows one every
+    # 0.05 s, so back-to-back calls would be throttled but paced ones never are
+    monkeypatch.setattr(provider_scheduler, 'BURST_SECONDS', 0.1)
+    provider = provider_for(rate_limit=1200, rate_burst=1)
+    scheduler = scheduler_for(RateLimits(600, None, 4))
+    client = CustomAPIClient(provider.url)
+
+    started = time.perf_counter()
+    for _ in range(5):
+        scheduler.call('custom', 'test', provider.url, 0, client.complete, PROMPT)
+    assert time.perf_counter() - started >= 0.35
+    assert provider.throttled == 0
+    assert scheduler.summary()['custom:test']['sent'] == 5
+
+
+def test_rate_limited_call_is_retried_after_retry_after(provider_for):
+    provider = provider_for(rate_limit=600, rate_burst=1)
+    scheduler = scheduler_for(RateLimits(None, None, 4))
+    client = CustomAPIClient(provider.url)
+    limited = []
+
+    with scheduling(on_rate_limit=lambda label, seconds: limited.append((label, seconds))):
+        for _ in range(2):
+            scheduler.call('custom', 'test', provider.url, 0, client.complete, PROMPT)
+    assert provider.throttled == 1
+    assert provider.requests == 3
+    label, seconds = limited[0]
+    assert label == 'custom:test' and 0 < seconds <= 0.1
+    summary = scheduler.summary()['custom:test']
+    assert summary['throttled'] == 1 and summary['sent'] == 3
+
+
+def test_rate_limit_past_deadline_is_not_waited_out(provider_for):
+    # 6 requests/min: the server asks for a ~10 s wait, more than the deadline allows
+    provider = provider_for(rate_limit=6, rate_burst=1)
+    scheduler = scheduler_for(RateLimits(None, None, 4))
+    client = CustomAPIClient(provider.url)
+    scheduler.call('custom', 'test', provider.url, 0, client.complete, PROMPT)
+
+    started = time.perf_counter()
+    with scheduling(timeout=1.0), pytest.raises(DeadlineExceeded):
+        scheduler.call('custom', 'test', provider.url, 0, client.complete, PROMPT)
+    assert time.perf_counter() - started < 0.5
+
+
+def test_interactive_overtakes_bulk(provider_for):
+    provider = provider_for()
+    scheduler = scheduler_for(RateLimits(None, None, 1))
+    client = CustomAPIClient(provider.url)
+    release = threading.Event()
+    order = []
+
+    def call(priority, name, func=None):
+        def send():
+            order.append(name)
+            return client.complete(PROMPT)
+        with scheduling(priority):
+            scheduler.call('custom', 'test', provider.url, 0, func or send)
+
+    def queued():
+        return scheduler.summary()['custom:test']['queued']
+
+    threads = [threading.Thread(target=call, args=(BULK, 'busy', release.wait))]
+    threads[0].start()
+    assert wait_for(lambda: scheduler.summary().get('custom:test', {}).get('sent') == 1)
+    for number in range(3):
+        threads.append(threading.Thread(target=call, args=(BULK, f'bulk{number}')))
+        threads[-1].start()
+        assert wait_for(lambda: queued() == number + 1)
+    threads.append(threading.Thread(target=call, args=(INTERACTIVE, 'interactive')))
+    threads[-1].start()
+    assert wait_for(lambda: queued() == 4)
+
+    release.set()
+    for thread in threads:
+        thread.join(10)
+    assert order == ['interactive', 'bulk0', 'bulk1', 'bulk2']
+    assert provider.requests == 4
+
+
+def test_queued_call_expires_at_its_deadline(provider_for):
+    provider = provider_for()
+    scheduler = scheduler_for(RateLimits(None, None, 1))
+    client = CustomAPIClient(provider.url)
+    release = threading.Event()
+    busy = threading.Thread(target=scheduler.call,
+                            args=('custom', 'test', provider.url, 0, release.wait))
+    busy.start()
+    assert wait_for(lambda: scheduler.summary().get('custom:test', {}).get('sent') == 1)
+
+    started = time.perf_counter()
+    with scheduling(timeout=0.2), pytest.raises(DeadlineExceeded):
+        scheduler.call('custom', 'test', provider.url, 0, client.complete, PROMPT)
+    assert 0.2 <= time.perf_counter() - started < 1.0
+    release.set()
+    busy.join(10)
+
+    summary = scheduler.summary()['custom:test']
+    assert summary['expired'] == 1 and summary['queued'] == 0
+    assert provider.requests == 0
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Response cache keys: one entry per provider setup, including the server URL"""
+
+import custom_api
+from response_cache import ResponseCache, response_key
+
+PROMPT = "RESUME CONTENT: python developer\nJOB DESCRIPTION: kubernetes engineer"
+
+
+def test_api_url_is_part_of_the_key():
+    first = response_key('custom', None, PROMPT, api_url="http://10.0.0.1:8000/v1")
+    second = response_key('custom', None, PROMPT, api_url="http://10.0.0.2:8000/v1")
+    assert first != second
+    # Spellings of the same endpoint share an entry
+    assert first == response_key('custom', None, PROMPT,
+                                 api_url="HTTP://10.0.0.1:8000/v1/chat/completions/")
+    assert response_key('openai', None, PROMPT) != response_key(
+        'openai', None, PROMPT, api_url="http://127.0.0.1:8765/v1")
+
+
+def test_custom_model_defaults_to_client_default():
+    assert response_key('custom', None, PROMPT, api_url="http://h/v1") == response_key(
+        'custom', custom_api.DEFAULT_MODEL, PROMPT, api_url="http://h/v1")
+
+
+def test_entries_are_kept_per_api_url(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite3'))
+    suggestions = {'missing_keywords': ['Kubernetes']}
+    cache.put('custom', None, PROMPT, suggestions, api_url="http://a/v1")
+    assert cache.get('custom', None, PROMPT, api_url="http://a/v1") == suggestions
+    assert cache.get('custom', None, PROMPT, api_url="http://b/v1") is None
+    cache.invalidate('custom', None, PROMPT, api_url="http://a/v1")
+    assert cache.get('custom', None, PROMPT, api_url="http://a/v1") is None
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Streamed suggestion parsing: items are reported per list, whatever the reply nests"""
+
+import json
+
+import pytest
+
+from suggestion_stream import SuggestionStreamParser, extract_json_object
+
+
+def parse_in_chunks(text, size):
+    parser = SuggestionStreamParser()
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    return items, parser.result()
+
+
+@pytest.mark.parametrize('size', [1, 3, 1000])
+def test_items_by_path(size):
+    reply = {"missing_keywords": ["Kubernetes", "AWS"],
+             "suggestions": {"skills": ["Docker"], "action_verbs": ["Led"]}}
+    items, result = parse_in_chunks("Here you go:\n```json\n" + json.dumps(reply) + "\n```", size)
+    assert items == [(('missing_keywords',), 'Kubernetes'), (('missing_keywords',), 'AWS'),
+                     (('suggestions', 'skills'), 'Docker'),
+                     (('suggestions', 'action_verbs'), 'Led')]
+    assert result == reply
+
+
+@pytest.mark.parametrize('size', [1, 1000])
+def test_nested_arrays_inside_list_items(size):
+    reply = {"placement_tips": [{"where": ["a", "b"]}, ["c", ["d"]]],
+             "missing_keywords": ["x"]}
+    items, result = parse_in_chunks(json.dumps(reply), size)
+    assert items == [(('missing_keywords',), 'x')]
+    assert result == reply
+
+
+def test_incomplete_reply():
+    with pytest.raises(ValueError):
+        extract_json_object('{"missing_keywords": ["x", "y"')
+    with pytest.raises(ValueError):
+        extract_json_object('no JSON here')
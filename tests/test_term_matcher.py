@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Dictionary term matching: whole words only, synonyms reported by canonical name"""
+
+import term_matcher
+from keyword_engine import ACTION_VERB_MATCHER
+from term_matcher import TermMatcher, default_skills_matcher
+
+
+def test_matches_whole_words_only():
+    assert ACTION_VERB_MATCHER.find("She called the vendor and cancelled the order") == []
+    assert ACTION_VERB_MATCHER.find("Led a team of five; LED the migration") == ['led']
+    matcher = TermMatcher(['Java', 'Go'])
+    assert matcher.find("JavaScript developer going forward") == []
+    assert matcher.find("Java and Go services") == ['Java', 'Go']
+
+
+def test_synonyms_map_to_canonical_name():
+    skills = default_skills_matcher()
+    assert skills.find("Ran k8s clusters on aws") == ['Kubernetes', 'Amazon Web Services']
+    assert skills.find("reactjs, nodejs and ReactJS again") == ['React', 'Node.js']
+    assert skills.find("Set up continuous integration") == ['CI/CD']
+
+
+def test_longest_match_wins():
+    matcher = TermMatcher(['React', 'React Native', ('Machine Learning', ['ml'])])
+    assert matcher.find("React Native apps with machine learning") == [
+        'React Native', 'Machine Learning']
+    assert [(start, end) for _, start, end in matcher.scan(['react', 'native', 'ml'])] == [
+        (0, 2), (2, 3)]
+
+
+def test_extra_dictionaries_from_environment(tmp_path, monkeypatch):
+    extra = tmp_path / 'extra.txt'
+    extra.write_text("# house terms\nAcmeFlow | acme flow | aflow\n", encoding='utf-8')
+    monkeypatch.setenv('ATS_SKILLS_FILE', str(extra))
+    default_skills_matcher.cache_clear()
+    try:
+        assert default_skills_matcher().find("Built aflow pipelines in k8s") == [
+            'AcmeFlow', 'Kubernetes']
+    finally:
+        monkeypatch.delenv('ATS_SKILLS_FILE')
+        default_skills_matcher.cache_clear()
+    assert term_matcher.default_skills_matcher().find("aflow") == []
@@ -0,0 +1,713 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LaTeX resume parser
+Turns .tex resume source into the plain text a reader would see, plus a map of its
+sections (Experience, Skills, Projects...) and the contact fields declared with
+\\name, \\email, \\phone and similar commands. \\input and \\include files are
+followed, simple \\newcommand/\\def macros are expanded and layout commands
+(\\vspace, \\hfill, column specs...) are dropped, so keyword analysis only sees
+real content.
+
+Parsed files are cached by path and re-used while the file and everything it
+includes are unchanged: same mtime and size, or same SHA-256 when only touched.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, namedtuple
+
+
+# Bump whenever parsed output would change, so stale cache entries are ignored
+PARSER_VERSION = 1
+
+MEMORY_CACHE_SIZE = 128
+
+# Guards against recursive macros and \input loops
+MAX_EXPANSIONS = 20000
+MAX_INCLUDE_DEPTH = 16
+
+# text: plain text, headings upper-cased on their own line, list items as "- " lines
+# sections: {title: section text} in document order
+# fields: contact details declared by commands ({'name': ..., 'email': ...})
+# files: ((path, mtime_ns, size, sha256), ...) of the file and its includes;
+#        includes that could not be found have None in place of the last three
+ParsedTex = namedtuple('ParsedTex', 'text sections fields files')
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<comment>%[^\n]*(?:\n[ \t]*)?)
+  | \\(?P<cs>[a-zA-Z@]+\*?|.)
+  | (?P<space>\s+)
+  | (?P<param>\#[1-9])
+  | (?P<special>[{}\[\]$&~^_])
+  | (?P<text>[^\\{}\[\]$&~^_%\#\s]+(?:[ \t]+[^\\{}\[\]$&~^_%\#\s]+)*)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+WORD_PATTERN = re.compile(r'\w')
+
+SECTION_COMMANDS = frozenset({'part', 'chapter', 'section', 'cvsection'})
+SUBSECTION_COMMANDS = frozenset({'subsection', 'subsubsection', 'paragraph', 'subparagraph',
+                                 'cvsubsection'})
+INCLUDE_COMMANDS = frozenset({'input', 'include', 'subfile', 'import', 'subimport',
+                              'inputfrom', 'includefrom'})
+MACRO_COMMANDS = frozenset({'newcommand', 'renewcommand', 'providecommand',
+                            'DeclareRobustCommand'})
+DEF_COMMANDS = frozenset({'def', 'gdef', 'edef', 'xdef'})
+ENVIRONMENT_COMMANDS = frozenset({'newenvironment', 'renewenvironment'})
+TITLE_COMMANDS = frozenset({'maketitle', 'makecvtitle', 'makecvheader'})
+NEWLINE_COMMANDS = frozenset({'\\', 'newline', 'linebreak', 'par', 'break', 'cr',
+                              'tabularnewline', 'newpage', 'clearpage', 'pagebreak'})
+
+# Argument signatures: o = optional [..], m = mandatory, both dropped; t = kept as text.
+# Commands not listed keep the text of the {..} groups that directly follow them.
+COMMAND_ARGS = {
+    'documentclass': 'om', 'usepackage': 'om', 'RequirePackage': 'om', 'LoadClass': 'om',
+    'ProvidesPackage': 'mo', 'ProvidesClass': 'mo', 'geometry': 'm', 'newgeometry': 'm',
+    'hypersetup': 'm', 'urlstyle': 'm', 'setlength': 'mm', 'addtolength': 'mm',
+    'settowidth': 'mm', 'newlength': 'm', 'setcounter': 'mm', 'addtocounter': 'mm',
+    'newcounter': 'mo', 'pagestyle': 'm', 'thispagestyle': 'm', 'pagenumbering': 'm',
+    'vspace': 'm', 'hspace': 'm', 'enlargethispage': 'm', 'linespread': 'm',
+    'fontsize': 'mm', 'setmainfont': 'om', 'setsansfont': 'om', 'setmonofont': 'om',
+    'label': 'm', 'ref': 'm', 'pageref': 'm', 'cite': 'om', 'nocite': 'm',
+    'bibliography': 'm', 'bibliographystyle': 'm', 'addbibresource': 'om',
+    'includegraphics': 'om', 'graphicspath': 'm', 'color': 'om', 'definecolor': 'mmm',
+    'colorlet': 'mm', 'titleformat': 'mommmmo', 'titlespacing': 'mmmmo', 'rule': 'omm',
+    'includeonly': 'm', 'faIcon': 'om', 'setlist': 'om', 'newtheorem': 'momo',
+    'textcolor': 'omt', 'colorbox': 'omt', 'fcolorbox': 'mmt', 'href': 'mt',
+    'hyperlink': 'mt', 'hypertarget': 'mt', 'footnote': 'ot', 'raisebox': 'moot',
+    'parbox': 'ooomt', 'makebox': 'oot', 'framebox': 'oot', 'resizebox': 'mmt',
+    'scalebox': 'mot', 'multicolumn': 'mmt', 'multirow': 'momt',
+}
+
+# Column specs and sizes of environments, dropped after \begin{name}
+ENVIRONMENT_ARGS = {
+    'tabular': 'om', 'tabular*': 'mom', 'tabularx': 'mom', 'tabulary': 'mom',
+    'longtable': 'om', 'array': 'om', 'minipage': 'ooom', 'multicols': 'mo',
+    'multicols*': 'mo', 'wrapfigure': 'oomom', 'adjustbox': 'm', 'tcolorbox': 'o',
+}
+
+SYMBOLS = {
+    '&': '&', '%': '%', '$': '$', '#': '#', '_': '_', '{': '{', '}': '}', ' ': ' ', '\n': ' ',
+    ',': ' ', ';': ' ', ':': ' ', '!': '', '-': '', '/': '', '@': '', '(': '', ')': '',
+    '[': '', ']': '', 'quad': ' ', 'qquad': ' ', 'hfill': ' ', 'hfil': ' ', 'enspace': ' ',
+    'ldots': '...', 'dots': '...', 'LaTeX': 'LaTeX', 'LaTeXe': 'LaTeX2e', 'TeX': 'TeX',
+    'textbar': '|', 'textbullet': '•', 'bullet': '•', 'cdot': '·', 'textperiodcentered': '·',
+    'textendash': '–', 'textemdash': '—', 'textasciitilde': '~', 'sim': '~',
+    'textbackslash': '\\', 'textasciicircum': '^', 'textless': '<', 'textgreater': '>',
+    'copyright': '©', 'textcopyright': '©', 'textregistered': '®', 'texttrademark': '™',
+    'pounds': '£', 'euro': '€', 'texteuro': '€', 'textdollar': '$', 'times': '×', 'pm': '±',
+    'degree': '°', 'textdegree': '°', 'ss': 'ß', 'o': 'ø', 'O': 'Ø', 'ae': 'æ', 'AE': 'Æ',
+    'oe': 'œ', 'OE': 'Œ', 'aa': 'å', 'AA': 'Å', 'l': 'ł', 'L': 'Ł', 'i': 'ı',
+    'to': '→', 'rightarrow': '→', 'textrightarrow': '→', 'ge': '≥', 'le': '≤',
+}
+
+# Accent commands and the combining characters they stand for
+ACCENTS = {
+    "'": '\u0301', '`': '\u0300', '^': '\u0302', '"': '\u0308', '~': '\u0303', '=': '\u0304',
+    '.': '\u0307', 'u': '\u0306', 'v': '\u030c', 'H': '\u030b', 'r': '\u030a', 'c': '\u0327',
+    'k': '\u0328', 'd': '\u0323', 'b': '\u0331',
+}
+
+LIGATURES = (('---', '—'), ('--', '–'), ('``', '"'), ("''", '"'))
+
+# Contact commands of common resume classes (moderncv, awesome-cv, res.cls...): field, args
+CONTACT_COMMANDS = {
+    'name': ('name', 'mM'), 'author': ('name', 'm'), 'firstname': ('firstname', 'm'),
+    'familyname': ('lastname', 'm'), 'email': ('email', 'm'), 'phone': ('phone', 'om'),
+    'mobile': ('phone', 'm'), 'homepage': ('homepage', 'm'), 'linkedin': ('linkedin', 'm'),
+    'github': ('github', 'm'), 'social': ('social', 'om'),
+}
+PROFILE_URLS = {'linkedin': 'linkedin.com/in/', 'github': 'github.com/'}
+
+
+class _Heading:
+    """Marker for a section start in the parser output"""
+
+    __slots__ = ('title',)
+
+    def __init__(self, title):
+        self.title = title
+
+
+def tokenize(source):
+    """[(kind, value)] for TeX source; kind is 'cs' (command name), 'text', 'space',
+    'par' (blank line), 'param' (#1..#9) or the special character itself"""
+    tokens = []
+    append = tokens.append
+    for match in TOKEN_PATTERN.finditer(source):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'comment':
+            continue
+        if kind == 'space':
+            append(('par' if value.count('\n') > 1 else 'space', value))
+        elif kind == 'special':
+            append((value, value))
+        elif kind == 'other':
+            append(('text', value))
+        else:
+            append((kind, value))
+    return tokens
+
+
+def _ligatures(text):
+    for sequence, replacement in LIGATURES:
+        if sequence in text:
+            text = text.replace(sequence, replacement)
+    return text
+
+
+def _normalize_lines(text):
+    """Non-empty lines with single spaces; bullets without text are dropped"""
+    lines = (' '.join(line.split()) for line in _ligatures(text).split('\n'))
+    return [line for line in lines if line and line != '-']
+
+
+def _raw(tokens):
+    """Source text of tokens, e.g. a URL argument"""
+    return ''.join('\\' + value if kind == 'cs' else value for kind, value in tokens)
+
+
+class _TexParser:
+    """Expands and renders a token stream; tokens are kept on a stack so that macro
+    bodies and included files can be pushed in front of the rest of the input"""
+
+    def __init__(self, base_dir=None, loader=None, in_body=True):
+        self.base_dir = base_dir
+        self.loader = loader
+        self.in_body = in_body
+        self.stack = []
+        self.out = []
+        self.capturing = 0
+        self.fields = {}
+        self.header_shown = False
+        self.macros = {}        # name -> (argument count, default of the first or None, body)
+        self.environments = {}  # name -> (argument count, default, begin body, end body)
+        self.expansions = 0
+        self.including = []     # paths of the files being read, innermost last
+        self.files = []
+
+    # --- token stream ---------------------------------------------------------------
+
+    def push(self, tokens):
+        self.stack.extend(reversed(tokens))
+
+    def _skip_spaces(self):
+        skipped = []
+        while self.stack and self.stack[-1][0] == 'space':
+            skipped.append(self.stack.pop())
+        return skipped
+
+    def read_group(self):
+        """Tokens up to the '}' matching an already consumed '{'"""
+        tokens = []
+        depth = 0
+        while self.stack:
+            token = self.stack.pop()
+            if token[0] == '{':
+                depth += 1
+            elif token[0] == '}':
+                if depth == 0:
+                    break
+                depth -= 1
+            tokens.append(token)
+        return tokens
+
+    def read_arg(self):
+        """A mandatory argument: a {group}, a single command or a single character"""
+        self._skip_spaces()
+        if not self.stack:
+            return []
+        token = self.stack.pop()
+        if token[0] == '{':
+            return self.read_group()
+        if token[0] == 'text' and len(token[1]) > 1:
+            self.stack.append(('text', token[1][1:]))
+            return [('text', token[1][0])]
+        return [token]
+
+    def read_optional(self, skip_spaces=True):
+        """Tokens of an optional [argument], or None when there is none"""
+        skipped = self._skip_spaces() if skip_spaces else []
+        if not self.stack or self.stack[-1][0] != '[':
+            self.stack.extend(reversed(skipped))
+            return None
+        self.stack.pop()
+        tokens = []
+        depth = 0
+        while self.stack:
+            token = self.stack.pop()
+            if token[0] == '{':
+                depth += 1
+            elif token[0] == '}':
+                depth -= 1
+            elif token[0] == ']' and depth == 0:
+                break
+            tokens.append(token)
+        return tokens
+
+    def read_args(self, signature):
+        """Arguments for a signature of 'o'/'m'/'t' letters (see COMMAND_ARGS)"""
+        return [self.read_optional() if letter == 'o' else self.read_arg()
+                for letter in signature]
+
+    # --- output ---------------------------------------------------------------------
+
+    def emit(self, text):
+        if self.in_body or self.capturing:
+            self.out.append(text)
+
+    def render(self, tokens):
+        """Plain text of tokens, rendered on their own (e.g. a section title)"""
+        saved = self.stack, self.out
+        self.stack, self.out = list(reversed(tokens)), []
+        self.capturing += 1
+        try:
+            self.run()
+            return ' '.join(_ligatures(''.join(part for part in self.out
+                                               if isinstance(part, str))).split())
+        finally:
+            self.capturing -= 1
+            self.stack, self.out = saved
+
+    def header(self):
+        """The name and contact lines a \\maketitle-style command would print"""
+        fields = self.fields
+        name = fields.get('name') or ' '.join(
+            fields[part] for part in ('firstname', 'lastname') if fields.get(part))
+        contacts = [fields[field] for field in ('email', 'phone', 'linkedin', 'github',
+                                                'homepage') if fields.get(field)]
+        return [line for line in (name, ' | '.join(contacts)) if line]
+
+    # --- main loop ------------------------------------------------------------------
+
+    def run(self):
+        stack, out = self.stack, self.out
+        while stack:
+            kind, value = stack.pop()
+            if kind == 'text' or kind == 'space':
+                if self.in_body or self.capturing:
+                    out.append(value if kind == 'text' else ' ')
+            elif kind == 'par':
+                self.emit('\n')
+            elif kind == 'cs':
+                self.command(value)
+            elif kind == '&':
+                self.emit(' | ')
+            elif kind == '~':
+                self.emit(' ')
+            elif kind in ('[', ']'):
+                self.emit(value)
+            elif kind == 'eof':
+                self.including.remove(value)
+            # braces, math shifts, sub/superscripts and stray #n render as nothing
+
+    def command(self, name):
+        base = name.rstrip('*') if len(name) > 1 else name
+        if name in self.macros:
+            self.expand(*self.macros[name])
+        elif base in NEWLINE_COMMANDS:
+            if self.stack and self.stack[-1] == ('text', '*'):
+                self.stack.pop()
+            self.read_optional(skip_spaces=False)
+            self.emit('\n')
+        elif base in SYMBOLS:
+            self.emit(SYMBOLS[base])
+        elif name in ACCENTS:
+            self.accent(name)
+        elif base == 'item':
+            self.item()
+        elif base in ('begin', 'end'):
+            self.environment(base == 'begin')
+        elif base in SECTION_COMMANDS or base in SUBSECTION_COMMANDS:
+            self.section(base)
+        elif base in INCLUDE_COMMANDS:
+            self.include(base)
+        elif base == 'endinput':
+            self.end_input()
+        elif base in MACRO_COMMANDS:
+            self.define_macro(provide=base == 'providecommand')
+        elif base in DEF_COMMANDS:
+            self.define_def()
+        elif base == 'let':
+            self.let()
+        elif base in ENVIRONMENT_COMMANDS:
+            self.define_environment()
+        elif base in CONTACT_COMMANDS:
+            self.contact(base)
+        elif base in TITLE_COMMANDS:
+            self.emit('\n' + '\n'.join(self.header()) + '\n')
+            self.header_shown = True
+        elif base == 'url':
+            self.emit(_raw(self.read_arg()))
+        elif base in COMMAND_ARGS:
+            self.keep_text(self.read_args(COMMAND_ARGS[base]), COMMAND_ARGS[base])
+        else:
+            self.unknown()
+
+    def keep_text(self, args, signature):
+        kept = []
+        for letter, tokens in zip(signature, args):
+            if letter == 't' and tokens:
+                kept.extend(tokens)
+                kept.append(('space', ' '))
+        self.push(kept)
+
+    def unknown(self):
+        """Drop a command, keeping the text of {..} groups that directly follow it
+
+        The groups are separated by spaces (\\cventry{2020}{Engineer}{Acme}), except
+        before punctuation (\\textbf{Languages}{: Python}).
+        """
+        kept = []
+        while self.stack and self.stack[-1][0] in ('[', '{'):
+            if self.stack[-1][0] == '[':
+                self.read_optional(skip_spaces=False)
+                continue
+            self.stack.pop()
+            group = self.read_group()
+            if kept and not (group and group[0][0] == 'text' and group[0][1][0] in ',.;:!?)'):
+                kept.append(('space', ' '))
+            kept.extend(group)
+        self.push(kept)
+
+    # --- commands -------------------------------------------------------------------
+
+    def expand(self, count, default, body):
+        self.expansions += 1
+        if self.expansions > MAX_EXPANSIONS:
+            self.unknown()
+            return
+        args = []
+        if count and default is not None:
+            optional = self.read_optional()
+            args.append(default if optional is None else optional)
+        while len(args) < count:
+            args.append(self.read_arg())
+        self.push(_substitute(body, args))
+
+    def accent(self, name):
+        text = self.render(self.read_arg())
+        if text:
+            text = unicodedata.normalize('NFC', text[0] + ACCENTS[name]) + text[1:]
+        self.emit(text)
+
+    def item(self):
+        label = self.read_optional(skip_spaces=False)
+        label = self.render(label) if label else ''
+        self.emit('\n- ')
+        if WORD_PATTERN.search(label):
+            self.emit(label + ' ')
+
+    def environment(self, begin):
+        name = _raw(self.read_arg()).strip()
+        self.emit('\n')
+        if name == 'document':
+            if begin:
+                self.in_body = True
+            else:
+                self.stack[:] = []  # anything after \end{document} is ignored
+            return
+        if begin and name == 'comment':
+            self.skip_comment()
+        elif name in self.environments:
+            count, default, begin_body, end_body = self.environments[name]
+            if begin:
+                self.expand(count, default, begin_body)
+            else:
+                self.push(end_body)
+        elif begin and name in ENVIRONMENT_ARGS:
+            self.read_args(ENVIRONMENT_ARGS[name])
+        elif begin:
+            self.read_optional(skip_spaces=False)  # list options: \begin{itemize}[nosep]
+
+    def skip_comment(self):
+        while self.stack:
+            if self.stack.pop() == ('cs', 'end') and _raw(self.read_arg()).strip() == 'comment':
+                return
+
+    def section(self, base):
+        self.read_optional()
+        title = self.render(self.read_arg())
+        if base in SECTION_COMMANDS and not self.capturing:
+            self.emit(_Heading(title))
+        else:
+            self.emit('\n' + title + '\n')
+
+    def include(self, base):
+        directory = ''
+        if base in ('import', 'subimport', 'inputfrom', 'includefrom'):
+            directory = _raw(self.read_arg()).strip()
+        self._skip_spaces()
+        if self.stack and self.stack[-1][0] == '{':
+            self.stack.pop()
+            name = _raw(self.read_group()).strip()
+        elif self.stack and self.stack[-1][0] == 'text':
+            # TeX syntax: \input file
+            name, _, rest = self.stack.pop()[1].partition(' ')
+            if rest:
+                self.stack.append(('text', rest))
+        else:
+            return
+        self.emit('\n')
+        if self.loader is None or not name:
+            return
+        base_dir = self.base_dir or os.getcwd()
+        candidates = [name] if os.path.splitext(name)[1] else [name + '.tex', name]
+        for candidate in candidates:
+            path = os.path.normpath(os.path.join(base_dir, directory, candidate))
+            if path in self.including or len(self.including) >= MAX_INCLUDE_DEPTH:
+                return
+            source = self.loader(path)
+            if source is not None:
+                self.including.append(path)
+                self.push(tokenize(source) + [('eof', path)])
+                return
+
+    def end_input(self):
+        """\\endinput: skip the rest of the current file"""
+        while self.stack and self.stack[-1][0] != 'eof':
+            self.stack.pop()
+
+    def _macro_name(self):
+        tokens = [token for token in self.read_arg() if token[0] != 'space']
+        return tokens[0][1] if tokens and tokens[0][0] == 'cs' else None
+
+    def _count(self):
+        count = self.read_optional()
+        try:
+            return int(_raw(count)) if count else 0
+        except ValueError:
+            return 0
+
+    def define_macro(self, provide=False):
+        name = self._macro_name()
+        count = self._count()
+        default = self.read_optional() if count else None
+        body = self.read_arg()
+        if name and not (provide and name in self.macros):
+            self.macros[name] = (count, default, body)
+
+    def define_def(self):
+        """\\def\\name#1#2{body}; delimited parameters are treated as plain ones"""
+        name = self.stack.pop()[1] if self.stack and self.stack[-1][0] == 'cs' else None
+        count = 0
+        for _ in range(32):
+            if not self.stack or self.stack[-1][0] == '{':
+                break
+            if self.stack.pop()[0] == 'param':
+                count += 1
+        body = self.read_arg()
+        if name:
+            self.macros[name] = (count, None, body)
+
+    def let(self):
+        name = self.stack.pop()[1] if self.stack and self.stack[-1][0] == 'cs' else None
+        self._skip_spaces()
+        if self.stack and self.stack[-1] == ('text', '='):
+            self.stack.pop()
+        target = self.read_arg()
+        if name and len(target) == 1 and target[0][0] == 'cs' and target[0][1] in self.macros:
+            self.macros[name] = self.macros[target[0][1]]
+
+    def define_environment(self):
+        name = _raw(self.read_arg()).strip()
+        count = self._count()
+        default = self.read_optional() if count else None
+        begin_body = self.read_arg()
+        end_body = self.read_arg()
+        if name:
+            self.environments[name] = (count, default, begin_body, end_body)
+
+    def contact(self, base):
+        field, signature = CONTACT_COMMANDS[base]
+        optional = None
+        parts = []
+        for letter in signature:
+            if letter == 'o':
+                optional = self.read_optional()
+            elif letter == 'm':
+                parts.append(self.render(self.read_arg()))
+            else:
+                # second part of \name{First}{Last}, only if a group follows
+                skipped = self._skip_spaces()
+                if self.stack and self.stack[-1][0] == '{':
+                    parts.append(self.render(self.read_arg()))
+                else:
+                    self.stack.extend(reversed(skipped))
+        value = ' '.join(part for part in parts if part)
+        if field == 'social':
+            field = self.render(optional).lower() if optional else 'homepage'
+        if field in PROFILE_URLS and value and PROFILE_URLS[field].split('/')[0] not in value:
+            value = PROFILE_URLS[field] + value
+        if value and not (base == 'author' and 'name' in self.fields):
+            self.fields[field] = value
+        if self.in_body:
+            self.emit(value)
+
+    # --- result ---------------------------------------------------------------------
+
+    def result(self, files):
+        """ParsedTex of everything rendered so far"""
+        blocks = [(None, [])]
+        for part in self.out:
+            if isinstance(part, _Heading):
+                blocks.append((part.title, []))
+            else:
+                blocks[-1][1].append(part)
+
+        lines = []
+        sections = {}
+        for title, parts in blocks:
+            body = _normalize_lines(''.join(parts))
+            if title is not None:
+                lines.append(title.upper())
+                sections[title] = '\n'.join(filter(None, (sections.get(title), *body)))
+            lines.extend(body)
+
+        if self.fields.get('firstname') or self.fields.get('lastname'):
+            self.fields.setdefault('name', ' '.join(
+                self.fields.pop(part) for part in ('firstname', 'lastname')
+                if part in self.fields))
+        text = '\n'.join(lines)
+        if not self.header_shown:
+            # Classes print the declared name and contacts at the top of the page
+            header = [line for line in self.header() if line not in text]
+            lines = header + lines
+        return ParsedTex('\n'.join(lines), sections, dict(self.fields), tuple(files))
+
+
+def _substitute(body, args):
+    tokens = []
+    for token in body:
+        if token[0] == 'param':
+            position = int(token[1][1]) - 1
+            if position < len(args):
+                tokens.extend(args[position])
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def parse_tex(source, base_dir=None, loader=None):
+    """ParsedTex of TeX source
+
+    loader(path) returns the source of an included file, or None when it does not
+    exist; includes are resolved relative to base_dir (the main file's directory).
+    Without a loader \\input and \\include are skipped.
+    """
+    parser = _TexParser(base_dir, loader, in_body='\\begin{document}' not in source)
+    parser.push(tokenize(source))
+    parser.run()
+    return parser.result(())
+
+
+def _read_source(path):
+    """(source, (path, mtime_ns, size, sha256)) of a TeX file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+        stat = os.fstat(f.fileno())
+    return data.decode('utf-8'), (path, stat.st_mtime_ns, stat.st_size,
+                                  hashlib.sha256(data).hexdigest())
+
+
+def parse_tex_file(file_path):
+    """ParsedTex of a .tex file and the files it includes"""
+    file_path = os.path.abspath(file_path)
+    source, entry = _read_source(file_path)
+    files = [entry]
+
+    def load(path):
+        try:
+            include_source, include_entry = _read_source(path)
+        except FileNotFoundError:
+            files.append((path, None, None, None))
+            return None
+        files.append(include_entry)
+        return include_source
+
+    parser = _TexParser(os.path.dirname(file_path), load,
+                        in_body='\\begin{document}' not in source)
+    parser.including.append(file_path)
+    parser.push(tokenize(source))
+    parser.run()
+    return parser.result(files)
+
+
+def _check_files(files):
+    """files with refreshed mtimes if their content is unchanged, else None"""
+    checked = []
+    for path, mtime_ns, size, digest in files:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            if digest is not None:
+                return None
+            checked.append((path, None, None, None))
+            continue
+        if digest is None or stat.st_size != size:
+            return None
+        if stat.st_mtime_ns != mtime_ns:
+            # Touched (e.g. by a checkout or sync): still valid if the bytes are the same
+            with open(path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != digest:
+                    return None
+        checked.append((path, stat.st_mtime_ns, size, digest))
+    return tuple(checked)
+
+
+_memory_cache = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _remember(path, parsed):
+    with _memory_lock:
+        _memory_cache[path] = parsed
+        _memory_cache.move_to_end(path)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _disk_key(path):
+    return f"tex:v{PARSER_VERSION}:{path}"
+
+
+def _from_json(value):
+    data = json.loads(value)
+    return ParsedTex(data['text'], data['sections'], data['fields'],
+                     tuple(tuple(entry) for entry in data['files']))
+
+
+def read_tex_cached(file_path, cache=None):
+    """(ParsedTex, cache_hit) for a .tex file, re-parsing only when it or an include changed
+
+    Results are kept in memory and, when cache (a DiskCache) is given, on disk so
+    they are shared with worker processes and later runs.
+    """
+    path = os.path.abspath(file_path)
+    with _memory_lock:
+        parsed = _memory_cache.get(path)
+    if parsed is None and cache is not None:
+        value = cache.get(_disk_key(path))
+        parsed = _from_json(value) if value is not None else None
+
+    if parsed is not None:
+        files = _check_files(parsed.files)
+        if files is not None:
+            if files != parsed.files:
+                parsed = parsed._replace(files=files)
+                if cache is not None:
+                    cache.set(_disk_key(path), json.dumps(parsed._asdict()))
+            _remember(path, parsed)
+            return parsed, True
+
+    parsed = parse_tex_file(path)
+    _remember(path, parsed)
+    if cache is not None:
+        cache.set(_disk_key(path), json.dumps(parsed._asdict()))
+    return parsed, False
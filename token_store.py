@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact memory-mapped store of resume token IDs
+Each document's keyword-engine tokens are interned into one integer vocabulary and
+appended to a single uint32 array, so a large corpus costs about 4 bytes per
+token instead of a Python string per token. Keyword and match scoring passes run
+over the mapped arrays: only the JD's terms are ever looked up as strings.
+
+On disk (one directory):
+    terms.txt    vocabulary, one term per line, append-only (line number = term id)
+    flags.u8     per term id: 1 if the term is a keyword (keyword_engine.is_keyword)
+    tokens.u32   token ids of every document, back to back
+    ends.u64     end offset of each document in tokens.u32
+    norms.f32    norm of each document's (1 + log tf) keyword vector
+    digests.u64  content digest of each document, to skip storing it twice
+    names.txt    name of each document (e.g. its file path), one per line
+    meta.json    number of committed documents, tokens and terms
+
+Every file is append-only and meta.json is replaced last on flush, so readers
+(and a reopened writer) ignore whatever an interrupted flush left behind. One
+process should write at a time; any number can read. A pickled store reopens
+read-only by path, so pool workers map the same pages instead of copying them.
+"""
+
+import json
+import math
+import os
+import threading
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from corpus_stats import document_digest, storable_term
+from disk_cache import default_cache_dir
+from keyword_engine import TOKEN_PATTERN, DocumentIndex, is_keyword
+from pipeline_metrics import span, timed
+
+
+# Pending tokens that trigger a flush while adding documents
+FLUSH_TOKENS = 1 << 22
+
+# Tokens and (documents x JD terms) counts per score_range block, bounding its temporaries
+SCORE_BLOCK_TOKENS = 1 << 22
+SCORE_BLOCK_CELLS = 1 << 22
+
+# (file name, dtype) of the per-document and per-token arrays
+_ARRAYS = {
+    'tokens': ('tokens.u32', '<u4'),
+    'ends': ('ends.u64', '<u8'),
+    'norms': ('norms.f32', '<f4'),
+    'digests': ('digests.u64', '<u8'),
+    'flags': ('flags.u8', 'u1'),
+}
+
+
+def tokenize(text):
+    """Lower-cased keyword-engine tokens of a text, as stored (DocumentIndex.counts keys)"""
+    with span('tokenize'):
+        return [storable_term(token.lower()) for token in TOKEN_PATTERN.findall(text)]
+
+
+def _read_lines(path, count):
+    """First count lines of a text file (later ones are uncommitted)"""
+    if not count or not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().split('\n')[:count]
+
+
+class TokenStore:
+    """Token id sequences of many documents over one shared vocabulary (thread-safe)"""
+
+    def __init__(self, path=None, readonly=False):
+        if path is None:
+            path = os.path.join(default_cache_dir(), 'resumes')
+        if not readonly:
+            os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+
+        meta = {'documents': 0, 'tokens': 0, 'terms': 0}
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta.update(json.load(f))
+        self._committed = meta
+        if not readonly:
+            self._drop_uncommitted()
+
+        # The vocabulary, names and digests are only loaded when needed, so
+        # read-only workers that just score never build a Python string
+        self._terms = None
+        self._vocabulary = None
+        self._names = None
+        self._latest = None
+        self._digests = None
+        self._maps = {}
+        self._pending = {'tokens': [], 'ends': [], 'norms': [], 'digests': [], 'names': [],
+                         'flags': []}
+        self._pending_tokens = 0
+        self.documents = meta['documents']
+        self.tokens_count = meta['tokens']
+
+    def __reduce__(self):
+        return TokenStore, (self.path, True)
+
+    def __len__(self):
+        return self.documents
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _drop_uncommitted(self):
+        """Cut every file back to what meta.json committed"""
+        counts = {'tokens': self._committed['tokens'], 'ends': self._committed['documents'],
+                  'norms': self._committed['documents'],
+                  'digests': self._committed['documents'], 'flags': self._committed['terms']}
+        for key, (filename, dtype) in _ARRAYS.items():
+            path = self._file(filename)
+            size = counts[key] * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+        for filename, count in (('terms.txt', self._committed['terms']),
+                                ('names.txt', self._committed['documents'])):
+            path = self._file(filename)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.read().split('\n') if count else []
+            if len(lines) > count or (not count and os.path.getsize(path)):
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(lines[:count]))
+
+    def _load_terms(self):
+        if self._terms is None:
+            self._terms = _read_lines(self._file('terms.txt'), self._committed['terms'])
+            self._vocabulary = {term: term_id for term_id, term in enumerate(self._terms)}
+
+    def _load_names(self):
+        if self._names is None:
+            self._names = _read_lines(self._file('names.txt'), self._committed['documents'])
+
+    def _array(self, key):
+        """Read-only map of the committed part of an array file"""
+        filename, dtype = _ARRAYS[key]
+        count = {'tokens': self._committed['tokens'], 'flags': self._committed['terms']}.get(
+            key, self._committed['documents'])
+        mapped = self._maps.get(key)
+        if mapped is None or len(mapped) != count:
+            if count == 0:
+                mapped = np.zeros(0, dtype=dtype)
+            else:
+                mapped = np.memmap(self._file(filename), dtype=dtype, mode='r', shape=(count,))
+            self._maps[key] = mapped
+        return mapped
+
+    def arrays(self):
+        """(tokens, ends, norms, keyword flags) of the committed documents, memory-mapped"""
+        if not self.readonly and self._pending_tokens + len(self._pending['ends']):
+            self.flush()
+        with self._lock:
+            return (self._array('tokens'), self._array('ends'), self._array('norms'),
+                    self._array('flags').view(bool))
+
+    def document(self, doc_id):
+        """Token ids of one document (a view of the mapped array)"""
+        tokens, ends, _, _ = self.arrays()
+        start = int(ends[doc_id - 1]) if doc_id else 0
+        return tokens[start:int(ends[doc_id])]
+
+    def name(self, doc_id):
+        self.arrays()
+        with self._lock:
+            self._load_names()
+            return self._names[doc_id]
+
+    def latest(self):
+        """Bool array: True for each document not replaced by a later one of the same name"""
+        self.arrays()
+        with self._lock:
+            if self._latest is None or len(self._latest) != self._committed['documents']:
+                self._load_names()
+                last = {name: doc_id for doc_id, name in enumerate(self._names)}
+                latest = np.zeros(len(self._names), dtype=bool)
+                latest[np.fromiter(last.values(), dtype=np.int64, count=len(last))] = True
+                self._latest = latest
+            return self._latest
+
+    def term_ids(self, terms):
+        """int64 array of the ids of terms, -1 for terms the store has never seen"""
+        with self._lock:
+            self._load_terms()
+            return np.fromiter((self._vocabulary.get(storable_term(term), -1) for term in terms),
+                               dtype=np.int64, count=len(terms))
+
+    def terms(self, ids):
+        with self._lock:
+            self._load_terms()
+            return [self._terms[term_id] for term_id in ids]
+
+    def __contains__(self, text):
+        """True if a document with exactly this text is stored"""
+        return self.contains_digest(document_digest(text))
+
+    def contains_digest(self, digest):
+        with self._lock:
+            self._load_digests()
+            return digest in self._digests
+
+    def _load_digests(self):
+        if self._digests is None:
+            self._digests = set(self._array('digests').tolist())
+
+    def add(self, name, text):
+        """Store a document; returns its id, or None if the same text is already stored"""
+        return self.add_tokens(name, tokenize(text), document_digest(text))
+
+    def add_tokens(self, name, tokens, digest):
+        """Store a document already split by tokenize() (e.g. in a worker process)"""
+        if self.readonly:
+            raise ValueError(f"Token store {self.path} is open read-only")
+        with self._lock:
+            self._load_terms()
+            self._load_digests()
+            if digest in self._digests:
+                return None
+            vocabulary = self._vocabulary
+            norm = 0.0
+            for term, count in Counter(tokens).items():
+                keyword = is_keyword(term)
+                if term not in vocabulary:
+                    vocabulary[term] = len(self._terms)
+                    self._terms.append(term)
+                    self._pending['flags'].append(keyword)
+                if keyword:
+                    norm += (1 + math.log(count)) ** 2
+            ids = np.fromiter(map(vocabulary.__getitem__, tokens), dtype='<u4', count=len(tokens))
+
+            doc_id = self.documents
+            self._pending['tokens'].append(ids)
+            self._pending_tokens += len(ids)
+            self.tokens_count += len(ids)
+            self._pending['ends'].append(self.tokens_count)
+            self._pending['norms'].append(math.sqrt(norm))
+            self._pending['digests'].append(digest)
+            self._pending['names'].append(' '.join(str(name).split()))
+            self._digests.add(digest)
+            self.documents += 1
+            flush = self._pending_tokens >= FLUSH_TOKENS
+        if flush:
+            self.flush()
+        return doc_id
+
+    def flush(self):
+        """Append pending documents and terms to their files; meta.json last"""
+        if self.readonly:
+            return
+        with self._lock:
+            pending = self._pending
+            committed_terms = self._committed['terms']
+            new_terms = self._terms[committed_terms:] if self._terms is not None else []
+            if not new_terms and not pending['ends']:
+                return
+            if new_terms:
+                with open(self._file('terms.txt'), 'a', encoding='utf-8') as f:
+                    if committed_terms:
+                        f.write('\n')
+                    f.write('\n'.join(new_terms))
+            if pending['names']:
+                with open(self._file('names.txt'), 'a', encoding='utf-8') as f:
+                    if self._committed['documents']:
+                        f.write('\n')
+                    f.write('\n'.join(pending['names']))
+            for key, (filename, dtype) in _ARRAYS.items():
+                if not pending[key]:
+                    continue
+                values = (np.concatenate(pending[key]) if key == 'tokens'
+                          else np.array(pending[key], dtype=dtype))
+                with open(self._file(filename), 'ab') as f:
+                    values.astype(dtype, copy=False).tofile(f)
+
+            meta = {'documents': self.documents, 'tokens': self.tokens_count,
+                    'terms': len(self._terms)}
+            meta_path = self._file('meta.json')
+            with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(meta_path + '.tmp', meta_path)
+
+            if self._names is not None:
+                self._names.extend(pending['names'])
+            self._committed = meta
+            self._pending = {key: [] for key in pending}
+            self._pending_tokens = 0
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._maps = {}
+
+
+JDQuery = namedtuple('JDQuery', 'ids values total norm unknown')
+JDQuery.__doc__ = """A JD's keyword vector in a store's term ids
+
+ids/values: sorted ids and weights of the JD terms the store knows; total/norm:
+sum and Euclidean norm of all the JD's weights; unknown: [(weight, term)] of JD
+terms no stored document contains, so always missing."""
+
+
+def jd_query(store, jd, weights=None):
+    """JDQuery of a JD (text or DocumentIndex) with (1 + log tf) or the given term weights
+
+    Weighted like similarity.term_vector, so the scores of score_range equal
+    similarity.score_batch's (without hash collisions).
+    """
+    index = DocumentIndex(jd) if isinstance(jd, str) else jd
+    merged = {}
+    for term, count in index.counts.items():
+        if is_keyword(term):
+            value = 1 + math.log(count) if weights is None else weights.get(term, 0.0)
+            key = storable_term(term)
+            merged[key] = merged.get(key, 0.0) + value
+    terms = list(merged)
+    values = np.fromiter(merged.values(), dtype=np.float64, count=len(terms))
+    ids = store.term_ids(terms)
+    known = ids >= 0
+    order = np.argsort(ids[known])
+    unknown = [(value, term) for term, value, found in zip(terms, values.tolist(), known.tolist())
+               if not found]
+    return JDQuery(ids[known][order], values[known][order], float(values.sum()),
+                   math.sqrt(float(np.square(values).sum())), unknown)
+
+
+@timed('keyword_scoring')
+def score_range(store, query, start=0, end=None):
+    """(cosine, overlap) float64 arrays for documents start..end against a JDQuery
+
+    Every stored token is mapped to its column among the JD's terms and counted
+    per (document, column) with one bincount, so a block of documents costs a
+    pass over its tokens and no sort or string.
+    """
+    tokens, ends, norms, _ = store.arrays()
+    end = len(ends) if end is None else end
+    cosine = np.zeros(end - start, dtype=np.float64)
+    overlap = np.zeros(end - start, dtype=np.float64)
+    if end <= start or not len(query.ids):
+        return cosine, overlap
+
+    width = len(query.ids) + 1  # last column: not a JD term
+    columns = np.full(int(query.ids[-1]) + 2, width - 1, dtype=np.int64)
+    columns[query.ids] = np.arange(len(query.ids))
+    max_documents = max(1, SCORE_BLOCK_CELLS // width)
+    first = start
+    while first < end:
+        # Whole documents per block, about SCORE_BLOCK_TOKENS tokens each time
+        offset = int(ends[first - 1]) if first else 0
+        last = int(np.searchsorted(ends[first:end], offset + SCORE_BLOCK_TOKENS, side='right'))
+        last = min(first + min(max(last, 1), max_documents), end)
+        block = tokens[offset:int(ends[last - 1])]
+        lengths = np.diff(ends[first:last], prepend=offset).astype(np.int64)
+
+        keys = np.repeat(np.arange(last - first, dtype=np.int64) * width, lengths)
+        keys += columns[np.minimum(block, len(columns) - 1)]
+        counts = np.bincount(keys, minlength=(last - first) * width).reshape(-1, width)[:, :-1]
+        present = counts > 0
+        tf_weight = np.log(counts, out=np.zeros(counts.shape), where=present)
+        tf_weight += present
+        overlap[first - start:last - start] = present @ query.values
+        cosine[first - start:last - start] = tf_weight @ query.values
+        first = last
+
+    if query.total:
+        overlap /= query.total
+    denominators = norms[start:end].astype(np.float64) * query.norm
+    np.divide(cosine, denominators, out=cosine, where=denominators > 0)
+    cosine[denominators <= 0] = 0
+    return cosine, overlap
+
+
+def missing_terms(store, doc_id, query, limit=100):
+    """Highest-weighted JD terms that one stored document lacks, title-cased
+
+    Only the missing terms are turned back into strings.
+    """
+    missing = ~np.isin(query.ids, store.document(doc_id))
+    candidates = list(zip(query.values[missing].tolist(),
+                          store.terms(query.ids[missing].tolist())))
+    candidates.extend(query.unknown)
+    candidates.sort(key=lambda item: -item[0])
+    return [term.title() for _, term in candidates[:limit]]